@@ -0,0 +1,169 @@
+"""
+Admission control and load shedding for the prediction API.
+
+Without a limit every request that uvicorn accepts is started immediately,
+so under overload all of them slow down together. Here each group of
+endpoints (a lane) admits at most `max_in_flight` requests at a time; up to
+`max_queue` more wait in FIFO order for at most `queue_timeout` seconds, and
+anything beyond that is answered at once with 503 and a Retry-After header,
+before its body is read. Paths outside every lane (/health, /model-info,
+/metrics, ...) are never queued or shed, so health checks keep passing
+while prediction traffic is being shed.
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+
+
+class Lane:
+    """Bounded concurrency plus a bounded FIFO queue for one group of endpoints."""
+
+    def __init__(self, name, max_in_flight, max_queue, queue_timeout):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self.in_flight = 0
+        self._waiters = deque()
+
+        # Observability counters
+        self.admitted = 0
+        self.queued = 0
+        self.shed_queue_full = 0
+        self.shed_timeout = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.wait_buckets_ms = [1, 5, 10, 25, 50, 100, 250, 500, 1000]
+        self.wait_bucket_counts = [0] * (len(self.wait_buckets_ms) + 1)
+
+    async def acquire(self):
+        """Wait for a slot; returns False if the request must be shed."""
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self.shed_queue_full += 1
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self.queued += 1
+        enqueued = time.perf_counter()
+        try:
+            # release() hands its slot straight to the future it resolves
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if future.done():
+                # The slot arrived just as the timeout fired; give it back
+                self.release()
+            else:
+                future.cancel()
+                self._waiters.remove(future)
+            self.shed_timeout += 1
+            return False
+        except asyncio.CancelledError:
+            # The client went away while queued
+            if future.done() and not future.cancelled():
+                self.release()
+            else:
+                future.cancel()
+                if future in self._waiters:
+                    self._waiters.remove(future)
+            raise
+
+        self._record_wait(time.perf_counter() - enqueued)
+        self.admitted += 1
+        return True
+
+    def release(self):
+        """Free a slot, passing it to the oldest waiter if there is one."""
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def _record_wait(self, wait):
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        wait_ms = wait * 1000.0
+        for i, bound in enumerate(self.wait_buckets_ms):
+            if wait_ms <= bound:
+                self.wait_bucket_counts[i] += 1
+                return
+        self.wait_bucket_counts[-1] += 1
+
+    @property
+    def queue_depth(self):
+        return len(self._waiters)
+
+    @property
+    def shed(self):
+        return self.shed_queue_full + self.shed_timeout
+
+    def stats(self):
+        """Snapshot of limits, occupancy, queue wait and shed counts."""
+        wait_histogram = {
+            f"le_{bound}ms": count
+            for bound, count in zip(self.wait_buckets_ms, self.wait_bucket_counts)
+        }
+        wait_histogram[f"gt_{self.wait_buckets_ms[-1]}ms"] = self.wait_bucket_counts[-1]
+        waited = sum(self.wait_bucket_counts)
+
+        return {
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "queue_timeout_s": self.queue_timeout,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "shed": {"queue_full": self.shed_queue_full, "timeout": self.shed_timeout},
+            "mean_queue_wait_ms": self.total_wait / waited * 1000.0 if waited else 0.0,
+            "max_queue_wait_ms": self.max_wait * 1000.0,
+            "queue_wait_histogram": wait_histogram
+        }
+
+
+class AdmissionMiddleware:
+    """ASGI middleware routing requests through their path's Lane.
+
+    `lanes` maps exact paths to Lane objects; other paths pass straight through.
+    """
+
+    def __init__(self, app, lanes, retry_after=1):
+        self.app = app
+        self.lanes = lanes
+        self.retry_after = retry_after
+        self._shed_body = json.dumps({"detail": "Server overloaded, retry later"}).encode()
+
+    async def __call__(self, scope, receive, send):
+        lane = self.lanes.get(scope['path']) if scope['type'] == 'http' else None
+        if lane is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await lane.acquire():
+            await send({
+                'type': 'http.response.start',
+                'status': 503,
+                'headers': [
+                    (b'content-type', b'application/json'),
+                    (b'content-length', str(len(self._shed_body)).encode()),
+                    (b'retry-after', str(self.retry_after).encode()),
+                ]
+            })
+            await send({'type': 'http.response.body', 'body': self._shed_body})
+            return
+
+        # Lets the endpoints tell time spent queued here from their own stages
+        scope.setdefault('state', {})['admitted_at'] = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            lane.release()
@@ -0,0 +1,157 @@
+"""
+Compact, pickle-free model artifact (model.bin) for the prediction API.
+
+One binary file holds everything needed to serve the model: the coefficients
+and intercept of a linear model, or the flattened node arrays of a tree
+ensemble (see tree_engine.py), plus scaler mean/scale, feature names and
+metrics. It loads with a memory map and plain NumPy, so a cold start never
+imports scikit-learn.
+
+Layout (little-endian):
+
+    magic        8 bytes   b'SPMODEL\\0'
+    version      uint32    FORMAT_VERSION
+    header_len   uint32    length of the JSON header
+    checksum     32 bytes  SHA-256 of everything after this field
+    header       UTF-8 JSON: model_type, info (the model_info.json contents)
+                 and the offset/shape/dtype of every array
+    padding      zeros up to the next ALIGNMENT boundary
+    arrays       raw array data, each starting on an ALIGNMENT boundary
+"""
+
+import hashlib
+import json
+import os
+import struct
+
+import numpy as np
+
+from tree_engine import CompiledTreeEnsemble
+
+ARTIFACT_FILE = 'model.bin'
+
+MAGIC = b'SPMODEL\0'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+_PREFIX = struct.Struct('<8sII32s')
+
+
+class ArtifactError(ValueError):
+    """The file is not a valid model artifact."""
+
+
+class ModelArtifact:
+    """Contents of a loaded artifact; `arrays` are read-only views of the memory map."""
+
+    def __init__(self, model_type, info, arrays, checksum):
+        self.model_type = model_type
+        self.info = info
+        self.arrays = arrays
+        self.checksum = checksum
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_artifact(path, model_type, arrays, info):
+    """
+    Write `arrays` (name -> ndarray) and the `info` dict to `path`.
+
+    The file is written next to `path` and renamed into place, so a watcher
+    never sees a partially written artifact.
+    """
+    arrays = {name: np.asarray(array) for name, array in arrays.items()}
+    arrays = {name: array.astype(array.dtype.newbyteorder('<'), order='C', copy=False)
+              for name, array in arrays.items()}
+
+    # Array offsets are relative to the start of the (aligned) data section
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = {'offset': offset, 'shape': list(array.shape), 'dtype': array.dtype.str}
+        offset = _aligned(offset + array.nbytes)
+
+    header = json.dumps({'model_type': model_type, 'info': info, 'arrays': layout}).encode('utf-8')
+    data_start = _aligned(_PREFIX.size + len(header))
+
+    body = bytearray(data_start - _PREFIX.size + offset)
+    body[:len(header)] = header
+    for name, array in arrays.items():
+        start = data_start - _PREFIX.size + layout[name]['offset']
+        body[start:start + array.nbytes] = array.tobytes()
+
+    checksum = hashlib.sha256(body).digest()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header), checksum))
+        f.write(body)
+    os.replace(tmp_path, path)
+
+
+def read_artifact(path):
+    """Memory-map and verify the artifact at `path`; raises ArtifactError if it is invalid."""
+    mapped = np.memmap(path, dtype=np.uint8, mode='r')
+    if len(mapped) < _PREFIX.size:
+        raise ArtifactError(f"{path} is too short to be a model artifact")
+
+    magic, version, header_len, checksum = _PREFIX.unpack(mapped[:_PREFIX.size].tobytes())
+    if magic != MAGIC:
+        raise ArtifactError(f"{path} is not a model artifact")
+    if version != FORMAT_VERSION:
+        raise ArtifactError(f"{path} has format version {version}, this code reads {FORMAT_VERSION}")
+    if hashlib.sha256(mapped[_PREFIX.size:]).digest() != checksum:
+        raise ArtifactError(f"{path} failed its checksum, the file is corrupt or truncated")
+
+    header = json.loads(mapped[_PREFIX.size:_PREFIX.size + header_len].tobytes())
+    data_start = _aligned(_PREFIX.size + header_len)
+
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        # Plain read-only ndarray views backed by the memory map
+        arrays[name] = np.ndarray(tuple(spec['shape']), dtype=np.dtype(spec['dtype']),
+                                  buffer=mapped, offset=data_start + spec['offset'])
+
+    return ModelArtifact(header['model_type'], header['info'], arrays, checksum.hex())
+
+
+def export_model(path, model, scaler, info):
+    """Export `model` in whichever form fits it; False if neither does."""
+    return (export_linear_model(path, model, scaler, info)
+            or export_tree_model(path, model, scaler, info))
+
+
+def export_linear_model(path, model, scaler, info):
+    """
+    Export a fitted single-output linear model and its StandardScaler.
+
+    Returns False, writing nothing, if the model has no single coefficient
+    vector (trees, forests) and therefore cannot be stored as a linear model.
+    """
+    coef = getattr(model, 'coef_', None)
+    intercept = getattr(model, 'intercept_', None)
+    if coef is None or intercept is None or np.ndim(coef) != 1 or np.size(intercept) != 1:
+        return False
+
+    write_artifact(path, 'linear', {
+        'coef': coef,
+        'intercept': np.reshape(intercept, ()),
+        'scaler_mean': scaler.mean_,
+        'scaler_scale': scaler.scale_,
+    }, info)
+    return True
+
+
+def export_tree_model(path, model, scaler, info):
+    """
+    Export a fitted tree or forest regressor, compiled to flat node arrays.
+
+    Returns False, writing nothing, for models CompiledTreeEnsemble cannot compile.
+    """
+    compiled = CompiledTreeEnsemble.from_sklearn(model, scaler)
+    if compiled is None:
+        return False
+
+    write_artifact(path, 'tree_ensemble', compiled.to_arrays(), info)
+    return True
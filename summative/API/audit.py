@@ -0,0 +1,268 @@
+"""
+Non-blocking audit log of every prediction the API serves.
+
+Each prediction (timestamp, endpoint, model version, request latency, raw
+inputs and score) is retained for auditing without writing from inside the
+request handlers. Handlers only append a tuple to an in-memory buffer; a
+background task swaps the buffer out every `flush_interval` seconds, or as
+soon as `flush_size` rows are waiting, and writes it in one batch on a
+worker thread: a single append to a JSON-lines file, or a single SQLite
+transaction when the path ends in .db/.sqlite/.sqlite3.
+
+If the writer falls behind and `max_buffer` rows are already waiting, the
+`overflow` policy decides: 'block' (the default) makes the recording request
+await the writer until the buffer has drained, so producers slow down to the
+speed of the disk and nothing is lost, while the event loop keeps serving
+everything else; 'drop' discards the new rows and counts them. close()
+writes whatever is still buffered and is called on shutdown.
+"""
+
+import asyncio
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from features import RAW_FEATURES
+
+SQLITE_SUFFIXES = ('.db', '.sqlite', '.sqlite3')
+
+OVERFLOW_POLICIES = ('block', 'drop')
+
+
+class AuditLog:
+    """Buffered, batch-flushed append-only record of predictions."""
+
+    def __init__(self, path, flush_size=1000, flush_interval=1.0, max_buffer=100000, overflow='block'):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
+        self.path = path
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.overflow = overflow
+        self.sqlite = path.lower().endswith(SQLITE_SUFFIXES)
+
+        # Buffered entries are (ts, endpoint, model_version, latency_ms, rows, scores)
+        self._lock = threading.Lock()
+        self._pending = []
+        self._pending_rows = 0
+        self._wakeup = None
+        # Set by the background writer after each batch it writes
+        self._drained = None
+
+        # The file is opened on the first write, so a log created before
+        # serve.py forks its workers gets one handle per worker
+        self._write_lock = threading.Lock()
+        self._handle = None
+        self._executor = None
+        self._closed = False
+
+        # Observability counters
+        self.records = 0
+        self.written = 0
+        self.dropped = 0
+        self.write_errors = 0
+        self.flushes = 0
+        self.backpressure_waits = 0
+        self.total_flush_time = 0.0
+        self.max_flush_time = 0.0
+        self.max_buffer_depth = 0
+
+        atexit.register(self.close)
+
+    async def record(self, endpoint, model_version, latency_ms, inputs, score):
+        """Buffer one prediction (`inputs` is a sequence of the six raw values)."""
+        await self._append((time.time(), endpoint, model_version, latency_ms, (inputs,), (score,)), 1)
+
+    async def record_many(self, endpoint, model_version, latency_ms, rows, scores):
+        """Buffer a block of predictions that share one request (rows is (n, 6), scores n values)."""
+        if len(rows):
+            await self._append((time.time(), endpoint, model_version, latency_ms, rows, scores), len(rows))
+
+    async def _append(self, entry, n_rows):
+        while True:
+            with self._lock:
+                if self._pending_rows + n_rows <= self.max_buffer or not self._pending:
+                    self._pending.append(entry)
+                    self._pending_rows += n_rows
+                    self.records += n_rows
+                    self.max_buffer_depth = max(self.max_buffer_depth, self._pending_rows)
+                    full = self._pending_rows >= self.flush_size
+                    break
+                if self.overflow == 'drop':
+                    self.dropped += n_rows
+                    return
+                self.backpressure_waits += 1
+            # Backpressure: wait for room without holding up the event loop
+            await self._wait_for_room()
+        if full and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _wait_for_room(self):
+        """Let the background writer drain the buffer, or drain it on a thread if none is running."""
+        if self._drained is not None:
+            self._drained.clear()
+            self._wakeup.set()
+            await self._drained.wait()
+        else:
+            with self._lock:
+                pending = self._swap()
+            await asyncio.to_thread(self._write, pending)
+
+    def _swap(self):
+        """Take the buffered entries (lock held)."""
+        pending, self._pending = self._pending, []
+        self._pending_rows = 0
+        return pending
+
+    def flush(self):
+        """Write everything buffered so far, synchronously."""
+        with self._lock:
+            pending = self._swap()
+        self._write(pending)
+
+    async def run(self):
+        """Background task: write the buffer in batches until cancelled."""
+        loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._drained = asyncio.Event()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='audit-log')
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                with self._lock:
+                    pending = self._swap()
+                if pending:
+                    # Shielded so a cancellation mid-write still lets the batch finish
+                    await asyncio.shield(loop.run_in_executor(self._executor, self._write, pending))
+                self._drained.set()
+        finally:
+            # Producers waiting for room drain the buffer themselves from now on
+            drained, self._drained, self._wakeup = self._drained, None, None
+            drained.set()
+
+    def close(self):
+        """Flush the remaining records and close the file; safe to call more than once."""
+        if self._closed:
+            return
+        self._closed = True
+        # Let a batch already handed to the writer thread finish first, so
+        # the file keeps the order the records were made in
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self.flush()
+        with self._write_lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+    def _write(self, pending):
+        """Append a list of buffered entries in one batch."""
+        if not pending:
+            return
+        start = time.perf_counter()
+        n_rows = sum(len(entry[4]) for entry in pending)
+        with self._write_lock:
+            try:
+                if self.sqlite:
+                    self._write_sqlite(pending)
+                else:
+                    self._write_jsonl(pending)
+            except (OSError, sqlite3.Error) as e:
+                self.write_errors += n_rows
+                print(f"Audit log write of {n_rows} records to {self.path} failed: {e}")
+                return
+        elapsed = time.perf_counter() - start
+        self.written += n_rows
+        self.flushes += 1
+        self.total_flush_time += elapsed
+        self.max_flush_time = max(self.max_flush_time, elapsed)
+
+    def _write_jsonl(self, pending):
+        if self._handle is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._handle = open(self.path, 'a', encoding='utf-8')
+        # The fields shared by a request are encoded once and the numbers of
+        # each row formatted directly, several times cheaper than json.dumps
+        # per record (this runs on the writer thread but still holds the GIL)
+        row_format = '{}"predicted_score": {!r}, "inputs": {{' + ', '.join(
+            f'"{name}": {{!r}}' for name in RAW_FEATURES
+        ) + '}}}}'
+        sources = {}
+        lines = []
+        for ts, endpoint, model_version, latency_ms, rows, scores in pending:
+            source = sources.get((endpoint, model_version))
+            if source is None:
+                source = sources[endpoint, model_version] = (
+                    f'"endpoint": {json.dumps(endpoint)}, "model_version": {json.dumps(model_version)}, ')
+            prefix = f'{{"ts": {ts!r}, {source}"latency_ms": {latency_ms!r}, '
+            for inputs, score in zip(_as_list(rows), _as_list(scores)):
+                lines.append(row_format.format(prefix, float(score), *map(float, inputs)))
+        lines.append('')
+        # One write per batch; O_APPEND keeps batches from several workers whole
+        self._handle.write('\n'.join(lines))
+        self._handle.flush()
+
+    def _write_sqlite(self, pending):
+        if self._handle is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._handle = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            columns = ', '.join(f'{name} REAL' for name in RAW_FEATURES)
+            self._handle.execute(
+                'CREATE TABLE IF NOT EXISTS predictions (ts REAL, endpoint TEXT, model_version TEXT, '
+                f'latency_ms REAL, predicted_score REAL, {columns})'
+            )
+            self._handle.commit()
+        placeholders = ', '.join('?' * (5 + len(RAW_FEATURES)))
+        with self._handle:
+            self._handle.executemany(
+                f'INSERT INTO predictions VALUES ({placeholders})',
+                [
+                    (ts, endpoint, model_version, latency_ms, score, *inputs)
+                    for ts, endpoint, model_version, latency_ms, rows, scores in pending
+                    for inputs, score in zip(_as_list(rows), _as_list(scores))
+                ]
+            )
+
+    @property
+    def buffer_depth(self):
+        return self._pending_rows
+
+    def stats(self):
+        """Snapshot of buffered, written and dropped records and flush timings."""
+        return {
+            "path": self.path,
+            "format": "sqlite" if self.sqlite else "jsonl",
+            "flush_size": self.flush_size,
+            "flush_interval_s": self.flush_interval,
+            "max_buffer": self.max_buffer,
+            "overflow": self.overflow,
+            "records": self.records,
+            "written": self.written,
+            "buffer_depth": self.buffer_depth,
+            "max_buffer_depth": self.max_buffer_depth,
+            "dropped": self.dropped,
+            "write_errors": self.write_errors,
+            "flushes": self.flushes,
+            "backpressure_waits": self.backpressure_waits,
+            "mean_flush_ms": self.total_flush_time / self.flushes * 1000.0 if self.flushes else 0.0,
+            "max_flush_ms": self.max_flush_time * 1000.0
+        }
+
+
+def _as_list(values):
+    """Plain Python values for the writer (NumPy arrays are converted in one call)."""
+    return values.tolist() if hasattr(values, 'tolist') else values
@@ -0,0 +1,117 @@
+"""
+Asyncio micro-batching for single-record prediction requests.
+
+Concurrent /predict calls are held for at most `window_ms` (or until
+`max_batch_size` requests are waiting) and then scored together with one
+vectorized model call. Each caller still awaits its own result.
+"""
+
+import asyncio
+import time
+
+import numpy as np
+
+
+class MicroBatcher:
+    """Groups concurrent single-row predictions into vectorized batches."""
+
+    def __init__(self, score_batch, window_ms=2.0, max_batch_size=64):
+        # score_batch: callable taking an (n, 6) array and returning n scores
+        self.score_batch = score_batch
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+
+        self._pending = []
+        self._timer = None
+
+        # Observability counters
+        self.requests = 0
+        self.batches = 0
+        self.max_queue_depth = 0
+        self.batch_size_counts = {}
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.wait_buckets_ms = [0.5, 1, 2, 5, 10, 25, 50]
+        self.wait_bucket_counts = [0] * (len(self.wait_buckets_ms) + 1)
+
+    async def submit(self, row):
+        """Queue one raw input row and wait for its predicted score."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, future, time.perf_counter()))
+        self.requests += 1
+        self.max_queue_depth = max(self.max_queue_depth, len(self._pending))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Score everything currently queued and resolve the waiting futures."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        started = time.perf_counter()
+        self.batches += 1
+        self.batch_size_counts[len(pending)] = self.batch_size_counts.get(len(pending), 0) + 1
+        for _, _, enqueued in pending:
+            self._record_wait(started - enqueued)
+
+        try:
+            scores = self.score_batch(np.array([row for row, _, _ in pending], dtype=np.float64))
+        except Exception as e:
+            for _, future, _ in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), score in zip(pending, scores.tolist()):
+            # The client may have gone away while waiting
+            if not future.done():
+                future.set_result(score)
+
+    def _record_wait(self, wait):
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        wait_ms = wait * 1000.0
+        for i, bound in enumerate(self.wait_buckets_ms):
+            if wait_ms <= bound:
+                self.wait_bucket_counts[i] += 1
+                return
+        self.wait_bucket_counts[-1] += 1
+
+    @property
+    def queue_depth(self):
+        """Requests currently waiting for their batch to be scored."""
+        return len(self._pending)
+
+    def stats(self):
+        """Snapshot of queue depth, batch-size distribution and added wait time."""
+        wait_histogram = {
+            f"le_{bound}ms": count
+            for bound, count in zip(self.wait_buckets_ms, self.wait_bucket_counts)
+        }
+        wait_histogram[f"gt_{self.wait_buckets_ms[-1]}ms"] = self.wait_bucket_counts[-1]
+        scored = sum(self.wait_bucket_counts)
+
+        return {
+            "window_ms": self.window * 1000.0,
+            "max_batch_size": self.max_batch_size,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": scored / self.batches if self.batches else 0.0,
+            "batch_size_distribution": dict(sorted(self.batch_size_counts.items())),
+            "mean_wait_ms": self.total_wait / scored * 1000.0 if scored else 0.0,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "wait_histogram": wait_histogram
+        }
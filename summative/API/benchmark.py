@@ -0,0 +1,682 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the Student Performance Prediction API.
+
+Runs in-process microbenchmarks of the inference path, then starts
+prediction.py and simple_api.py locally with uvicorn and drives them with a
+concurrent asyncio load generator, reporting throughput and p50/p95/p99
+latency per endpoint. Requests carry random inputs within the API bounds, so
+prediction cache hits are only measured where named (predict_repeated).
+Results are written as JSON so runs can be compared.
+
+Usage:
+    python benchmark.py                               # everything, results in benchmark_results.json
+    python benchmark.py --concurrency 32 --requests 5000
+    python benchmark.py --skip-load                   # microbenchmarks only
+    python benchmark.py --skip-load --skip-micro --workers 1,2,4   # serve.py worker scaling only
+    python benchmark.py --compare old_results.json    # show changes against an earlier run
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import urllib.request
+
+import joblib
+import numpy as np
+
+from artifact import ARTIFACT_FILE
+from audit import AuditLog
+from inference import FusedLinearModel
+from metrics import Metrics
+from registry import PICKLE_FILES, ModelVersion
+from tree_engine import CompiledTreeEnsemble
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# A representative request, already expanded to the 9 model features
+SAMPLE_FEATURES = np.array([20, 8, 90, 85, 5, 4, 18.0, 8 / 21, 76.5], dtype=float)
+
+SAMPLE_INPUT = {
+    "study_hours": 20,
+    "sleep_hours": 8,
+    "attendance_rate": 90,
+    "previous_test_score": 85,
+    "extracurricular_hours": 5,
+    "stress_level": 4
+}
+
+# Apps started for the load test and the endpoints driven against each
+LOAD_TARGETS = {
+    'prediction': ['health', 'predict', 'predict_repeated', 'predict_batch_100', 'predict_sweep_41x9'],
+    'simple_api': ['health', 'predict'],
+}
+
+
+def random_inputs(rng, n):
+    """`n` request bodies' worth of inputs drawn uniformly within INPUT_BOUNDS (2 decimals)"""
+    from prediction import INPUT_BOUNDS, INPUT_FEATURES
+
+    bounds = np.array([INPUT_BOUNDS[name] for name in INPUT_FEATURES], dtype=float)
+    rows = rng.uniform(bounds[:, 0], bounds[:, 1], size=(n, len(INPUT_FEATURES))).round(2)
+    return [dict(zip(INPUT_FEATURES, row)) for row in rows.tolist()]
+
+
+# Each endpoint: (method, path, body factory). Factories get a NumPy Generator,
+# so every request carries different inputs and /predict is measured without
+# prediction cache hits; 'predict_repeated' sends one input over and over to
+# measure the cache-hit path on its own
+ENDPOINTS = {
+    'health': ('GET', '/health', lambda rng: b''),
+    'predict': ('POST', '/predict', lambda rng: json.dumps(random_inputs(rng, 1)[0]).encode()),
+    'predict_repeated': ('POST', '/predict', lambda rng: json.dumps(SAMPLE_INPUT).encode()),
+    'predict_batch_100': ('POST', '/predict/batch',
+                          lambda rng: json.dumps({"students": random_inputs(rng, 100)}).encode()),
+    'predict_sweep_41x9': ('POST', '/predict/sweep', lambda rng: json.dumps({
+        "base": random_inputs(rng, 1)[0],
+        "axes": [{"feature": "study_hours", "steps": 41}, {"feature": "sleep_hours", "steps": 9}]
+    }).encode()),
+}
+
+
+def time_per_call(func, number):
+    """Best-of-5 wall time per call in microseconds"""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def bench_fused_kernel():
+    """Compare per-call latency of sklearn scaler+predict against the fused kernel"""
+    model = joblib.load(os.path.join(API_DIR, 'best_model.pkl'))
+    scaler = joblib.load(os.path.join(API_DIR, 'scaler.pkl'))
+    fused = FusedLinearModel.from_sklearn(model, scaler)
+    if fused is None:
+        print("Deployed model is not linear, fused kernel not available")
+        return {}
+
+    single = SAMPLE_FEATURES.reshape(1, -1)
+    batch = np.tile(SAMPLE_FEATURES, (5000, 1))
+
+    results = {
+        'sklearn_single_us': time_per_call(lambda: model.predict(scaler.transform(single)), 2000),
+        'fused_single_us': time_per_call(lambda: fused.predict_one(SAMPLE_FEATURES), 20000),
+        'sklearn_batch_5000_us': time_per_call(lambda: model.predict(scaler.transform(batch)), 200),
+        'fused_batch_5000_us': time_per_call(lambda: fused.predict(batch), 200),
+    }
+
+    print("Fused scaler+linear kernel")
+    print("-" * 50)
+    print(f"Single row   sklearn: {results['sklearn_single_us']:9.2f} us/call")
+    print(f"Single row   fused:   {results['fused_single_us']:9.2f} us/call "
+          f"({results['sklearn_single_us'] / results['fused_single_us']:.0f}x)")
+    print(f"5000 rows    sklearn: {results['sklearn_batch_5000_us']:9.2f} us/call")
+    print(f"5000 rows    fused:   {results['fused_batch_5000_us']:9.2f} us/call "
+          f"({results['sklearn_batch_5000_us'] / results['fused_batch_5000_us']:.0f}x)")
+    return results
+
+
+def bench_tree_engine():
+    """sklearn predict vs the flattened tree engine for a decision tree and a 100-tree forest"""
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.tree import DecisionTreeRegressor
+
+    from features import FEATURE_TRANSFORMER
+
+    # Trained on synthetic rows of the same size as train_model's dataset
+    rng = np.random.default_rng(42)
+    raw = rng.uniform([0, 4, 50, 30, 0, 1], [40, 12, 100, 100, 20, 10], size=(6000, 6))
+    X = FEATURE_TRANSFORMER.transform(raw)
+    y = 0.4 * X[:, 0] + 0.3 * X[:, 3] - 0.1 * X[:, 5] + rng.normal(0, 3, len(X))
+    scaler = StandardScaler().fit(X[:800])
+    single = X[1000]
+    batch = X[1000:]
+
+    print("\nFlattened tree engine")
+    print("-" * 50)
+    results = {}
+    for label, model in (('tree', DecisionTreeRegressor(random_state=42)),
+                         ('forest', RandomForestRegressor(n_estimators=100, random_state=42))):
+        model.fit(scaler.transform(X[:800]), y[:800])
+        compiled = CompiledTreeEnsemble.from_sklearn(model, scaler)
+        if not np.array_equal(compiled.predict(batch), model.predict(scaler.transform(batch))):
+            raise RuntimeError(f"tree engine disagrees with sklearn for the {label}")
+
+        results.update({
+            f'{label}_sklearn_single_us': time_per_call(
+                lambda: model.predict(scaler.transform(single.reshape(1, -1))), 50),
+            f'{label}_engine_single_us': time_per_call(lambda: compiled.predict_one(single), 500),
+            f'{label}_sklearn_batch_100_us': time_per_call(lambda: model.predict(scaler.transform(batch[:100])), 20),
+            f'{label}_engine_batch_100_us': time_per_call(lambda: compiled.predict(batch[:100]), 20),
+            f'{label}_sklearn_rows_per_sec': len(batch) / time_per_call(
+                lambda: model.predict(scaler.transform(batch)), 2) * 1e6,
+            f'{label}_engine_rows_per_sec': len(batch) / time_per_call(lambda: compiled.predict(batch), 2) * 1e6,
+        })
+        print(f"{label:7s} single row  sklearn {results[f'{label}_sklearn_single_us']:9.1f} us   "
+              f"engine {results[f'{label}_engine_single_us']:9.1f} us")
+        print(f"{label:7s} 100 rows    sklearn {results[f'{label}_sklearn_batch_100_us']:9.1f} us   "
+              f"engine {results[f'{label}_engine_batch_100_us']:9.1f} us")
+        print(f"{label:7s} throughput  sklearn {results[f'{label}_sklearn_rows_per_sec']:9.0f} rows/s   "
+              f"engine {results[f'{label}_engine_rows_per_sec']:9.0f} rows/s")
+    return results
+
+
+def bench_metrics_overhead():
+    """Cost of one stage mark with metrics enabled and disabled"""
+    enabled = Metrics(enabled=True).timer()
+    disabled = Metrics(enabled=False).timer()
+
+    results = {
+        'stage_mark_enabled_us': time_per_call(lambda: enabled.mark('predict'), 200000),
+        'stage_mark_disabled_us': time_per_call(lambda: disabled.mark('predict'), 200000),
+    }
+
+    print("\nStage instrumentation overhead")
+    print("-" * 50)
+    print(f"Enabled:  {results['stage_mark_enabled_us'] * 1000:7.1f} ns/stage")
+    print(f"Disabled: {results['stage_mark_disabled_us'] * 1000:7.1f} ns/stage")
+    return results
+
+
+def bench_audit_log():
+    """Cost a request pays to record into the audit log, and the batched write cost"""
+    row = [20.0, 8.0, 90.0, 85.0, 5.0, 4.0]
+
+    async def record_cost(log, number):
+        """Best-of-5 microseconds per awaited record()"""
+        best = float('inf')
+        for _ in range(5):
+            start = time.perf_counter()
+            for _ in range(number):
+                await log.record('/predict', 'v1', 0.5, row, 57.52)
+            best = min(best, time.perf_counter() - start)
+        return best / number * 1e6
+
+    async def record_many(log, number):
+        for _ in range(number):
+            await log.record('/predict', 'v1', 0.5, row, 57.52)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt, name in (('jsonl', 'audit.jsonl'), ('sqlite', 'audit.db')):
+            # Large buffer so the timed calls only append; the write is timed separately
+            log = AuditLog(os.path.join(directory, name), flush_size=10 ** 9, max_buffer=10 ** 9)
+            results[f'audit_record_{fmt}_us'] = asyncio.run(record_cost(log, 100000))
+            log.flush()
+            asyncio.run(record_many(log, 1000))
+            start = time.perf_counter()
+            log.flush()
+            results[f'audit_write_1000_{fmt}_ms'] = (time.perf_counter() - start) * 1000
+            log.close()
+
+    print("\nAudit log")
+    print("-" * 50)
+    for fmt in ('jsonl', 'sqlite'):
+        print(f"{fmt:6s} record: {results[f'audit_record_{fmt}_us'] * 1000:7.1f} ns/request   "
+              f"batch write: {results[f'audit_write_1000_{fmt}_ms']:6.2f} ms/1000 records (background)")
+    return results
+
+
+def bench_request_path():
+    """Per-call cost of the prediction functions behind /predict and /predict/batch"""
+    import prediction
+
+    rows = [tuple(inputs.values()) for inputs in random_inputs(np.random.default_rng(0), 1000)]
+    raw = np.array(rows)
+    next_row = itertools.cycle(rows).__next__
+
+    results = {
+        'predict_student_performance_us': time_per_call(
+            lambda: prediction.predict_student_performance(*next_row()), 5000),
+        'build_feature_matrix_1000_us': time_per_call(lambda: prediction.build_feature_matrix(raw), 500),
+        'predict_batch_scores_1000_us': time_per_call(lambda: prediction.predict_batch_scores(raw), 500),
+    }
+
+    print("\nRequest path functions")
+    print("-" * 50)
+    print(f"predict_student_performance:       {results['predict_student_performance_us']:9.2f} us/call")
+    print(f"build_feature_matrix (1000 rows):  {results['build_feature_matrix_1000_us']:9.2f} us/call")
+    print(f"predict_batch_scores (1000 rows):  {results['predict_batch_scores_1000_us']:9.2f} us/call")
+    return results
+
+
+def bench_float32_batch():
+    """Batch scoring with float64 and with the float32 kernel, and their largest difference"""
+    version = ModelVersion.load(API_DIR)
+    if not version.enable_float32(tolerance=float('inf')):
+        print("Deployed model is not linear, float32 batch kernel not available")
+        return {}
+    raw = np.random.default_rng(0).uniform([0, 4, 50, 30, 0, 1], [40, 12, 100, 100, 20, 10], size=(100000, 6))
+    features64 = version.transformer.transform(raw)
+    features32 = version.batch_features(raw)
+
+    results = {
+        'batch_float64_100000_us': time_per_call(lambda: version.fused.predict(version.transformer.transform(raw)), 20),
+        'batch_float32_100000_us': time_per_call(lambda: version.predict(version.batch_features(raw)), 20),
+        'batch_float32_max_deviation': version.float32_deviation,
+        'batch_features_float64_mb': features64.nbytes / 2 ** 20,
+        'batch_features_float32_mb': features32.nbytes / 2 ** 20,
+    }
+
+    print("\nBatch precision (100000 rows, features + predict)")
+    print("-" * 50)
+    print(f"float64: {results['batch_float64_100000_us']:9.2f} us/call   "
+          f"features {results['batch_features_float64_mb']:.1f} MB")
+    print(f"float32: {results['batch_float32_100000_us']:9.2f} us/call   "
+          f"features {results['batch_features_float32_mb']:.1f} MB "
+          f"({results['batch_float64_100000_us'] / results['batch_float32_100000_us']:.1f}x)")
+    print(f"Max deviation on the check sample: {version.float32_deviation:.2e}")
+    return results
+
+
+def asgi_post_cost(app, path, bodies, number):
+    """Best-of-5 microseconds per in-process ASGI POST (no sockets, no HTTP parsing), cycling through `bodies`"""
+    requests = []
+    for body in bodies:
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'POST',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'root_path': '', 'query_string': b'',
+            'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())],
+            'client': ('127.0.0.1', 1), 'server': ('127.0.0.1', 8000),
+        }
+        requests.append((scope, {'type': 'http.request', 'body': body, 'more_body': False}))
+
+    async def send(message):
+        if message['type'] == 'http.response.start' and message['status'] != 200:
+            raise RuntimeError(f"{path} returned {message['status']}")
+
+    async def run():
+        best = float('inf')
+        for _ in range(5):
+            start = time.perf_counter()
+            for i in range(number):
+                scope, request = requests[i % len(requests)]
+
+                async def receive():
+                    return request
+
+                await app(dict(scope), receive, send)
+            best = min(best, time.perf_counter() - start)
+        return best / number * 1e6
+
+    return asyncio.run(run())
+
+
+def bench_fast_path():
+    """Per-request cost of /predict through FastAPI + pydantic and through the fast path"""
+    import prediction
+    from fastapi import FastAPI
+    from fastpath import FastPathMiddleware
+
+    # Same endpoint function, with and without the fast path in front of it;
+    # no other middleware, so the difference is validation and serialization
+    standard = FastAPI()
+    standard.post("/predict", response_model=prediction.PredictionResponse)(prediction.predict_performance)
+    fast = FastAPI()
+    fast.post("/predict", response_model=prediction.PredictionResponse)(prediction.predict_performance)
+    fast.add_middleware(FastPathMiddleware, path='/predict', handler=prediction.predict_performance_fast)
+
+    # Distinct inputs with the prediction cache off, so every request is
+    # scored; cache hits (one input repeated, cache on) are reported apart
+    bodies = [json.dumps(inputs).encode() for inputs in random_inputs(np.random.default_rng(0), 2000)]
+    repeated = [json.dumps(SAMPLE_INPUT).encode()]
+    cache = prediction.prediction_cache
+    prediction.prediction_cache = None
+    try:
+        results = {
+            'predict_pydantic_path_us': asgi_post_cost(standard, '/predict', bodies, 2000),
+            'predict_fast_path_us': asgi_post_cost(fast, '/predict', bodies, 2000),
+        }
+    finally:
+        prediction.prediction_cache = cache
+    if cache is not None:
+        results['predict_fast_path_cache_hit_us'] = asgi_post_cost(fast, '/predict', repeated, 2000)
+
+    print("\n/predict request path (in-process ASGI, cache off)")
+    print("-" * 50)
+    print(f"FastAPI + pydantic: {results['predict_pydantic_path_us']:8.2f} us/request")
+    print(f"Fast path:          {results['predict_fast_path_us']:8.2f} us/request "
+          f"({results['predict_pydantic_path_us'] / results['predict_fast_path_us']:.1f}x)")
+    if cache is not None:
+        print(f"Fast path, cache hit: {results['predict_fast_path_cache_hit_us']:6.2f} us/request")
+    return results
+
+
+def bench_model_loading():
+    """Time to load, self-check and activate the model artifacts"""
+    from registry import ModelVersion
+
+    def load():
+        ModelVersion.load(API_DIR).self_check()
+
+    results = {'model_load_ms': time_per_call(load, 10) / 1000}
+
+    print("\nModel loading")
+    print("-" * 50)
+    print(f"Load + self-check: {results['model_load_ms']:9.2f} ms")
+    return results
+
+
+# Run in a fresh interpreter: import the app, then make the first prediction
+COLD_START_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import prediction
+imported = time.perf_counter()
+prediction.predict_student_performance(20, 8, 90, 85, 5, 4)
+predicted = time.perf_counter()
+print(json.dumps({'import_ms': (imported - start) * 1000, 'first_predict_ms': (predicted - imported) * 1000,
+                  'format': prediction.registry.active.artifact_format}))
+"""
+
+
+def bench_cold_start(runs=5):
+    """Import + first-prediction time of a fresh process, model.bin vs the pickles"""
+    if not os.path.exists(os.path.join(API_DIR, ARTIFACT_FILE)):
+        print(f"\nNo {ARTIFACT_FILE} in the API directory, skipping cold-start benchmark")
+        return {}
+
+    results = {}
+    with tempfile.TemporaryDirectory() as pickle_dir:
+        # Same model, pickled artifacts only
+        for name in PICKLE_FILES:
+            shutil.copy(os.path.join(API_DIR, name), pickle_dir)
+
+        print(f"\nCold start (fresh process, median of {runs} runs)")
+        print("-" * 50)
+        for label, model_dir in (('artifact', API_DIR), ('pickle', pickle_dir)):
+            samples = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                output = subprocess.run(
+                    [sys.executable, '-c', COLD_START_SCRIPT], cwd=API_DIR, capture_output=True, text=True,
+                    env={**os.environ, 'MODEL_DIR': model_dir}, check=True
+                ).stdout
+                sample = json.loads(output.strip().splitlines()[-1])
+                if sample['format'] != label:
+                    raise RuntimeError(f"expected the {label} path, the app loaded {sample['format']}")
+                sample['process_ms'] = (time.perf_counter() - started) * 1000
+                samples.append(sample)
+
+            for metric in ('import_ms', 'first_predict_ms', 'process_ms'):
+                results[f'cold_start_{label}_{metric}'] = statistics.median(s[metric] for s in samples)
+            print(f"{label:9s} import {results[f'cold_start_{label}_import_ms']:8.1f} ms   "
+                  f"first prediction {results[f'cold_start_{label}_first_predict_ms']:6.2f} ms   "
+                  f"whole process {results[f'cold_start_{label}_process_ms']:8.1f} ms")
+    return results
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(module, port, env=None, argv=None):
+    """Start `module:app` under uvicorn (or the given command line) and wait until /health answers"""
+    argv = argv or [sys.executable, '-m', 'uvicorn', f'{module}:app', '--host', '127.0.0.1',
+                    '--port', str(port), '--log-level', 'warning']
+    process = subprocess.Popen(
+        argv,
+        cwd=API_DIR, env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{module} exited with code {process.returncode}")
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=1).read()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"{module} did not become healthy on port {port}")
+
+
+async def send_request(reader, writer, method, path, body):
+    """Send one HTTP/1.1 keep-alive request and return the status code"""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: benchmark\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    chunked = False
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+        elif name.lower() == 'transfer-encoding' and 'chunked' in value:
+            chunked = True
+
+    if chunked:
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(length)
+    return status
+
+
+async def drive_endpoint(port, endpoint, concurrency, total_requests, seed=0):
+    """Fire `total_requests` at one endpoint over `concurrency` connections"""
+    method, path, make_body = ENDPOINTS[endpoint]
+    # Bodies are built up front so the timed loop only sends them
+    rng = np.random.default_rng(seed)
+    bodies = [make_body(rng) for _ in range(total_requests)]
+    latencies = []
+    errors = 0
+    remaining = total_requests
+
+    async def worker():
+        nonlocal remaining, errors
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        try:
+            while remaining > 0:
+                remaining -= 1
+                body = bodies[remaining]
+                start = time.perf_counter()
+                status = await send_request(reader, writer, method, path, body)
+                latencies.append(time.perf_counter() - start)
+                if status >= 400:
+                    errors += 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'concurrency': concurrency,
+        'throughput_rps': len(latencies) / elapsed,
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p95_ms': float(np.percentile(latencies_ms, 95)),
+        'p99_ms': float(np.percentile(latencies_ms, 99)),
+        'max_ms': float(latencies_ms.max()),
+    }
+
+
+def bench_load(concurrency, total_requests, server_env=None):
+    """Start each app locally and drive every endpoint with the load generator"""
+    results = {}
+    for module, endpoints in LOAD_TARGETS.items():
+        port = free_port()
+        process = start_server(module, port, server_env)
+        try:
+            print(f"\nLoad test: {module} ({concurrency} connections, {total_requests} requests/endpoint)")
+            print("-" * 50)
+            for endpoint in endpoints:
+                # Short warm-up so first-request costs do not skew the tail
+                asyncio.run(drive_endpoint(port, endpoint, concurrency, concurrency * 5, seed=1))
+                result = asyncio.run(drive_endpoint(port, endpoint, concurrency, total_requests))
+                results[f'{module}:{endpoint}'] = result
+                print(f"{endpoint:18s} {result['throughput_rps']:8.0f} req/s   "
+                      f"p50 {result['p50_ms']:6.2f} ms   p95 {result['p95_ms']:6.2f} ms   "
+                      f"p99 {result['p99_ms']:6.2f} ms   errors {result['errors']}")
+        finally:
+            process.terminate()
+            process.wait()
+    return results
+
+
+def process_tree_pss_mb(pid):
+    """Proportional set size of a process and its children in MB (Linux only, else None)"""
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as f:
+            pids = [pid] + [int(child) for child in f.read().split()]
+        total_kb = 0
+        for member in pids:
+            with open(f'/proc/{member}/smaps_rollup') as f:
+                total_kb += next(int(line.split()[1]) for line in f if line.startswith('Pss:'))
+        return total_kb / 1024
+    except (OSError, StopIteration):
+        return None
+
+
+def default_worker_counts():
+    cores = os.cpu_count() or 1
+    counts = {1, 2, cores}
+    counts.update(2 ** i for i in range(cores.bit_length()) if 2 ** i <= cores)
+    return sorted(counts)
+
+
+def bench_workers(worker_counts, concurrency, total_requests):
+    """/predict throughput of serve.py with each worker count, plus memory against `uvicorn --workers`"""
+    results = {}
+    print(f"\nWorker scaling: serve.py /predict ({concurrency} connections, {total_requests} requests, "
+          f"{os.cpu_count()} cores)")
+    print("-" * 50)
+    for workers in worker_counts:
+        port = free_port()
+        process = start_server('serve', port, argv=[
+            sys.executable, 'serve.py', '--host', '127.0.0.1', '--port', str(port),
+            '--workers', str(workers), '--log-level', 'warning'
+        ])
+        try:
+            # Warm every worker before measuring
+            asyncio.run(drive_endpoint(port, 'predict', concurrency, concurrency * 10, seed=1))
+            result = asyncio.run(drive_endpoint(port, 'predict', concurrency, total_requests))
+            result['workers'] = workers
+            result['pss_mb'] = process_tree_pss_mb(process.pid)
+        finally:
+            process.terminate()
+            process.wait()
+        results[f'serve_{workers}_workers'] = result
+        memory = f"{result['pss_mb']:6.1f} MB" if result['pss_mb'] is not None else "   n/a"
+        print(f"{workers:3d} worker(s) {result['throughput_rps']:8.0f} req/s   p50 {result['p50_ms']:6.2f} ms   "
+              f"p99 {result['p99_ms']:6.2f} ms   memory (PSS, all processes) {memory}")
+
+    # Same worker count through uvicorn's own spawn-based workers, for memory
+    workers = worker_counts[-1]
+    port = free_port()
+    process = start_server('prediction', port, argv=[
+        sys.executable, '-m', 'uvicorn', 'prediction:app', '--host', '127.0.0.1', '--port', str(port),
+        '--workers', str(workers), '--log-level', 'warning'
+    ])
+    try:
+        asyncio.run(drive_endpoint(port, 'predict', concurrency, concurrency * 10, seed=1))
+        pss_mb = process_tree_pss_mb(process.pid)
+    finally:
+        process.terminate()
+        process.wait()
+    if pss_mb is not None:
+        results[f'uvicorn_{workers}_workers_pss_mb'] = pss_mb
+        print(f"uvicorn --workers {workers}: memory (PSS, all processes) {pss_mb:6.1f} MB")
+    return results
+
+
+def compare(previous, current):
+    """Print the relative change of every shared numeric result"""
+    print("\nChange against previous run")
+    print("-" * 50)
+    for section, values in current.items():
+        if section == 'meta' or section not in previous:
+            continue
+        for name, value in values.items():
+            old = previous[section].get(name)
+            if isinstance(value, dict):
+                for metric in ('throughput_rps', 'p50_ms', 'p99_ms'):
+                    if isinstance(old, dict) and old.get(metric):
+                        change = (value[metric] - old[metric]) / old[metric] * 100
+                        print(f"{name} {metric}: {old[metric]:.2f} -> {value[metric]:.2f} ({change:+.1f}%)")
+            elif isinstance(value, (int, float)) and old:
+                change = (value - old) / old * 100
+                print(f"{name}: {old:.3f} -> {value:.3f} ({change:+.1f}%)")
+
+
+def main():
+    """Run the benchmark suite"""
+    parser = argparse.ArgumentParser(description="Student Performance Prediction API benchmarks")
+    parser.add_argument('--concurrency', type=int, default=16, help="concurrent connections per endpoint")
+    parser.add_argument('--requests', type=int, default=2000, help="requests per endpoint")
+    parser.add_argument('--skip-load', action='store_true', help="only run in-process microbenchmarks")
+    parser.add_argument('--skip-micro', action='store_true', help="only run the HTTP load test")
+    parser.add_argument('--workers', help="comma-separated serve.py worker counts to compare "
+                                          "(default: 1, 2, powers of two up to the core count)")
+    parser.add_argument('--skip-workers', action='store_true', help="skip the serve.py worker scaling test")
+    parser.add_argument('--output', default='benchmark_results.json', help="where to write the JSON results")
+    parser.add_argument('--compare', help="earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    print("Student Performance Prediction API Benchmarks")
+    print("=" * 50)
+
+    results = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        }
+    }
+    if not args.skip_micro:
+        results['micro'] = {
+            **bench_fused_kernel(),
+            **bench_tree_engine(),
+            **bench_metrics_overhead(),
+            **bench_audit_log(),
+            **bench_request_path(),
+            **bench_fast_path(),
+            **bench_float32_batch(),
+            **bench_model_loading(),
+            **bench_cold_start(),
+        }
+    if not args.skip_load:
+        results['load'] = bench_load(args.concurrency, args.requests)
+    if not args.skip_workers and hasattr(os, 'fork'):
+        counts = [int(n) for n in args.workers.split(',')] if args.workers else default_worker_counts()
+        results['workers'] = bench_workers(counts, args.concurrency, args.requests)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Bounded LRU cache for single-student predictions.
+
+Keys are the six raw inputs, optionally snapped to a quantization step so that
+slider-driven values collapse onto the same entry; snapped values are clipped
+to the inputs' valid range. Every entry belongs to a
+model version; asking for a different version empties the cache.
+"""
+
+import time
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """LRU + TTL cache of predicted scores keyed on (quantized) input tuples."""
+
+    def __init__(self, max_size=10000, ttl_seconds=3600.0, quantum=0.0, bounds=None):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self.quantum = quantum
+        # (low, high) of each input position, or None for unbounded inputs
+        self.bounds = bounds
+        self.model_version = None
+
+        self._entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def quantize(self, values):
+        """Snap input values to the cache grid, within bounds (identity when quantum is 0)."""
+        if not self.quantum:
+            return tuple(float(v) for v in values)
+        snapped = [round(v / self.quantum) * self.quantum for v in values]
+        if self.bounds is not None:
+            snapped = [min(max(v, low), high) for v, (low, high) in zip(snapped, self.bounds)]
+        return tuple(float(v) for v in snapped)
+
+    def ensure_version(self, model_version):
+        """Drop every entry if they were computed by a different model version."""
+        if model_version != self.model_version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.model_version = model_version
+
+    def get(self, key):
+        """Return the cached score for `key`, or None on a miss."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        score, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return score
+
+    def put(self, key, score):
+        """Store `score` for `key`, evicting the least recently used entry if full."""
+        self._entries[key] = (score, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        """Hit/miss/eviction counters and current occupancy."""
+        lookups = self.hits + self.misses
+        return {
+            "model_version": self.model_version,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "quantum": self.quantum,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations
+        }
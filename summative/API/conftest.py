@@ -0,0 +1,24 @@
+"""
+Shared test data: random raw inputs across INPUT_BOUNDS and their model features.
+
+Test modules import these factories (`from conftest import random_features`),
+including helpers such as test_online.trained that run outside any fixture.
+"""
+
+import numpy as np
+
+from features import FEATURE_TRANSFORMER, INPUT_BOUNDS, RAW_FEATURES
+
+# Input bounds in RAW_FEATURES order
+LOWER = np.array([INPUT_BOUNDS[name][0] for name in RAW_FEATURES], dtype=float)
+UPPER = np.array([INPUT_BOUNDS[name][1] for name in RAW_FEATURES], dtype=float)
+
+
+def random_raw(n, seed=0):
+    """(n, 6) raw inputs drawn uniformly within INPUT_BOUNDS"""
+    return np.random.default_rng(seed).uniform(LOWER, UPPER, size=(n, len(RAW_FEATURES)))
+
+
+def random_features(n, seed=0):
+    """Model features of random_raw(n, seed), derived by FEATURE_TRANSFORMER"""
+    return FEATURE_TRANSFORMER.transform(random_raw(n, seed))
@@ -0,0 +1,210 @@
+"""
+Streaming input-drift monitor for the prediction API.
+
+Live request inputs are compared with the training distribution the model's
+StandardScaler recorded (mean and scale of all nine features) and, when
+training stored one, a reference histogram of each standardized feature.
+Memory is constant: a running count/mean/M2 per feature (Welford) and one
+fixed-bin histogram per feature.
+
+The hot path only appends a request's six raw inputs to a bounded list.
+When it fills, the derived features are built for all of its rows at once
+and merged into the running statistics with Chan's batch form of Welford's
+update (batch requests are merged directly), so the per-request cost is a
+list append under a lock.
+"""
+
+import threading
+
+import numpy as np
+
+from features import FEATURE_NAMES, FEATURE_TRANSFORMER, N_FEATURES, N_RAW_FEATURES
+
+# Histogram bin edges in training standard deviations; the outermost bins
+# also catch everything below the first and above the last edge
+DEFAULT_EDGES = np.linspace(-3, 3, 13)
+
+# Added to empty histogram bins so the population stability index stays finite
+PSI_EPSILON = 1e-4
+
+
+def reference_histogram(features_scaled, edges=DEFAULT_EDGES):
+    """Training-time reference for the monitor: per-feature bin counts of standardized features."""
+    return {'edges': np.asarray(edges).tolist(), 'counts': histogram_counts(features_scaled, edges).tolist()}
+
+
+def histogram_counts(features_scaled, edges):
+    """(n_features, len(edges) + 1) bin counts of an (n, n_features) standardized matrix.
+
+    Bin i holds edges[i - 1] <= x < edges[i]. Evenly spaced edges (the default)
+    are binned arithmetically, which is several times cheaper than a search.
+    """
+    edges = np.asarray(edges, dtype=np.float64)
+    n_bins = len(edges) + 1
+    n_features = features_scaled.shape[1]
+    steps = np.diff(edges)
+    if len(edges) > 1 and np.allclose(steps, steps[0]):
+        bins = (features_scaled - edges[0]) / steps[0]
+        np.floor(bins, out=bins)
+        np.clip(bins, -1, len(edges) - 1, out=bins)
+        bins = bins.astype(np.intp) + 1
+    else:
+        bins = np.searchsorted(edges, features_scaled, side='right')
+    bins += np.arange(n_features) * n_bins
+    return np.bincount(bins.ravel(), minlength=n_features * n_bins).reshape(n_features, n_bins)
+
+
+def population_stability_index(expected, actual):
+    """PSI of each row of `actual` counts against `expected` counts."""
+    expected = expected / expected.sum(axis=1, keepdims=True) + PSI_EPSILON
+    actual = actual / np.maximum(actual.sum(axis=1, keepdims=True), 1) + PSI_EPSILON
+    return np.sum((actual - expected) * np.log(actual / expected), axis=1)
+
+
+class DriftMonitor:
+    """Constant-memory running statistics of live inputs against a training baseline.
+
+    `baseline` returns (mean, scale, reference) of the active model, or None
+    while no model is loaded; it is consulted whenever buffered rows are merged,
+    and a different mean/scale (a newly trained model) restarts the statistics.
+    """
+
+    def __init__(self, baseline, mean_threshold=0.5, std_ratio=1.5, psi_threshold=0.2,
+                 min_samples=100, buffer_rows=1024):
+        self.baseline = baseline
+        self.mean_threshold = mean_threshold
+        self.std_ratio = std_ratio
+        self.psi_threshold = psi_threshold
+        self.min_samples = min_samples
+
+        self._lock = threading.Lock()
+        self._buffer_rows = buffer_rows
+        self._pending = []
+        self.alerts = []
+        self._reset(None, None, None)
+
+    def _reset(self, mean, scale, reference):
+        self.mean = mean
+        self.scale = scale
+        self.reference = None
+        self.edges = DEFAULT_EDGES
+        if reference is not None:
+            self.edges = np.asarray(reference['edges'], dtype=np.float64)
+            self.reference = np.asarray(reference['counts'], dtype=np.float64)
+        self.count = 0
+        self.live_mean = np.zeros(N_FEATURES)
+        self.live_m2 = np.zeros(N_FEATURES)
+        self.counts = np.zeros((N_FEATURES, len(self.edges) + 1), dtype=np.int64)
+
+    def observe(self, inputs):
+        """Record one request's raw inputs (a sequence of six values, not modified afterwards)."""
+        with self._lock:
+            self._pending.append(inputs)
+            if len(self._pending) >= self._buffer_rows:
+                self._flush()
+
+    def observe_batch(self, raw):
+        """Record an (n, 6) array of raw inputs."""
+        raw = np.asarray(raw, dtype=np.float64).reshape(-1, N_RAW_FEATURES)
+        if len(raw):
+            with self._lock:
+                self._merge(raw)
+
+    def _flush(self):
+        """Merge the rows collected by observe() (lock held)."""
+        if self._pending:
+            raw = np.array(self._pending, dtype=np.float64)
+            self._pending = []
+            self._merge(raw)
+
+    def _merge(self, raw):
+        """Fold an (n, 6) block of raw inputs into the running statistics (lock held)."""
+        rows = FEATURE_TRANSFORMER.transform(raw)
+        baseline = self.baseline()
+        if baseline is None:
+            return
+        mean, scale, reference = baseline
+        if self.mean is None or not (np.array_equal(mean, self.mean) and np.array_equal(scale, self.scale)):
+            self._reset(mean, scale, reference)
+
+        # Chan et al.'s combination of two (count, mean, M2) summaries
+        n = len(rows)
+        batch_mean = rows.mean(axis=0)
+        batch_m2 = ((rows - batch_mean) ** 2).sum(axis=0)
+        delta = batch_mean - self.live_mean
+        total = self.count + n
+        self.live_mean += delta * (n / total)
+        self.live_m2 += batch_m2 + delta ** 2 * (self.count * n / total)
+        self.count = total
+
+        self.counts += histogram_counts((rows - self.mean) / self.scale, self.edges)
+        self._check()
+
+    def _check(self):
+        """Recompute the alert list, logging features that start drifting."""
+        alerts = []
+        if self.count >= self.min_samples:
+            shift = np.abs(self.live_mean - self.mean) / self.scale
+            ratio = np.sqrt(self.live_m2 / max(self.count - 1, 1)) / self.scale
+            checks = [
+                ('mean_shift', shift, self.mean_threshold, shift > self.mean_threshold),
+                ('std_ratio', ratio, self.std_ratio, (ratio > self.std_ratio) | (ratio < 1 / self.std_ratio)),
+            ]
+            if self.reference is not None:
+                psi = population_stability_index(self.reference, self.counts)
+                checks.append(('psi', psi, self.psi_threshold, psi > self.psi_threshold))
+            for kind, values, threshold, over in checks:
+                for i in np.flatnonzero(over):
+                    alerts.append({'feature': FEATURE_NAMES[i], 'kind': kind,
+                                   'value': float(values[i]), 'threshold': threshold})
+
+        known = {(alert['feature'], alert['kind']) for alert in self.alerts}
+        for alert in alerts:
+            if (alert['feature'], alert['kind']) not in known:
+                print(f"Input drift alert: {alert['feature']} {alert['kind']} "
+                      f"{alert['value']:.3f} (threshold {alert['threshold']})")
+        self.alerts = alerts
+
+    def reset(self):
+        """Forget everything observed so far (keeps the baseline)."""
+        with self._lock:
+            self._pending = []
+            self._reset(self.mean, self.scale, None if self.reference is None else {
+                'edges': self.edges, 'counts': self.reference
+            })
+            self.alerts = []
+
+    def report(self):
+        """Per-feature live vs training statistics, histograms and current alerts."""
+        with self._lock:
+            self._flush()
+            if self.mean is None:
+                return {"observations": self.count, "baseline": False, "features": {}, "alerts": []}
+
+            live_std = np.sqrt(self.live_m2 / max(self.count - 1, 1))
+            psi = population_stability_index(self.reference, self.counts) if self.reference is not None else None
+            features = {}
+            for i, name in enumerate(FEATURE_NAMES):
+                features[name] = {
+                    "training_mean": float(self.mean[i]),
+                    "training_std": float(self.scale[i]),
+                    "live_mean": float(self.live_mean[i]) if self.count else None,
+                    "live_std": float(live_std[i]) if self.count > 1 else None,
+                    "mean_shift_std": float(abs(self.live_mean[i] - self.mean[i]) / self.scale[i]) if self.count else None,
+                    "psi": float(psi[i]) if psi is not None and self.count else None,
+                    "histogram": self.counts[i].tolist(),
+                    "reference_histogram": self.reference[i].astype(int).tolist() if self.reference is not None else None
+                }
+            return {
+                "observations": self.count,
+                "baseline": True,
+                "bin_edges_std": self.edges.tolist(),
+                "thresholds": {
+                    "mean_shift_std": self.mean_threshold,
+                    "std_ratio": self.std_ratio,
+                    "psi": self.psi_threshold,
+                    "min_samples": self.min_samples
+                },
+                "features": features,
+                "alerts": list(self.alerts)
+            }
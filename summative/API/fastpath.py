@@ -0,0 +1,113 @@
+"""
+Lean request path for small JSON endpoints.
+
+FastAPI handles a request by reading the body, decoding it with the stdlib
+JSON module, validating it into a pydantic model, calling the endpoint,
+converting its return value back through the response model and encoding
+that with the stdlib JSON module again. For /predict, with six numbers in
+and four fields out, that machinery costs more than the prediction.
+
+FastPathMiddleware reads the body of one path itself, decodes it with
+orjson when it is installed, and hands the decoded value to a handler. The
+handler returns (status, body bytes), or None when the request is not a
+plain valid one. In that case the buffered body is replayed to the normal
+FastAPI route, so malformed input, unusual types and every validation error
+get exactly the response they always did.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_CONTENT_TYPE = b'application/json'
+
+if orjson is not None:
+    loads = orjson.loads
+    dumps = orjson.dumps
+    DECODE_ERRORS = (orjson.JSONDecodeError,)
+else:
+    loads = json.loads
+    DECODE_ERRORS = (ValueError, UnicodeDecodeError)
+
+    def dumps(value):
+        """Compact UTF-8 JSON, as FastAPI's JSONResponse encodes it"""
+        return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode('utf-8')
+
+
+class FastPathMiddleware:
+    """ASGI middleware answering POSTs to `path` through `handler` when it can.
+
+    `handler(data, scope)` is a coroutine taking the decoded JSON body and
+    returning (status, JSON bytes) or None to fall back to the wrapped app.
+    """
+
+    def __init__(self, app, path, handler):
+        self.app = app
+        self.path = path
+        self.handler = handler
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] != self.path or scope['method'] != 'POST' \
+                or not _is_json(scope):
+            await self.app(scope, receive, send)
+            return
+
+        chunks = []
+        while True:
+            message = await receive()
+            if message['type'] != 'http.request':
+                # Client went away while sending; let the app see it as usual
+                await self.app(scope, _replay(b''.join(chunks), message, receive), send)
+                return
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body', False):
+                break
+        body = b''.join(chunks)
+
+        result = None
+        try:
+            data = loads(body)
+        except DECODE_ERRORS:
+            pass
+        else:
+            result = await self.handler(data, scope)
+
+        if result is None:
+            await self.app(scope, _replay(body, None, receive), send)
+            return
+
+        status, content = result
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-length', str(len(content)).encode()),
+                (b'content-type', JSON_CONTENT_TYPE),
+            ]
+        })
+        await send({'type': 'http.response.body', 'body': content})
+
+
+def _is_json(scope):
+    """True if the request says its body is plain application/json"""
+    for name, value in scope['headers']:
+        if name == b'content-type':
+            return value.split(b';', 1)[0].strip().lower() == JSON_CONTENT_TYPE
+    return False
+
+
+def _replay(body, pending, receive):
+    """A receive callable that returns the already-read body first"""
+    messages = [{'type': 'http.request', 'body': body, 'more_body': pending is not None}]
+    if pending is not None:
+        messages.append(pending)
+
+    async def replay_receive():
+        if messages:
+            return messages.pop(0)
+        return await receive()
+
+    return replay_receive
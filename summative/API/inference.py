@@ -0,0 +1,132 @@
+"""
+Fast inference kernels for the Student Performance Prediction API.
+
+The deployed model is a scikit-learn estimator applied to StandardScaler output.
+For linear models both steps are affine, so they can be folded into a single
+set of coefficients at load time and evaluated without going through sklearn.
+The closed-form prediction interval of an OLS fit is folded the same way.
+
+For bulk scoring the fused kernel also has a float32 copy, fed float32
+feature matrices. Scores are clipped to 0-100 and rounded to two decimals,
+far coarser than float32 rounding, but it is only used once
+float32_deviation() has shown the difference to be small on a sample.
+"""
+
+import numpy as np
+
+
+class FusedLinearModel:
+    """Linear model with the StandardScaler folded into its weights.
+
+    predict(X) == model.predict(scaler.transform(X)) up to floating point
+    rounding, but costs a single dot product (or matmul for batches).
+    """
+
+    def __init__(self, coef, intercept, dtype=np.float64):
+        self.coef = np.ascontiguousarray(coef, dtype=dtype)
+        self.intercept = float(intercept)
+
+    @classmethod
+    def from_sklearn(cls, model, scaler):
+        """Fold `scaler` into `model`; returns None if the model is not linear."""
+        coef = getattr(model, 'coef_', None)
+        intercept = getattr(model, 'intercept_', None)
+        if coef is None or intercept is None:
+            return None
+
+        coef = np.asarray(coef, dtype=np.float64)
+        intercept = np.asarray(intercept, dtype=np.float64)
+        # Only single-output regressors can be fused into one weight vector
+        if coef.ndim != 1 or intercept.size != 1:
+            return None
+
+        mean = getattr(scaler, 'mean_', None)
+        scale = getattr(scaler, 'scale_', None)
+        return cls.from_linear(coef, intercept, mean, scale)
+
+    @classmethod
+    def from_linear(cls, coef, intercept, mean=None, scale=None):
+        """Fold a scaler given as `mean`/`scale` arrays (None: identity) into `coef`."""
+        coef = np.asarray(coef, dtype=np.float64)
+        intercept = np.asarray(intercept, dtype=np.float64)
+        mean = np.zeros_like(coef) if mean is None else np.asarray(mean, dtype=np.float64)
+        scale = np.ones_like(coef) if scale is None else np.asarray(scale, dtype=np.float64)
+
+        # model(scaler(x)) = coef . (x - mean) / scale + b
+        #                  = (coef / scale) . x + (b - (coef / scale) . mean)
+        fused_coef = coef / scale
+        fused_intercept = float(intercept.reshape(-1)[0]) - float(fused_coef @ mean)
+        return cls(fused_coef, fused_intercept)
+
+    def predict(self, features):
+        """Predict scores for an (n, 9) feature matrix."""
+        return features @ self.coef + self.intercept
+
+    def predict_one(self, features):
+        """Predict the score for a single 9-element feature vector."""
+        return float(self.coef @ features) + self.intercept
+
+    def astype(self, dtype):
+        """Copy with weights of `dtype`; its predict() expects features of that dtype."""
+        return type(self)(self.coef, self.intercept, dtype=dtype)
+
+
+def float32_deviation(kernel, transformer, raw):
+    """
+    Largest |float32 - float64| difference between the predictions of a
+    FusedLinearModel on `raw` (n, 6) input rows, features built in each precision.
+    """
+    raw = np.asarray(raw, dtype=np.float64)
+    expected = kernel.predict(transformer.transform(raw))
+    features = transformer.transform(raw, out=np.empty((len(raw), kernel.coef.size), dtype=np.float32))
+    actual = kernel.astype(np.float32).predict(features)
+    return float(np.max(np.abs(actual.astype(np.float64) - expected)))
+
+
+class FusedPredictionInterval:
+    """Closed-form OLS prediction interval with the StandardScaler folded in.
+
+    Training stores, in the scaled feature space with a leading intercept
+    column z = [1, scaler(x)], the matrix (ZᵀZ)⁻¹ of the training design, the
+    residual variance s² and the Student t quantile for the chosen confidence.
+    The interval is prediction ± t·s·sqrt(1 + zᵀ(ZᵀZ)⁻¹z). With (ZᵀZ)⁻¹ = RᵀR,
+    t·s·R·z is affine in the raw features x, so it is folded into
+    `weights` @ x + `offset` at load time and each row costs one small matvec.
+    """
+
+    def __init__(self, weights, offset, variance, confidence):
+        self.weights = np.ascontiguousarray(weights, dtype=np.float64)
+        self.offset = np.ascontiguousarray(offset, dtype=np.float64)
+        self.variance = float(variance)
+        self.confidence = float(confidence)
+
+    @classmethod
+    def from_info(cls, stats, mean=None, scale=None):
+        """Fold the `prediction_interval` entry of model_info; None if there is none."""
+        if not stats:
+            return None
+
+        xtx_inv = np.asarray(stats['xtx_inv'], dtype=np.float64)
+        n_features = len(xtx_inv) - 1
+        mean = np.zeros(n_features) if mean is None else np.asarray(mean, dtype=np.float64)
+        scale = np.ones(n_features) if scale is None else np.asarray(scale, dtype=np.float64)
+
+        # (ZᵀZ)⁻¹ = RᵀR via its eigendecomposition (clipped, in case rounding
+        # left a tiny negative eigenvalue), then fold z = [1, (x - mean) / scale]
+        eigenvalues, eigenvectors = np.linalg.eigh(xtx_inv)
+        root = np.sqrt(np.clip(eigenvalues, 0, None))[:, np.newaxis] * eigenvectors.T
+        t_s = stats['t_value'] * np.sqrt(stats['residual_variance'])
+        weights = t_s * root[:, 1:] / scale
+        offset = t_s * root[:, 0] - weights @ mean
+        return cls(weights, offset, t_s ** 2, stats['confidence'])
+
+    def half_width(self, features):
+        """Interval half-widths for an (n, 9) feature matrix."""
+        projected = features @ self.weights.T
+        projected += self.offset
+        return np.sqrt(self.variance + np.einsum('ij,ij->i', projected, projected))
+
+    def half_width_one(self, features):
+        """Interval half-width for a single 9-element feature vector."""
+        projected = self.weights @ features + self.offset
+        return float(np.sqrt(self.variance + projected @ projected))
@@ -0,0 +1,208 @@
+"""
+Low-overhead request and per-stage latency metrics in Prometheus text format.
+
+Stage timings are taken with a StageTimer: each `mark(stage)` call records the
+time since the previous mark into that stage's histogram. When metrics are
+disabled the app uses NULL_TIMER, whose `mark` does nothing, and the request
+middleware is not installed at all.
+"""
+
+from bisect import bisect_left
+from time import perf_counter
+
+# Histogram bucket upper bounds in seconds
+STAGE_BUCKETS = (
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+    1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 0.1
+)
+REQUEST_BUCKETS = (
+    1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect and two additions."""
+
+    __slots__ = ('bounds', 'counts', 'total')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+        cumulative += self.counts[-1]
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+        lines.append(f'{name}_sum{{{labels}}} {self.total!r}')
+        lines.append(f'{name}_count{{{labels}}} {cumulative}')
+        return lines
+
+
+class StageTimer:
+    """Records the time between consecutive marks into per-stage histograms."""
+
+    __slots__ = ('_stages', '_last')
+
+    def __init__(self, stages, start=None):
+        self._stages = stages
+        self._last = start if start is not None else perf_counter()
+
+    def mark(self, stage):
+        now = perf_counter()
+        histogram = self._stages.get(stage)
+        if histogram is None:
+            histogram = self._stages[stage] = Histogram(STAGE_BUCKETS)
+        histogram.observe(now - self._last)
+        self._last = now
+
+    def mark_at(self, stage, now):
+        """mark() for a perf_counter value taken earlier, e.g. by a middleware."""
+        histogram = self._stages.get(stage)
+        if histogram is None:
+            histogram = self._stages[stage] = Histogram(STAGE_BUCKETS)
+        histogram.observe(now - self._last)
+        self._last = now
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def mark(self, stage):
+        pass
+
+    def mark_at(self, stage, now):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """Registry of request counters, in-flight gauge and latency histograms."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.stages = {}
+        self.request_durations = {}
+        self.requests = {}
+        self.errors = {}
+        self.in_flight = 0
+        self.collectors = []
+
+    def timer(self, start=None, admitted=None):
+        """
+        StageTimer starting at `start` (perf_counter value), or a no-op timer.
+        With `admitted` (when admission control let the request in) the time
+        until then is recorded as the 'admission' stage first.
+        """
+        if not self.enabled:
+            return NULL_TIMER
+        timer = StageTimer(self.stages, start)
+        if admitted is not None:
+            timer.mark_at('admission', admitted)
+        return timer
+
+    def observe_request(self, endpoint, status, duration):
+        key = (endpoint, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        if status >= 500:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+        histogram = self.request_durations.get(endpoint)
+        if histogram is None:
+            histogram = self.request_durations[endpoint] = Histogram(REQUEST_BUCKETS)
+        histogram.observe(duration)
+
+    def add_collector(self, collect):
+        """Register a callable returning extra (name, type, help, value) samples."""
+        self.collectors.append(collect)
+
+    def render(self):
+        """All metrics in Prometheus text exposition format."""
+        lines = [
+            '# HELP prediction_stage_seconds Time spent in each stage of a prediction request',
+            '# TYPE prediction_stage_seconds histogram',
+        ]
+        for stage, histogram in sorted(self.stages.items()):
+            lines.extend(histogram.render('prediction_stage_seconds', f'stage="{stage}"'))
+
+        lines.append('# HELP http_request_duration_seconds End-to-end request latency')
+        lines.append('# TYPE http_request_duration_seconds histogram')
+        for endpoint, histogram in sorted(self.request_durations.items()):
+            lines.extend(histogram.render('http_request_duration_seconds', f'endpoint="{endpoint}"'))
+
+        lines.append('# HELP http_requests_total Requests handled, by endpoint and status code')
+        lines.append('# TYPE http_requests_total counter')
+        for (endpoint, status), count in sorted(self.requests.items()):
+            lines.append(f'http_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+
+        lines.append('# HELP http_request_errors_total Requests that failed with a 5xx status')
+        lines.append('# TYPE http_request_errors_total counter')
+        for endpoint, count in sorted(self.errors.items()):
+            lines.append(f'http_request_errors_total{{endpoint="{endpoint}"}} {count}')
+
+        lines.append('# HELP http_requests_in_flight Requests currently being handled')
+        lines.append('# TYPE http_requests_in_flight gauge')
+        lines.append(f'http_requests_in_flight {self.in_flight}')
+
+        for collect in self.collectors:
+            for name, metric_type, help_text, value in collect():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {metric_type}')
+                lines.append(f'{name} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests, errors, in-flight and total latency.
+
+    The request start time is stored in the request state as `request_start`
+    so endpoints can attribute the time before they run (body parsing and
+    validation) to a stage.
+    """
+
+    def __init__(self, app, metrics, routes):
+        self.app = app
+        self.metrics = metrics
+        # Known paths are labelled as-is, anything else as "other", so random
+        # URLs cannot blow up the number of time series. `routes` is the app's
+        # route list, read on the first request once every route is registered.
+        self.routes = routes
+        self.endpoints = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter()
+        scope.setdefault('state', {})['request_start'] = start
+        if self.endpoints is None:
+            self.endpoints = {getattr(route, 'path', None) for route in self.routes}
+        path = scope['path']
+        endpoint = path if path in self.endpoints else 'other'
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        metrics = self.metrics
+        metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight -= 1
+            metrics.observe_request(endpoint, status, perf_counter() - start)
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Online updates of the deployed linear model from labeled feedback.
+
+The OLS state that training stores with the model (coefficients in the scaled
+feature space and P = (ZᵀZ)⁻¹ from the prediction interval statistics, see
+train_model.py) is exactly what recursive least squares needs: each labeled
+row updates the coefficients and P in O(d²), and the result equals refitting
+OLS on the training rows plus all feedback rows. The scaler stays as trained.
+
+Next to the RLS state the updater accumulates the sufficient statistics ZᵀZ,
+Zᵀy and yᵀy. Every `refit_every` feedback rows it solves them for a full
+refit and compares; if the recursive coefficients have drifted numerically
+they are replaced by the refit. Feedback rows are also scored before they
+are learned from, so their RMSE shows whether accuracy is degrading.
+
+Updates are written as model.bin (statistics included) to an output
+directory, by default the model directory itself; the API keeps them in a
+separate FEEDBACK_MODEL_DIR so the deployed artifact is never rewritten.
+Writes happen under a file lock on the output directory, so concurrent
+updaters (serve.py workers, the CLI) never lose each other's rows, and the
+registry picks the new version up like any other deploy.
+
+CLI: python online.py feedback.csv [--model-dir DIR] [--output-dir DIR]
+     (CSV with the raw feature columns and final_score)
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from artifact import ARTIFACT_FILE, read_artifact, write_artifact
+from features import FEATURE_TRANSFORMER, N_RAW_FEATURES, RAW_FEATURES
+
+LOCK_FILE = '.model.lock'
+
+# Feedback rows between comparisons with a full refit
+DEFAULT_REFIT_EVERY = 1000
+# Largest relative coefficient difference from the refit tolerated before resyncing
+DEFAULT_DRIFT_TOLERANCE = 1e-8
+# Feedback RMSE above this multiple of the training test RMSE raises an accuracy alert
+ACCURACY_ALERT_RATIO = 1.5
+# Feedback rows needed before the alert is considered
+ACCURACY_ALERT_MIN_ROWS = 30
+
+
+@contextmanager
+def model_dir_lock(model_dir):
+    """Exclusive lock on `model_dir` across processes."""
+    import fcntl
+
+    with open(os.path.join(model_dir, LOCK_FILE), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class OnlineLinearModel:
+    """Recursive least squares state of a linear model plus its sufficient statistics.
+
+    `beta` holds [intercept, coefficients] and `P` is (ZᵀZ)⁻¹, both in the
+    scaled feature space with a leading intercept column z = [1, scaler(x)].
+    """
+
+    def __init__(self, beta, P, gram, xty, yty, mean, scale, info):
+        self.beta = np.array(beta, dtype=np.float64)
+        self.P = np.array(P, dtype=np.float64)
+        self.gram = np.array(gram, dtype=np.float64)
+        self.xty = np.array(xty, dtype=np.float64)
+        self.yty = float(yty)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.info = info
+
+        stats = info['prediction_interval']
+        self.n_rows = stats['dof'] + len(self.beta)
+        self.sse = stats['residual_variance'] * stats['dof']
+        self.updates = dict(info.get('online_updates') or {
+            'rows': 0, 'batches': 0, 'rows_since_check': 0, 'resyncs': 0,
+            'last_drift': None, 'feedback_sse': 0.0
+        })
+
+    @classmethod
+    def load(cls, model_dir):
+        """State of the model in `model_dir` (model.bin, else the pickles); ValueError if it cannot be updated."""
+        path = os.path.join(model_dir, ARTIFACT_FILE)
+        arrays = {}
+        if os.path.exists(path):
+            artifact = read_artifact(path)
+            if artifact.model_type != 'linear':
+                raise ValueError(f"online updates need a linear model, {ARTIFACT_FILE} holds a {artifact.model_type}")
+            arrays, info = artifact.arrays, artifact.info
+            coef, intercept = arrays['coef'], arrays['intercept']
+            mean, scale = arrays['scaler_mean'], arrays['scaler_scale']
+        else:
+            import joblib
+
+            from registry import INFO_FILE, MODEL_FILE, SCALER_FILE
+            model = joblib.load(os.path.join(model_dir, MODEL_FILE))
+            scaler = joblib.load(os.path.join(model_dir, SCALER_FILE))
+            with open(os.path.join(model_dir, INFO_FILE)) as f:
+                info = json.load(f)
+            coef, intercept = getattr(model, 'coef_', None), getattr(model, 'intercept_', None)
+            if coef is None or np.ndim(coef) != 1 or np.size(intercept) != 1:
+                raise ValueError(f"online updates need a linear model, not {info.get('model_name')}")
+            mean, scale = scaler.mean_, scaler.scale_
+
+        stats = info.get('prediction_interval')
+        if not stats:
+            raise ValueError("the model has no (XᵀX)⁻¹ statistics; retrain it with train_model.py")
+
+        beta = np.concatenate([np.reshape(intercept, 1), coef])
+        P = np.asarray(stats['xtx_inv'], dtype=np.float64)
+        if 'gram' in arrays:
+            gram, xty, yty = arrays['gram'], arrays['xty'], float(arrays['yty'])
+        else:
+            # First update since training: rebuild the statistics of the training fit
+            gram = np.linalg.pinv(P)
+            xty = gram @ beta
+            yty = stats['residual_variance'] * stats['dof'] + beta @ xty
+        return cls(beta, P, gram, xty, yty, mean, scale, dict(info))
+
+    def design(self, raw):
+        """[1, scaled features] rows for an (n, 6) array of raw inputs."""
+        features = FEATURE_TRANSFORMER.transform(np.asarray(raw, dtype=np.float64).reshape(-1, N_RAW_FEATURES))
+        Z = np.empty((len(features), len(self.beta)))
+        Z[:, 0] = 1.0
+        np.subtract(features, self.mean, out=Z[:, 1:])
+        Z[:, 1:] /= self.scale
+        return Z
+
+    def update(self, raw, y, refit_every=DEFAULT_REFIT_EVERY, drift_tolerance=DEFAULT_DRIFT_TOLERANCE):
+        """Learn from labeled rows; returns a summary of the batch."""
+        Z = self.design(raw)
+        y = np.asarray(y, dtype=np.float64).reshape(-1)
+        beta, P = self.beta, self.P
+
+        # Recursive least squares, one row at a time; `errors` are the
+        # predictions' errors before each row was learned from
+        errors = np.empty(len(y))
+        for i, z in enumerate(Z):
+            Pz = P @ z
+            denominator = 1.0 + z @ Pz
+            errors[i] = y[i] - z @ beta
+            gain = Pz / denominator
+            beta += gain * errors[i]
+            P -= np.outer(gain, Pz)
+            self.sse += errors[i] * errors[i] / denominator
+        P += P.T
+        P /= 2
+
+        self.gram += Z.T @ Z
+        self.xty += Z.T @ y
+        self.yty += y @ y
+        self.n_rows += len(y)
+
+        updates = self.updates
+        updates['rows'] += len(y)
+        updates['batches'] += 1
+        updates['rows_since_check'] += len(y)
+        updates['feedback_sse'] += float(errors @ errors)
+        updates['updated_at'] = time.time()
+        if updates['rows_since_check'] >= refit_every:
+            self.check_drift(drift_tolerance)
+
+        feedback_rmse = float(np.sqrt(updates['feedback_sse'] / updates['rows'])) if updates['rows'] else None
+        training_rmse = self.info.get('test_rmse')
+        return {
+            'rows': len(y),
+            'total_feedback_rows': updates['rows'],
+            'batch_rmse': float(np.sqrt(errors @ errors / len(y))) if len(y) else None,
+            'feedback_rmse': feedback_rmse,
+            'training_rmse': training_rmse,
+            'accuracy_alert': bool(
+                training_rmse and updates['rows'] >= ACCURACY_ALERT_MIN_ROWS
+                and feedback_rmse > ACCURACY_ALERT_RATIO * training_rmse
+            ),
+            'last_drift': updates['last_drift'],
+            'resyncs': updates['resyncs']
+        }
+
+    def check_drift(self, tolerance=DEFAULT_DRIFT_TOLERANCE):
+        """Compare with a full refit from the sufficient statistics; resync if they disagree."""
+        refit = np.linalg.lstsq(self.gram, self.xty, rcond=None)[0]
+        drift = float(np.max(np.abs(self.beta - refit)) / max(np.max(np.abs(refit)), 1e-12))
+        if drift > tolerance:
+            self.beta = refit
+            self.P = np.linalg.pinv(self.gram)
+            self.sse = max(self.yty - refit @ self.xty, 0.0)
+            self.updates['resyncs'] += 1
+        self.updates['last_drift'] = drift
+        self.updates['rows_since_check'] = 0
+        return drift
+
+    def save(self, model_dir):
+        """Write the updated model, statistics included, as model.bin in `model_dir`."""
+        dof = self.n_rows - len(self.beta)
+        # The t quantile is kept from training: it only shrinks as rows are
+        # added, so the interval stays (slightly) conservative
+        self.info['prediction_interval'] = {
+            **self.info['prediction_interval'],
+            'dof': int(dof),
+            'residual_variance': float(self.sse / dof),
+            'xtx_inv': self.P.tolist()
+        }
+        self.info['online_updates'] = self.updates
+        write_artifact(os.path.join(model_dir, ARTIFACT_FILE), 'linear', {
+            'coef': self.beta[1:],
+            'intercept': np.array(self.beta[0]),
+            'scaler_mean': self.mean,
+            'scaler_scale': self.scale,
+            'gram': self.gram,
+            'xty': self.xty,
+            'yty': np.array(self.yty)
+        }, self.info)
+
+
+def update_model_dir(model_dir, raw, y, refit_every=DEFAULT_REFIT_EVERY,
+                     drift_tolerance=DEFAULT_DRIFT_TOLERANCE, output_dir=None):
+    """
+    Learn from (raw, y) and write the result to `output_dir` (default:
+    `model_dir`), all under the output directory's lock. Learning continues
+    from the model in `output_dir` when it was written after the one in
+    `model_dir` (earlier feedback), else starts from `model_dir`.
+    """
+    from registry import artifact_mtime
+
+    output_dir = output_dir or model_dir
+    os.makedirs(output_dir, exist_ok=True)
+    with model_dir_lock(output_dir):
+        source_dir = model_dir
+        if output_dir != model_dir and artifact_mtime(output_dir) > artifact_mtime(model_dir):
+            source_dir = output_dir
+        model = OnlineLinearModel.load(source_dir)
+        summary = model.update(raw, y, refit_every, drift_tolerance)
+        model.save(output_dir)
+    return summary
+
+
+def read_feedback_csv(path):
+    """(raw inputs, final scores) from a CSV with the raw feature columns and final_score."""
+    with open(path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    raw = np.array([[float(row[name]) for name in RAW_FEATURES] for row in rows]).reshape(-1, N_RAW_FEATURES)
+    y = np.array([float(row['final_score']) for row in rows])
+    return raw, y
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Update the deployed linear model from labeled feedback")
+    parser.add_argument('feedback', help="CSV of raw features + final_score")
+    parser.add_argument('--model-dir', default=os.environ.get('MODEL_DIR', os.path.dirname(os.path.abspath(__file__))))
+    parser.add_argument('--refit-every', type=int, default=DEFAULT_REFIT_EVERY,
+                        help="feedback rows between drift checks against a full refit")
+    parser.add_argument('--output-dir', help="where to write the updated model.bin (default: --model-dir)")
+    args = parser.parse_args()
+
+    raw, y = read_feedback_csv(args.feedback)
+    output_dir = args.output_dir or args.model_dir
+    summary = update_model_dir(args.model_dir, raw, y, args.refit_every, output_dir=output_dir)
+    print(f"Learned from {summary['rows']} rows ({summary['total_feedback_rows']} feedback rows in total)")
+    feedback_rmse, training_rmse = (
+        'n/a' if summary[key] is None else f"{summary[key]:.4f}" for key in ('feedback_rmse', 'training_rmse')
+    )
+    print(f"Feedback RMSE: {feedback_rmse} (training test RMSE: {training_rmse})")
+    if summary['last_drift'] is not None:
+        print(f"Last drift from a full refit: {summary['last_drift']:.2e} ({summary['resyncs']} resyncs)")
+    if summary['accuracy_alert']:
+        print("WARNING: feedback RMSE is well above the training RMSE; consider retraining")
+    print(f"Wrote {os.path.join(output_dir, ARTIFACT_FILE)}")
+
+
+if __name__ == "__main__":
+    main()
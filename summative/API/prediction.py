@@ -1,18 +1,99 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field, validator
-import joblib
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field, ValidationError, validator
+import asyncio
 import numpy as np
-import json
-from typing import Optional
+import os
+import secrets
+import threading
+import time
+from bisect import bisect_right
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+from admission import AdmissionMiddleware, Lane
+from audit import AuditLog
+from batching import MicroBatcher
+from cache import PredictionCache
+from drift import DriftMonitor
+from fastpath import FastPathMiddleware, dumps
+from features import FEATURE_TRANSFORMER, INPUT_BOUNDS, N_FEATURES, RAW_FEATURES
+from metrics import NULL_TIMER, Metrics, MetricsMiddleware
+from online import update_model_dir
+from registry import ModelRegistry
+from streaming import CSV, NDJSON, DuplexStreamingResponse, stream_predictions
+
+# Per-stage latency histograms and request counters, served on /metrics
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+metrics = Metrics(enabled=METRICS_ENABLED)
+
+# /predict answers plain valid JSON requests without the FastAPI/pydantic
+# round trip (see fastpath.py); FAST_PATH=0 sends every request through it
+FAST_PATH = os.environ.get('FAST_PATH', '1') == '1'
+
+# Admission control: requests beyond the in-flight limit wait in a bounded
+# queue, and beyond that (or after the queue timeout) get an immediate 503
+ADMISSION_ENABLED = os.environ.get('ADMISSION_ENABLED', '1') == '1'
+ADMISSION_MAX_IN_FLIGHT = int(os.environ.get('ADMISSION_MAX_IN_FLIGHT', '128'))
+ADMISSION_MAX_QUEUE = int(os.environ.get('ADMISSION_MAX_QUEUE', '256'))
+ADMISSION_QUEUE_TIMEOUT = float(os.environ.get('ADMISSION_QUEUE_TIMEOUT', '0.5'))
+# Separate, smaller limits for the bulk endpoints so they cannot crowd out /predict
+ADMISSION_BULK_MAX_IN_FLIGHT = int(os.environ.get('ADMISSION_BULK_MAX_IN_FLIGHT', '4'))
+ADMISSION_BULK_MAX_QUEUE = int(os.environ.get('ADMISSION_BULK_MAX_QUEUE', '16'))
+ADMISSION_BULK_QUEUE_TIMEOUT = float(os.environ.get('ADMISSION_BULK_QUEUE_TIMEOUT', '2'))
+# Seconds sent in the Retry-After header of shed requests
+ADMISSION_RETRY_AFTER = int(os.environ.get('ADMISSION_RETRY_AFTER', '1'))
+
+admission_lanes = {}
+if ADMISSION_ENABLED:
+    admission_lanes['predict'] = Lane('predict', ADMISSION_MAX_IN_FLIGHT, ADMISSION_MAX_QUEUE,
+                                      ADMISSION_QUEUE_TIMEOUT)
+    admission_lanes['bulk'] = Lane('bulk', ADMISSION_BULK_MAX_IN_FLIGHT, ADMISSION_BULK_MAX_QUEUE,
+                                   ADMISSION_BULK_QUEUE_TIMEOUT)
+
+@asynccontextmanager
+async def lifespan(app):
+    """Start background tasks (model watcher) and stop them on shutdown"""
+    watcher = None
+    if MODEL_WATCH_INTERVAL > 0:
+        watcher = asyncio.create_task(registry.watch(MODEL_WATCH_INTERVAL))
+    audit_writer = asyncio.create_task(audit_log.run()) if audit_log is not None else None
+    yield
+    if watcher is not None:
+        watcher.cancel()
+    if audit_writer is not None:
+        # Stop the background writer, then write whatever is still buffered
+        audit_writer.cancel()
+        await asyncio.gather(audit_writer, return_exceptions=True)
+        audit_log.close()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Student Performance Prediction API",
     description="API for predicting student academic performance based on various factors",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# /predict fast path, added first so it runs inside admission, CORS and
+# metrics (the handler is defined further down, with the endpoint)
+if FAST_PATH:
+    app.add_middleware(FastPathMiddleware, path='/predict',
+                       handler=lambda data, scope: predict_performance_fast(data, scope))
+
+# Admission control for the prediction endpoints; /health, /model-info and
+# everything else are never queued or shed. Added before CORS so shed
+# responses still carry CORS headers.
+if ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware, retry_after=ADMISSION_RETRY_AFTER, lanes={
+        '/predict': admission_lanes['predict'],
+        '/predict/batch': admission_lanes['bulk'],
+        '/predict/sweep': admission_lanes['bulk'],
+        '/predict/stream': admission_lanes['bulk'],
+        '/feedback': admission_lanes['bulk'],
+    })
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -22,102 +103,291 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request counts, errors, in-flight and end-to-end latency (skipped entirely when disabled)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, metrics=metrics, routes=app.routes)
+
+def bounded_field(name, description):
+    low, high = INPUT_BOUNDS[name]
+    return Field(..., ge=low, le=high, description=description)
+
 # Pydantic model for input validation
 class StudentPerformanceInput(BaseModel):
-    study_hours: float = Field(..., ge=0, le=40, description="Hours of study per week (0-40)")
-    sleep_hours: float = Field(..., ge=4, le=12, description="Hours of sleep per night (4-12)")
-    attendance_rate: float = Field(..., ge=50, le=100, description="Attendance rate percentage (50-100)")
-    previous_test_score: float = Field(..., ge=30, le=100, description="Previous test score (30-100)")
-    extracurricular_hours: float = Field(..., ge=0, le=20, description="Hours of extracurricular activities per week (0-20)")
-    stress_level: float = Field(..., ge=1, le=10, description="Stress level on scale 1-10")
-
-    @validator('study_hours')
-    def validate_study_hours(cls, v):
-        if v < 0 or v > 40:
-            raise ValueError('Study hours must be between 0 and 40')
-        return v
+    study_hours: float = bounded_field('study_hours', "Hours of study per week (0-40)")
+    sleep_hours: float = bounded_field('sleep_hours', "Hours of sleep per night (4-12)")
+    attendance_rate: float = bounded_field('attendance_rate', "Attendance rate percentage (50-100)")
+    previous_test_score: float = bounded_field('previous_test_score', "Previous test score (30-100)")
+    extracurricular_hours: float = bounded_field('extracurricular_hours', "Hours of extracurricular activities per week (0-20)")
+    stress_level: float = bounded_field('stress_level', "Stress level on scale 1-10")
 
-    @validator('sleep_hours')
-    def validate_sleep_hours(cls, v):
-        if v < 4 or v > 12:
-            raise ValueError('Sleep hours must be between 4 and 12')
-        return v
+# Pydantic models for response
+class PredictionInterval(BaseModel):
+    lower: float
+    upper: float
+    confidence: float = Field(..., description="Probability that the actual score falls in [lower, upper]")
 
-    @validator('attendance_rate')
-    def validate_attendance_rate(cls, v):
-        if v < 50 or v > 100:
-            raise ValueError('Attendance rate must be between 50 and 100')
-        return v
+class PredictionResponse(BaseModel):
+    predicted_score: float
+    confidence_level: str
+    message: str
+    prediction_interval: Optional[PredictionInterval] = Field(
+        None, description="Closed-form prediction interval (linear models trained with interval statistics only)"
+    )
 
-    @validator('previous_test_score')
-    def validate_previous_test_score(cls, v):
-        if v < 30 or v > 100:
-            raise ValueError('Previous test score must be between 30 and 100')
-        return v
+# Pydantic models for batch scoring
+class BatchPredictionInput(BaseModel):
+    # Any JSON value, so a record that is not an object fails only its own row
+    students: List[Any] = Field(..., description="Student records to score, each shaped like /predict input")
+
+class BatchPredictionItem(BaseModel):
+    index: int
+    predicted_score: float
+    confidence_level: str
+    message: str
+    prediction_interval: Optional[PredictionInterval] = None
 
-    @validator('extracurricular_hours')
-    def validate_extracurricular_hours(cls, v):
-        if v < 0 or v > 20:
-            raise ValueError('Extracurricular hours must be between 0 and 20')
+class BatchPredictionError(BaseModel):
+    index: int
+    errors: List[Dict[str, Any]]
+
+class BatchPredictionResponse(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    predictions: List[BatchPredictionItem]
+    errors: List[BatchPredictionError]
+
+# Pydantic models for labeled feedback
+class FeedbackRecord(StudentPerformanceInput):
+    final_score: float = Field(..., ge=0, le=100, description="Actual final score the student achieved (0-100)")
+
+class FeedbackInput(BaseModel):
+    students: List[FeedbackRecord] = Field(..., min_length=1, description="Students with their actual final scores")
+
+# Pydantic models for what-if sweeps
+def sweep_axis_value(value, feature, end):
+    """Sweep start (end=0) or stop (end=1): the field's bound by default, else checked against it"""
+    if feature is None:
+        return value
+    lower, upper = INPUT_BOUNDS[feature]
+    if value is None:
+        return (lower, upper)[end]
+    if value < lower or value > upper:
+        raise ValueError(f"{feature} must be between {lower} and {upper}")
+    return value
+
+class SweepAxis(BaseModel):
+    feature: str = Field(..., description="Input field to vary, e.g. study_hours")
+    start: Optional[float] = Field(None, description="First value (default: the field's minimum)")
+    stop: Optional[float] = Field(None, description="Last value (default: the field's maximum)")
+    steps: int = Field(21, ge=2, description="Number of evenly spaced values from start to stop")
+
+    @validator('feature')
+    def validate_feature(cls, v):
+        if v not in INPUT_BOUNDS:
+            raise ValueError(f"feature must be one of {', '.join(INPUT_FEATURES)}")
         return v
 
-    @validator('stress_level')
-    def validate_stress_level(cls, v):
-        if v < 1 or v > 10:
-            raise ValueError('Stress level must be between 1 and 10')
+    @validator('start', always=True)
+    def validate_start(cls, v, values):
+        return sweep_axis_value(v, values.get('feature'), end=0)
+
+    @validator('stop', always=True)
+    def validate_stop(cls, v, values):
+        return sweep_axis_value(v, values.get('feature'), end=1)
+
+class SweepInput(BaseModel):
+    base: StudentPerformanceInput = Field(..., description="Inputs held fixed while the axes vary")
+    axes: List[SweepAxis] = Field(..., description="One or two features to vary")
+
+    @validator('axes')
+    def validate_axes(cls, v):
+        if not 1 <= len(v) <= 2:
+            raise ValueError('Give one or two axes')
+        if len({axis.feature for axis in v}) != len(v):
+            raise ValueError('Axes must vary different features')
+        points = int(np.prod([axis.steps for axis in v]))
+        if points > MAX_SWEEP_POINTS:
+            raise ValueError(f"Grid too large: {points} points (max {MAX_SWEEP_POINTS})")
         return v
 
-# Pydantic model for response
-class PredictionResponse(BaseModel):
-    predicted_score: float
-    confidence_level: str
-    message: str
+class SweepAxisValues(BaseModel):
+    feature: str
+    values: List[float]
+
+class SweepResponse(BaseModel):
+    axes: List[SweepAxisValues]
+    predicted_scores: List[Any]
+    confidence_levels: List[Any]
+    model_version: str
+
+# Raw input columns, in the order the model expects them
+INPUT_FEATURES = list(RAW_FEATURES)
+
+# (name, min, max) in model order, for validating a request in one pass
+INPUT_BOUNDS_TABLE = tuple((name, *INPUT_BOUNDS[name]) for name in INPUT_FEATURES)
+
+# Largest number of students accepted by /predict/batch in one request
+MAX_BATCH_SIZE = 10000
+
+# Largest grid (product of axis steps) scored by /predict/sweep in one request
+MAX_SWEEP_POINTS = 10000
+
+# Rows parsed and scored together by /predict/stream
+STREAM_CHUNK_ROWS = int(os.environ.get('STREAM_CHUNK_ROWS', '1000'))
+# Longest /predict/stream input line; longer lines are reported as row errors
+STREAM_MAX_LINE_BYTES = int(os.environ.get('STREAM_MAX_LINE_BYTES', '65536'))
+
+# Optional micro-batching of concurrent /predict calls
+MICROBATCH_ENABLED = os.environ.get('MICROBATCH_ENABLED', '0') == '1'
+MICROBATCH_WINDOW_MS = float(os.environ.get('MICROBATCH_WINDOW_MS', '2'))
+MICROBATCH_MAX_SIZE = int(os.environ.get('MICROBATCH_MAX_SIZE', '64'))
+
+# In-process cache of /predict results (PREDICTION_CACHE_SIZE=0 disables it)
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', '10000'))
+PREDICTION_CACHE_TTL = float(os.environ.get('PREDICTION_CACHE_TTL', '3600'))
+PREDICTION_CACHE_QUANTUM = float(os.environ.get('PREDICTION_CACHE_QUANTUM', '0'))
+
+# Score thresholds and the label/message for each band (lowest band first)
+CONFIDENCE_THRESHOLDS = np.array([60, 70, 80, 90])
+CONFIDENCE_LEVELS = np.array([
+    "Needs Improvement", "Below Average", "Average", "Good", "Excellent"
+])
+CONFIDENCE_MESSAGES = np.array([
+    "Performance needs improvement. Consider academic support and increased study time.",
+    "Below average performance expected. Consider increasing study time and attendance.",
+    "Average performance expected. Focus on improving study efficiency.",
+    "Good performance expected. Consider minor improvements in study habits.",
+    "Excellent performance expected! Keep up the great work."
+])
+# The same table as plain Python objects for scoring one request at a time
+CONFIDENCE_BAND_THRESHOLDS = CONFIDENCE_THRESHOLDS.tolist()
+CONFIDENCE_BANDS = list(zip(CONFIDENCE_LEVELS.tolist(), CONFIDENCE_MESSAGES.tolist()))
+
+# Model artifacts live next to this file unless MODEL_DIR points elsewhere
+MODEL_DIR = os.environ.get('MODEL_DIR', os.path.dirname(os.path.abspath(__file__)))
+MODEL_HISTORY = int(os.environ.get('MODEL_HISTORY', '3'))
+# Seconds between checks for new artifacts in MODEL_DIR (0 disables watching)
+MODEL_WATCH_INTERVAL = float(os.environ.get('MODEL_WATCH_INTERVAL', '10'))
+# When set, /admin endpoints require this value in the X-Admin-Token header;
+# /admin/reload is disabled until it is set
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+# Score /predict/batch, /predict/sweep and /predict/stream in float32 (half the
+# feature memory traffic) for linear models whose float32 predictions stay
+# within FLOAT32_TOLERANCE of float64 on a check sample; otherwise float64
+BATCH_FLOAT32 = os.environ.get('BATCH_FLOAT32', '0') == '1'
+FLOAT32_TOLERANCE = float(os.environ.get('FLOAT32_TOLERANCE', '0.001'))
+# Feedback rows between checks of the online-updated model against a full refit
+FEEDBACK_REFIT_EVERY = int(os.environ.get('FEEDBACK_REFIT_EVERY', '1000'))
+# Where /feedback writes the updated model.bin, apart from the deployed artifacts
+FEEDBACK_MODEL_DIR = os.environ.get('FEEDBACK_MODEL_DIR', os.path.join(MODEL_DIR, 'online'))
+
+# Live input distribution vs the training scaler statistics (DRIFT_ENABLED=0 disables it)
+DRIFT_ENABLED = os.environ.get('DRIFT_ENABLED', '1') == '1'
+# Alert when a feature's live mean moves this many training standard deviations...
+DRIFT_MEAN_THRESHOLD = float(os.environ.get('DRIFT_MEAN_THRESHOLD', '0.5'))
+# ...its live standard deviation is more than this factor above or below training...
+DRIFT_STD_RATIO = float(os.environ.get('DRIFT_STD_RATIO', '1.5'))
+# ...or its population stability index against the training histogram exceeds this
+DRIFT_PSI_THRESHOLD = float(os.environ.get('DRIFT_PSI_THRESHOLD', '0.2'))
+# Observations needed before any drift alert is raised
+DRIFT_MIN_SAMPLES = int(os.environ.get('DRIFT_MIN_SAMPLES', '100'))
+
+# Audit log of every prediction (inputs, score, model version, latency), written
+# in batches by a background task; a .db/.sqlite path selects SQLite, anything
+# else JSON lines. Disabled when AUDIT_LOG_PATH is empty.
+AUDIT_LOG_PATH = os.environ.get('AUDIT_LOG_PATH', '')
+# Write as soon as this many records are buffered...
+AUDIT_FLUSH_SIZE = int(os.environ.get('AUDIT_FLUSH_SIZE', '1000'))
+# ...and at least this often (seconds)
+AUDIT_FLUSH_INTERVAL = float(os.environ.get('AUDIT_FLUSH_INTERVAL', '1'))
+# Records buffered before AUDIT_OVERFLOW applies: 'block' makes the request await the writer, 'drop' discards
+AUDIT_MAX_BUFFER = int(os.environ.get('AUDIT_MAX_BUFFER', '100000'))
+AUDIT_OVERFLOW = os.environ.get('AUDIT_OVERFLOW', 'block')
+
+audit_log = (
+    AuditLog(AUDIT_LOG_PATH, AUDIT_FLUSH_SIZE, AUDIT_FLUSH_INTERVAL, AUDIT_MAX_BUFFER, AUDIT_OVERFLOW)
+    if AUDIT_LOG_PATH else None
+)
+
+# Shown by /, /model-info and /health when no model could be loaded
+FALLBACK_MODEL_INFO = {
+    'model_name': 'Fallback Model',
+    'test_r2': 0.85,
+    'test_rmse': 5.2,
+    'test_mae': 4.1
+}
 
 # Load the trained model and scaler
+registry = ModelRegistry(MODEL_DIR, keep=MODEL_HISTORY,
+                         float32_tolerance=FLOAT32_TOLERANCE if BATCH_FLOAT32 else None,
+                         extra_dirs=(FEEDBACK_MODEL_DIR,))
 try:
-    model = joblib.load('best_model.pkl')
-    scaler = joblib.load('scaler.pkl')
-    
-    # Load model info
-    with open('model_info.json', 'r') as f:
-        model_info = json.load(f)
+    # The feedback-updated model if it is newer than the deployed one
+    active = registry.reload_newest()
     
     print("Model loaded successfully!")
-    print(f"Model: {model_info['model_name']}")
-    print(f"Test R²: {model_info['test_r2']:.4f}")
+    print(f"Model: {active.info['model_name']}")
+    print(f"Test R²: {active.info['test_r2']:.4f}")
+    print(f"Version: {active.version}")
+    if active.fused is not None:
+        print("Using fused linear inference kernel")
+    elif active.trees is not None:
+        print("Using flattened tree inference engine")
+    if active.fused32 is not None:
+        print(f"Using float32 batch kernel (max deviation {active.float32_deviation:.2e})")
+    elif BATCH_FLOAT32:
+        print("float32 batch kernel not enabled: "
+              + ("model is not linear" if active.float32_deviation is None else
+                 f"max deviation {active.float32_deviation:.2e} exceeds {FLOAT32_TOLERANCE}"))
     
 except Exception as e:
     print(f"Error loading model: {e}")
-    # For demo purposes, create a simple fallback model
-    model = None
-    scaler = None
-    model_info = {
-        'model_name': 'Fallback Model',
-        'test_r2': 0.85,
-        'test_rmse': 5.2,
-        'test_mae': 4.1
-    }
+    # For demo purposes, fall back to a simple formula (registry.active stays None)
+
+def current_model_info():
+    """model_info.json of the active version, or the fallback description"""
+    active = registry.active
+    return active.info if active is not None else FALLBACK_MODEL_INFO
+
+def current_model_version():
+    active = registry.active
+    return active.version if active is not None else 'fallback'
+
+def current_transformer():
+    """Feature transformer of the active version (the default one for the fallback)"""
+    active = registry.active
+    return active.transformer if active is not None else FEATURE_TRANSFORMER
+
+# Reusable single-row feature buffer, one per thread
+_row_buffers = threading.local()
+
+def _row_buffer():
+    buffer = getattr(_row_buffers, 'features', None)
+    if buffer is None:
+        buffer = _row_buffers.features = np.empty(N_FEATURES)
+    return buffer
 
 def predict_student_performance(study_hours, sleep_hours, attendance_rate, 
-                              previous_test_score, extracurricular_hours, stress_level):
+                              previous_test_score, extracurricular_hours, stress_level,
+                              timer=NULL_TIMER):
     """
     Predict student final score based on input features.
     """
     try:
-        # Create feature vector
-        features = np.array([
-            study_hours, sleep_hours, attendance_rate, previous_test_score,
-            extracurricular_hours, stress_level,
-            study_hours * attendance_rate / 100,  # study_attendance_interaction
-            sleep_hours / (study_hours + 1),      # sleep_study_ratio
-            previous_test_score * attendance_rate / 100  # performance_momentum
-        ]).reshape(1, -1)
+        # Create feature vector in this thread's reusable buffer
+        active = registry.active
+        transformer = active.transformer if active is not None else FEATURE_TRANSFORMER
+        features = transformer.transform(
+            (study_hours, sleep_hours, attendance_rate, previous_test_score,
+             extracurricular_hours, stress_level),
+            out=_row_buffer()
+        )
+        timer.mark('features')
         
-        if model is not None and scaler is not None:
-            # Standardize features
-            features_scaled = scaler.transform(features)
-            # Make prediction
-            predicted_score = model.predict(features_scaled)[0]
+        if active is not None:
+            # Fused dot product for linear models, scaler + sklearn otherwise
+            predicted_score = active.predict_one(features, timer)
         else:
             # Fallback prediction using a simple formula
             predicted_score = (
@@ -129,35 +399,131 @@ def predict_student_performance(study_hours, sleep_hours, attendance_rate,
                 0.1 * stress_level + 
                 np.random.normal(0, 2)  # Add some noise
             )
+            timer.mark('predict')
         
         # Ensure prediction is within realistic bounds
-        predicted_score = np.clip(predicted_score, 0, 100)
+        predicted_score = round(np.clip(predicted_score, 0, 100), 2)
+        timer.mark('postprocess')
         
-        return round(predicted_score, 2)
+        return predicted_score
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
+def build_feature_matrix(raw, out=None):
+    """
+    Build the 9-column model feature matrix from an (n, 6) array of raw inputs.
+    """
+    raw = np.asarray(raw, dtype=np.float64).reshape(-1, len(INPUT_FEATURES))
+    return current_transformer().transform(raw, out=out)
+
+def predict_batch_scores(raw, timer=NULL_TIMER, intervals=False, float32=True):
+    """
+    Predict final scores for an (n, 6) array of raw inputs with one model call.
+
+    With `intervals=True` returns (scores, interval) where interval is
+    (lower, upper, confidence), or None when the active model has no
+    prediction interval statistics. `float32=False` keeps float64 features
+    even when the active version has its float32 kernel enabled.
+    """
+    active = registry.active
+    # Float32 features when the active version has its float32 kernel enabled
+    features = active.batch_features(raw) if active is not None and float32 else build_feature_matrix(raw)
+    timer.mark('features')
+
+    interval = None
+    if active is not None:
+        predicted_scores = active.predict(features)
+        if intervals and active.interval is not None:
+            interval = (active.interval.half_width(features), active.interval.confidence)
+    else:
+        # Fallback prediction using the same simple formula as the single path
+        predicted_scores = (
+            features[:, :6] @ np.array([0.4, 0.2, 0.25, 0.3, 0.05, -0.1]) +
+            np.random.normal(0, 2, len(features))
+        )
+    timer.mark('predict')
+
+    predicted_scores = np.round(np.clip(predicted_scores, 0, 100), 2)
+    if interval is not None:
+        half_widths, confidence = interval
+        interval = interval_bounds(predicted_scores, half_widths) + (confidence,)
+    timer.mark('postprocess')
+    if intervals:
+        return predicted_scores, interval
+    return predicted_scores
+
+def interval_bounds(scores, half_widths):
+    """(lower, upper) arrays around the served scores, within the 0-100 score range"""
+    lower = np.round(np.clip(scores - half_widths, 0, 100), 2)
+    upper = np.round(np.clip(scores + half_widths, 0, 100), 2)
+    return lower, upper
+
+def predict_interval(inputs, score):
+    """(lower, upper, confidence) around `score` for one raw input row; None if the model has none"""
+    active = registry.active
+    if active is None or active.interval is None:
+        return None
+    features = active.transformer.transform(inputs, out=_row_buffer())
+    half_width = active.interval.half_width_one(features)
+    # Plain float arithmetic; NumPy scalar clip/round would cost more than the interval
+    return (
+        round(min(max(score - half_width, 0.0), 100.0), 2),
+        round(min(max(score + half_width, 0.0), 100.0), 2),
+        active.interval.confidence
+    )
+
+def get_confidence_levels(scores):
+    """Map an array of scores to (labels, messages) arrays in one lookup"""
+    bands = np.searchsorted(CONFIDENCE_THRESHOLDS, scores, side='right')
+    return CONFIDENCE_LEVELS[bands], CONFIDENCE_MESSAGES[bands]
+
+def drift_baseline():
+    """(mean, scale, reference histogram) of the active model's training features, if known"""
+    active = registry.active
+    if active is None or active.feature_mean is None:
+        return None
+    return active.feature_mean, active.feature_scale, active.info.get('drift_reference')
+
+drift_monitor = (
+    DriftMonitor(drift_baseline, DRIFT_MEAN_THRESHOLD, DRIFT_STD_RATIO, DRIFT_PSI_THRESHOLD, DRIFT_MIN_SAMPLES)
+    if DRIFT_ENABLED else None
+)
+
+prediction_cache = (
+    PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL, PREDICTION_CACHE_QUANTUM,
+                    bounds=[INPUT_BOUNDS[name] for name in INPUT_FEATURES])
+    if PREDICTION_CACHE_SIZE > 0 else None
+)
+
+def predict_microbatch_scores(raw):
+    """Scores for coalesced /predict rows: always float64, so a single prediction
+    does not depend on MICROBATCH_ENABLED (BATCH_FLOAT32 covers bulk endpoints only)"""
+    return predict_batch_scores(raw, float32=False)
+
+# Created after predict_batch_scores so concurrent /predict calls can share it
+micro_batcher = (
+    MicroBatcher(predict_microbatch_scores, MICROBATCH_WINDOW_MS, MICROBATCH_MAX_SIZE)
+    if MICROBATCH_ENABLED else None
+)
+
+def get_confidence_band(score):
+    """(label, message) for one score, from the same thresholds as get_confidence_levels"""
+    return CONFIDENCE_BANDS[bisect_right(CONFIDENCE_BAND_THRESHOLDS, score)]
+
 def get_confidence_level(score):
     """Determine confidence level based on predicted score"""
-    if score >= 90:
-        return "Excellent"
-    elif score >= 80:
-        return "Good"
-    elif score >= 70:
-        return "Average"
-    elif score >= 60:
-        return "Below Average"
-    else:
-        return "Needs Improvement"
+    return get_confidence_band(score)[0]
 
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
+    model_info = current_model_info()
     return {
         "message": "Student Performance Prediction API",
         "version": "1.0.0",
         "model": model_info['model_name'],
+        "model_version": current_model_version(),
         "model_performance": {
             "test_r2": model_info['test_r2'],
             "test_rmse": model_info['test_rmse'],
@@ -165,6 +531,11 @@ async def root():
         },
         "endpoints": {
             "predict": "/predict",
+            "predict_batch": "/predict/batch",
+            "predict_stream": "/predict/stream",
+            "predict_sweep": "/predict/sweep",
+            "feedback": "/feedback",
+            "drift": "/drift",
             "docs": "/docs",
             "health": "/health"
         }
@@ -173,69 +544,508 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
+    active = registry.active
     return {
         "status": "healthy",
-        "model_loaded": model is not None,
-        "scaler_loaded": scaler is not None
+        "model_loaded": active is not None,
+        "scaler_loaded": active is not None,
+        "fused_kernel": active is not None and active.fused is not None,
+        "model_version": current_model_version(),
+        "last_reload_error": registry.last_error
     }
 
+def request_timing(state):
+    """
+    (start, stage timer) for a request from its ASGI state: start is when it
+    arrived (set by MetricsMiddleware), or now; time spent queued by admission
+    control (until `admitted_at`) is recorded as the 'admission' stage.
+    """
+    start = state.get('request_start')
+    if start is None:
+        start = time.perf_counter()
+    return start, metrics.timer(start, state.get('admitted_at'))
+
+def request_state(request):
+    return request.scope.get('state', {}) if request is not None else {}
+
+async def predict_one(inputs, timer, request_start):
+    """
+    Score one validated raw input row for /predict.
+
+    Returns (predicted_score, confidence_level, message, interval), where
+    interval is (lower, upper, confidence) or None.
+    """
+    # Serve repeated inputs from the cache; with quantization on, the
+    # prediction is made for the snapped values (clipped to INPUT_BOUNDS) so
+    # every hit agrees. The drift monitor and the audit log see what the
+    # client sent, never the cache key.
+    predicted_score = None
+    scored_inputs = inputs
+    if prediction_cache is not None:
+        prediction_cache.ensure_version(current_model_version())
+        cache_key = prediction_cache.quantize(inputs)
+        predicted_score = prediction_cache.get(cache_key)
+        scored_inputs = list(cache_key)
+        timer.mark('cache')
+
+    # Make prediction
+    if predicted_score is None:
+        if micro_batcher is not None:
+            predicted_score = await micro_batcher.submit(scored_inputs)
+            timer.mark('microbatch')
+        else:
+            predicted_score = predict_student_performance(*scored_inputs, timer=timer)
+        # A plain float from here on: cheaper arithmetic and directly JSON-encodable
+        predicted_score = float(predicted_score)
+        if prediction_cache is not None:
+            prediction_cache.put(cache_key, predicted_score)
+
+    # A small quadratic form, so it is computed fresh rather than cached
+    interval = predict_interval(scored_inputs, predicted_score)
+    timer.mark('interval')
+
+    if drift_monitor is not None:
+        drift_monitor.observe(inputs)
+        timer.mark('drift')
+
+    confidence_level, message = get_confidence_band(predicted_score)
+
+    if audit_log is not None:
+        await audit_log.record('/predict', current_model_version(),
+                               (time.perf_counter() - request_start) * 1000.0, inputs, predicted_score)
+        timer.mark('audit')
+    return predicted_score, confidence_level, message, interval
+
 @app.post("/predict", response_model=PredictionResponse)
-async def predict_performance(student_data: StudentPerformanceInput):
+async def predict_performance(student_data: StudentPerformanceInput, request: Request = None):
     """
     Predict student final performance score based on input parameters.
     
     This endpoint takes student data including study habits, attendance, and previous performance
     to predict their final academic score.
     """
+    # Everything between admission and the handler (body parsing, pydantic
+    # validation) is attributed to the validation stage
+    request_start, timer = request_timing(request_state(request))
+    timer.mark('validation')
     try:
-        # Make prediction
-        predicted_score = predict_student_performance(
-            study_hours=student_data.study_hours,
-            sleep_hours=student_data.sleep_hours,
-            attendance_rate=student_data.attendance_rate,
-            previous_test_score=student_data.previous_test_score,
-            extracurricular_hours=student_data.extracurricular_hours,
-            stress_level=student_data.stress_level
-        )
-        
-        # Determine confidence level
-        confidence_level = get_confidence_level(predicted_score)
-        
-        # Create response message
-        if predicted_score >= 90:
-            message = "Excellent performance expected! Keep up the great work."
-        elif predicted_score >= 80:
-            message = "Good performance expected. Consider minor improvements in study habits."
-        elif predicted_score >= 70:
-            message = "Average performance expected. Focus on improving study efficiency."
-        elif predicted_score >= 60:
-            message = "Below average performance expected. Consider increasing study time and attendance."
-        else:
-            message = "Performance needs improvement. Consider academic support and increased study time."
-        
-        return PredictionResponse(
+        inputs = [getattr(student_data, name) for name in INPUT_FEATURES]
+        predicted_score, confidence_level, message, interval = await predict_one(inputs, timer, request_start)
+
+        response = PredictionResponse(
             predicted_score=predicted_score,
             confidence_level=confidence_level,
-            message=message
+            message=message,
+            prediction_interval=None if interval is None else PredictionInterval(
+                lower=interval[0], upper=interval[1], confidence=interval[2]
+            )
         )
+        timer.mark('response')
+        return response
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
+async def predict_performance_fast(data, scope):
+    """
+    /predict without the FastAPI/pydantic round trip, for FastPathMiddleware.
+
+    Accepts only a JSON object whose six inputs are numbers within
+    INPUT_BOUNDS, checked in one pass; anything else returns None and goes
+    through predict_performance, which produces the usual 422 details.
+    The response body is the same JSON predict_performance returns.
+    """
+    request_start, timer = request_timing(scope.get('state', {}))
+
+    if type(data) is not dict:
+        return None
+    inputs = []
+    for name, low, high in INPUT_BOUNDS_TABLE:
+        value = data.get(name)
+        # bool is an int subclass but pydantic's float field treats it
+        # differently, so only exact int/float take this path
+        value_type = type(value)
+        if (value_type is not float and value_type is not int) or not low <= value <= high:
+            return None
+        inputs.append(float(value))
+    timer.mark('validation')
+
+    try:
+        predicted_score, confidence_level, message, interval = await predict_one(inputs, timer, request_start)
+        content = dumps({
+            "predicted_score": predicted_score,
+            "confidence_level": confidence_level,
+            "message": message,
+            "prediction_interval": None if interval is None else {
+                "lower": interval[0], "upper": interval[1], "confidence": interval[2]
+            }
+        })
+    except Exception as e:
+        return 500, dumps({"detail": f"Prediction failed: {str(e)}"})
+    timer.mark('response')
+    return 200, content
+
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_performance_batch(batch: BatchPredictionInput, request: Request = None):
+    """
+    Predict final scores for many students in a single request.
+
+    Each record is validated on its own; invalid records are reported in `errors`
+    with their index and do not fail the rest of the batch.
+    """
+    request_start, timer = request_timing(request_state(request))
+    if len(batch.students) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(batch.students)} records (max {MAX_BATCH_SIZE})"
+        )
+
+    # Validate every record, keeping valid rows and collecting per-row errors
+    valid_indices = []
+    valid_rows = []
+    errors = []
+    for index, record in enumerate(batch.students):
+        try:
+            student = StudentPerformanceInput.model_validate(record)
+        except ValidationError as e:
+            errors.append(BatchPredictionError(
+                index=index,
+                errors=[{"loc": list(err["loc"]), "msg": err["msg"], "type": err["type"]}
+                        for err in e.errors()]
+            ))
+            continue
+        valid_indices.append(index)
+        valid_rows.append([getattr(student, name) for name in INPUT_FEATURES])
+
+    timer.mark('validation')
+
+    predictions = []
+    if valid_rows:
+        try:
+            scores, interval = predict_batch_scores(valid_rows, timer, intervals=True)
+            levels, messages = get_confidence_levels(scores)
+            if drift_monitor is not None:
+                drift_monitor.observe_batch(valid_rows)
+            if audit_log is not None:
+                await audit_log.record_many('/predict/batch', current_model_version(),
+                                            (time.perf_counter() - request_start) * 1000.0, valid_rows, scores)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Batch prediction failed: {str(e)}")
+
+        intervals = [None] * len(scores)
+        if interval is not None:
+            lower, upper, confidence = interval
+            intervals = [
+                PredictionInterval(lower=low, upper=high, confidence=confidence)
+                for low, high in zip(lower.tolist(), upper.tolist())
+            ]
+
+        predictions = [
+            BatchPredictionItem(
+                index=index,
+                predicted_score=score,
+                confidence_level=level,
+                message=message,
+                prediction_interval=interval
+            )
+            for index, score, level, message, interval in zip(
+                valid_indices, scores.tolist(), levels.tolist(), messages.tolist(), intervals
+            )
+        ]
+
+    response = BatchPredictionResponse(
+        total=len(batch.students),
+        succeeded=len(predictions),
+        failed=len(errors),
+        predictions=predictions,
+        errors=errors
+    )
+    timer.mark('response')
+    return response
+
+def build_sweep_grid(base, axes):
+    """
+    Raw-input grid for a what-if sweep, shape (steps_1[, steps_2], 6).
+
+    `base` holds the 6 fixed inputs and `axes` (feature, values) pairs; every
+    axis feature is overwritten by its values broadcast along its own grid axis.
+    """
+    shape = tuple(len(values) for _, values in axes)
+    raw = np.empty(shape + (len(INPUT_FEATURES),))
+    raw[...] = base
+    for axis_number, (feature, values) in enumerate(axes):
+        index = [np.newaxis] * len(shape)
+        index[axis_number] = slice(None)
+        raw[..., INPUT_FEATURES.index(feature)] = values[tuple(index)]
+    return raw
+
+@app.post("/predict/sweep", response_model=SweepResponse)
+async def predict_performance_sweep(sweep: SweepInput, request: Request = None):
+    """
+    Predict a whole what-if grid in one call.
+
+    The base inputs are held fixed while one or two features vary over evenly
+    spaced values within their valid ranges; `predicted_scores` is a list (one
+    axis) or a list of rows indexed [first axis][second axis] (two axes).
+    """
+    _, timer = request_timing(request_state(request))
+    axes = [(axis.feature, np.linspace(axis.start, axis.stop, axis.steps)) for axis in sweep.axes]
+    raw = build_sweep_grid([getattr(sweep.base, name) for name in INPUT_FEATURES], axes)
+    timer.mark('validation')
+
+    try:
+        # One feature construction and one model call for the whole grid
+        scores = predict_batch_scores(raw.reshape(-1, len(INPUT_FEATURES)), timer).reshape(raw.shape[:-1])
+        levels, _ = get_confidence_levels(scores)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Sweep prediction failed: {str(e)}")
+
+    response = SweepResponse(
+        axes=[SweepAxisValues(feature=feature, values=values.tolist()) for feature, values in axes],
+        predicted_scores=scores.tolist(),
+        confidence_levels=levels.tolist(),
+        model_version=current_model_version()
+    )
+    timer.mark('response')
+    return response
+
+async def score_stream_chunk(raw):
+    """Score one chunk of a streamed upload, returning (scores, confidence levels)"""
+    start = time.perf_counter()
+    scores = predict_batch_scores(raw)
+    levels, _ = get_confidence_levels(scores)
+    if drift_monitor is not None:
+        drift_monitor.observe_batch(raw)
+    if audit_log is not None:
+        # A stream has no single request latency; each chunk records its scoring time
+        await audit_log.record_many('/predict/stream', current_model_version(),
+                                    (time.perf_counter() - start) * 1000.0, raw, scores)
+    return scores, levels
+
+@app.post("/predict/stream")
+async def predict_performance_stream(request: Request, output: Optional[str] = None):
+    """
+    Score an NDJSON or CSV upload of any size, streaming results back as they are produced.
+
+    Send `Content-Type: application/x-ndjson` (one JSON object per line) or
+    `text/csv` (header row with the /predict field names). Output defaults to the
+    input format and can be forced with `?output=ndjson` or `?output=csv`. An optional
+    `student_id` column is passed through; invalid rows get an `error` instead of a score,
+    as do lines over STREAM_MAX_LINE_BYTES and CSV quoted fields spanning lines.
+    """
+    content_type = request.headers.get('content-type', '')
+    input_format = CSV if 'csv' in content_type else NDJSON
+    output_format = output or input_format
+    if output_format not in (CSV, NDJSON):
+        raise HTTPException(status_code=400, detail="output must be 'ndjson' or 'csv'")
+
+    media_type = 'text/csv' if output_format == CSV else 'application/x-ndjson'
+    return DuplexStreamingResponse(
+        stream_predictions(
+            request.stream(), input_format, output_format, STREAM_CHUNK_ROWS,
+            INPUT_FEATURES, INPUT_BOUNDS, score_stream_chunk, STREAM_MAX_LINE_BYTES
+        ),
+        media_type=media_type
+    )
+
+def collect_component_metrics():
+    """Cache and micro-batcher counters for /metrics"""
+    samples = []
+    if prediction_cache is not None:
+        samples += [
+            ('prediction_cache_hits_total', 'counter', 'Prediction cache hits', prediction_cache.hits),
+            ('prediction_cache_misses_total', 'counter', 'Prediction cache misses', prediction_cache.misses),
+            ('prediction_cache_evictions_total', 'counter', 'Prediction cache LRU evictions', prediction_cache.evictions),
+        ]
+    if drift_monitor is not None:
+        samples += [
+            ('input_drift_observations', 'gauge', 'Requests merged into the drift statistics', drift_monitor.count),
+            ('input_drift_alerts', 'gauge', 'Feature drift checks currently over their threshold', len(drift_monitor.alerts)),
+        ]
+    for name, lane in admission_lanes.items():
+        samples += [
+            (f'admission_{name}_in_flight', 'gauge', f'Admitted {name} requests being handled', lane.in_flight),
+            (f'admission_{name}_queue_depth', 'gauge', f'{name} requests waiting for admission', lane.queue_depth),
+            (f'admission_{name}_queue_wait_seconds_total', 'counter', f'Time {name} requests spent queued', lane.total_wait),
+            (f'admission_{name}_shed_total', 'counter', f'{name} requests rejected with 503', lane.shed),
+        ]
+    if audit_log is not None:
+        samples += [
+            ('audit_records_total', 'counter', 'Predictions recorded for the audit log', audit_log.records),
+            ('audit_written_total', 'counter', 'Audit records written to disk', audit_log.written),
+            ('audit_dropped_total', 'counter', 'Audit records dropped because the buffer was full', audit_log.dropped),
+            ('audit_buffer_depth', 'gauge', 'Audit records waiting to be written', audit_log.buffer_depth),
+            ('audit_backpressure_waits_total', 'counter', 'Times a request waited for the audit writer because the buffer was full', audit_log.backpressure_waits),
+        ]
+    if micro_batcher is not None:
+        samples += [
+            ('microbatch_queue_depth', 'gauge', 'Requests waiting in the micro-batcher', micro_batcher.queue_depth),
+            ('microbatch_batches_total', 'counter', 'Micro-batches scored', micro_batcher.batches),
+        ]
+    return samples
+
+metrics.add_collector(collect_component_metrics)
+
+@app.get("/metrics")
+async def get_metrics():
+    """Per-stage latency histograms and request counters in Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/cache-stats")
+async def get_cache_stats():
+    """Hit/miss/eviction counters of the /predict result cache"""
+    if prediction_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **prediction_cache.stats()}
+
+@app.get("/batcher-stats")
+async def get_batcher_stats():
+    """Queue depth, batch-size distribution and added wait of the /predict micro-batcher"""
+    if micro_batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **micro_batcher.stats()}
+
+@app.get("/drift")
+async def get_drift():
+    """
+    Live input distribution against the training statistics of the active model.
+
+    Per feature: training vs live mean and standard deviation, the mean shift in
+    training standard deviations, live and training histograms (bins in training
+    standard deviations) and their population stability index; `alerts` lists
+    every check over its threshold.
+    """
+    if drift_monitor is None:
+        return {"enabled": False}
+    return {"enabled": True, **drift_monitor.report()}
+
+@app.post("/admin/drift/reset")
+async def reset_drift(x_admin_token: Optional[str] = Header(None)):
+    """Restart the drift statistics, e.g. after acting on an alert; needs ADMIN_TOKEN"""
+    require_admin_token(x_admin_token)
+    if drift_monitor is not None:
+        drift_monitor.reset()
+    return {"enabled": drift_monitor is not None}
+
+@app.get("/admission-stats")
+async def get_admission_stats():
+    """In-flight and queued requests, queue wait and shed counts per admission lane"""
+    if not admission_lanes:
+        return {"enabled": False}
+    return {"enabled": True, "lanes": {name: lane.stats() for name, lane in admission_lanes.items()}}
+
+@app.get("/audit-stats")
+async def get_audit_stats():
+    """Buffered, written and dropped audit records and flush timings"""
+    if audit_log is None:
+        return {"enabled": False}
+    return {"enabled": True, **audit_log.stats()}
+
 @app.get("/model-info")
 async def get_model_info():
     """Get information about the trained model"""
+    model_info = current_model_info()
     return {
         "model_name": model_info['model_name'],
+        "model_version": current_model_version(),
         "performance_metrics": {
             "test_r2": model_info['test_r2'],
             "test_rmse": model_info['test_rmse'],
             "test_mae": model_info['test_mae']
         },
         "features": model_info.get('feature_names', []),
-        "description": "Student performance prediction model based on study habits, attendance, and previous performance"
+        "description": "Student performance prediction model based on study habits, attendance, and previous performance",
+        "registry": registry.describe()
     }
 
+# Pydantic model for model reload requests
+class ModelReloadInput(BaseModel):
+    model_dir: Optional[str] = Field(
+        None, description="Directory with the new artifacts, relative to or inside MODEL_DIR (default: MODEL_DIR)"
+    )
+
+def require_admin_token(token):
+    """403 unless `token` is ADMIN_TOKEN; the endpoint stays disabled (503) until ADMIN_TOKEN is set"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=503, detail="Set ADMIN_TOKEN to enable this endpoint")
+    if not secrets.compare_digest(token or '', ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+def resolve_model_dir(model_dir):
+    """`model_dir` as a real path inside MODEL_DIR; 403 for anything outside it"""
+    root = os.path.realpath(MODEL_DIR)
+    path = os.path.realpath(os.path.join(root, model_dir))
+    if os.path.commonpath([root, path]) != root:
+        raise HTTPException(status_code=403, detail="model_dir must be inside MODEL_DIR")
+    return path
+
+@app.post("/admin/reload")
+async def reload_model(reload_request: Optional[ModelReloadInput] = None,
+                       x_admin_token: Optional[str] = Header(None)):
+    """
+    Load, self-check and activate a new model version without restarting.
+
+    Loading happens in a worker thread; requests keep using the current version
+    until the new one has passed its self-check and is swapped in. Needs
+    ADMIN_TOKEN, and `model_dir` must be MODEL_DIR or a directory inside it.
+    """
+    require_admin_token(x_admin_token)
+    model_dir = None
+    if reload_request is not None and reload_request.model_dir:
+        model_dir = resolve_model_dir(reload_request.model_dir)
+    try:
+        version = await asyncio.to_thread(registry.reload, model_dir)
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Model reload failed: {str(e)}")
+    return {"active": version.describe(), "registry": registry.describe()}
+
+@app.post("/admin/rollback")
+async def rollback_model(version: Optional[str] = None,
+                         x_admin_token: Optional[str] = Header(None)):
+    """Re-activate a previous model version (the most recent one by default); needs ADMIN_TOKEN"""
+    require_admin_token(x_admin_token)
+    try:
+        active = registry.rollback(version)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    return {"active": active.describe(), "registry": registry.describe()}
+
+def apply_feedback(model_dir, raw, final_scores):
+    """Update the linear model in `model_dir` from labeled rows into FEEDBACK_MODEL_DIR and activate it"""
+    summary = update_model_dir(model_dir, raw, final_scores, FEEDBACK_REFIT_EVERY, output_dir=FEEDBACK_MODEL_DIR)
+    version = registry.reload(FEEDBACK_MODEL_DIR)
+    if summary['accuracy_alert']:
+        print(f"Feedback RMSE {summary['feedback_rmse']:.3f} is well above the training RMSE "
+              f"{summary['training_rmse']:.3f}; consider retraining")
+    return {**summary, "model_version": version.version}
+
+@app.post("/feedback")
+async def submit_feedback(feedback: FeedbackInput, x_admin_token: Optional[str] = Header(None)):
+    """
+    Update the linear model with students' actual final scores, without retraining.
+
+    Each row is learned by recursive least squares (the result equals refitting
+    on the training data plus all feedback); the updated model is written to
+    FEEDBACK_MODEL_DIR as model.bin and activated. `feedback_rmse` is measured
+    on rows before they are learned from. Disabled until ADMIN_TOKEN is set.
+    """
+    require_admin_token(x_admin_token)
+    if len(feedback.students) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(feedback.students)} records (max {MAX_BATCH_SIZE})"
+        )
+    active = registry.active
+    if active is None:
+        raise HTTPException(status_code=503, detail="No model loaded")
+
+    raw = [[getattr(student, name) for name in INPUT_FEATURES] for student in feedback.students]
+    final_scores = [student.final_score for student in feedback.students]
+    try:
+        return await asyncio.to_thread(apply_feedback, active.source_dir, raw, final_scores)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=f"Online update not possible: {str(e)}")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
@@ -0,0 +1,390 @@
+"""
+Versioned model registry with hot reload for the prediction API.
+
+A ModelVersion bundles everything loaded from one set of artifacts: the
+pickle-free model.bin when the directory has one (see artifact.py), otherwise
+best_model.pkl, scaler.pkl and model_info.json. joblib and scikit-learn are
+only imported for the pickled form. The registry loads new
+versions off the request path, self-checks and warms them, then swaps the
+active reference in one assignment so in-flight requests keep the version
+they started with. The last few versions are kept for instant rollback.
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from artifact import ARTIFACT_FILE, read_artifact
+from features import N_FEATURES, N_RAW_FEATURES, FeatureTransformer
+from inference import FusedLinearModel, FusedPredictionInterval, float32_deviation
+from tree_engine import CompiledTreeEnsemble
+
+MODEL_FILE = 'best_model.pkl'
+SCALER_FILE = 'scaler.pkl'
+INFO_FILE = 'model_info.json'
+PICKLE_FILES = (MODEL_FILE, SCALER_FILE, INFO_FILE)
+
+# Above this many rows sklearn's compiled tree code beats the NumPy tree engine,
+# so batches that large go to sklearn when the pickled model is loaded (the
+# results are bit-identical either way)
+TREE_ENGINE_MAX_ROWS = 512
+
+# Raw input rows used to self-check and warm a freshly loaded version
+# (20h study, 8h sleep, 90% attendance, 85 previous, 5h extracurricular, stress 4,
+# and the same at the lower and upper input bounds)
+SELF_CHECK_INPUTS = np.array([
+    [20, 8, 90, 85, 5, 4],
+    [0, 4, 50, 30, 0, 1],
+    [40, 12, 100, 100, 20, 10],
+], dtype=float)
+
+# Raw input rows on which a float32 batch kernel must match float64 before it
+# is used: the self-check rows plus a fixed uniform sample of the input bounds
+FLOAT32_CHECK_INPUTS = np.vstack([
+    SELF_CHECK_INPUTS,
+    np.random.default_rng(0).uniform(SELF_CHECK_INPUTS[1], SELF_CHECK_INPUTS[2], size=(10000, N_RAW_FEATURES)),
+])
+
+
+def artifact_mtime(model_dir):
+    """Last modification time (ns) of the model files in `model_dir`, 0 if there are none."""
+    for names in ((ARTIFACT_FILE,), PICKLE_FILES):
+        try:
+            return max(os.stat(os.path.join(model_dir, name)).st_mtime_ns for name in names)
+        except OSError:
+            continue
+    return 0
+
+
+class ModelVersion:
+    """One immutable, fully loaded set of model artifacts."""
+
+    def __init__(self, version, model, scaler, info, source_dir, fused=None, trees=None,
+                 interval=None, scaler_stats=None, artifact_format='pickle'):
+        self.version = version
+        self.model = model
+        self.scaler = scaler
+        self.info = info
+        self.source_dir = source_dir
+        self.artifact_format = artifact_format
+        self.loaded_at = time.time()
+
+        # Training mean and scale of every feature, the drift monitor's baseline
+        if scaler_stats is None and scaler is not None:
+            scaler_stats = (scaler.mean_, scaler.scale_)
+        self.feature_mean, self.feature_scale = scaler_stats or (None, None)
+
+        # The feature transform the model was trained with; raises if this
+        # code cannot build the same features
+        self.transformer = FeatureTransformer.from_config(
+            info.get('feature_transformer'), info.get('feature_names')
+        )
+
+        # Linear models are served through a fused scaler+model kernel, trees
+        # and forests through the flattened tree engine; anything else keeps
+        # going through sklearn
+        self.fused = fused if fused is not None else FusedLinearModel.from_sklearn(model, scaler)
+        self.trees = trees
+        if self.fused is None and self.trees is None and model is not None:
+            self.trees = CompiledTreeEnsemble.from_sklearn(model, scaler)
+
+        # Optional float32 copy of the linear kernel for batches (enable_float32)
+        self.fused32 = None
+        self.float32_deviation = None
+
+        # Prediction intervals exist only for linear models trained with them
+        self.interval = interval
+        if self.interval is None and self.fused is not None and scaler is not None:
+            self.interval = FusedPredictionInterval.from_info(
+                info.get('prediction_interval'), scaler.mean_, scaler.scale_
+            )
+
+    @classmethod
+    def load(cls, model_dir):
+        """Load the artifacts in `model_dir` into a new version."""
+        if os.path.exists(os.path.join(model_dir, ARTIFACT_FILE)):
+            return cls.load_artifact(model_dir)
+        return cls.load_pickle(model_dir)
+
+    @classmethod
+    def load_artifact(cls, model_dir):
+        """Load model.bin; needs nothing beyond NumPy."""
+        artifact = read_artifact(os.path.join(model_dir, ARTIFACT_FILE))
+        arrays = artifact.arrays
+        fused = trees = interval = None
+        if artifact.model_type == 'linear':
+            fused = FusedLinearModel.from_linear(
+                arrays['coef'], arrays['intercept'], arrays['scaler_mean'], arrays['scaler_scale']
+            )
+            interval = FusedPredictionInterval.from_info(
+                artifact.info.get('prediction_interval'), arrays['scaler_mean'], arrays['scaler_scale']
+            )
+        elif artifact.model_type == 'tree_ensemble':
+            trees = CompiledTreeEnsemble.from_arrays(arrays)
+        else:
+            raise ValueError(f"unsupported artifact model type {artifact.model_type!r}")
+
+        scaler_stats = None
+        if 'scaler_mean' in arrays and 'scaler_scale' in arrays:
+            scaler_stats = (arrays['scaler_mean'], arrays['scaler_scale'])
+        return cls(artifact.checksum[:12], None, None, artifact.info, model_dir,
+                   fused=fused, trees=trees, interval=interval, scaler_stats=scaler_stats,
+                   artifact_format='artifact')
+
+    @classmethod
+    def load_pickle(cls, model_dir):
+        """Load best_model.pkl, scaler.pkl and model_info.json (imports sklearn)."""
+        import joblib
+
+        # Read every file once so the version hash describes exactly the
+        # bytes that were loaded, even if a deploy replaces them meanwhile
+        contents = []
+        for name in PICKLE_FILES:
+            with open(os.path.join(model_dir, name), 'rb') as f:
+                contents.append(f.read())
+
+        digest = hashlib.sha256()
+        for content in contents:
+            digest.update(content)
+
+        model = joblib.load(io.BytesIO(contents[0]))
+        scaler = joblib.load(io.BytesIO(contents[1]))
+        info = json.loads(contents[2])
+        return cls(digest.hexdigest()[:12], model, scaler, info, model_dir)
+
+    def enable_float32(self, tolerance, sample=FLOAT32_CHECK_INPUTS):
+        """
+        Score batches through a float32 copy of the linear kernel, but only if
+        its predictions on the `sample` raw rows stay within `tolerance` of
+        float64. Returns whether it was enabled; models without a fused
+        linear kernel always stay float64.
+        """
+        if self.fused is None:
+            return False
+        self.float32_deviation = float32_deviation(self.fused, self.transformer, sample)
+        if self.float32_deviation > tolerance:
+            self.fused32 = None
+            return False
+        self.fused32 = self.fused.astype(np.float32)
+        return True
+
+    def batch_features(self, raw):
+        """Feature matrix for (n, 6) raw inputs; float32 when the float32 kernel is enabled."""
+        raw = np.asarray(raw, dtype=np.float64).reshape(-1, N_RAW_FEATURES)
+        out = None
+        if self.fused32 is not None:
+            out = np.empty((len(raw), N_FEATURES), dtype=np.float32)
+        return self.transformer.transform(raw, out=out)
+
+    def predict(self, features):
+        """Raw (unclipped) predictions for an (n, 9) feature matrix (float64 out)."""
+        if self.fused32 is not None and features.dtype == np.float32:
+            return self.fused32.predict(features).astype(np.float64)
+        if self.fused is not None:
+            return self.fused.predict(features)
+        if self.trees is not None and (self.model is None or len(features) <= TREE_ENGINE_MAX_ROWS):
+            return self.trees.predict(features)
+        return self.model.predict(self.scaler.transform(features))
+
+    def predict_one(self, features, timer=None):
+        """
+        Raw (unclipped) prediction for a single 9-element feature vector.
+
+        `timer`, if given, gets a `mark()` call after the scaling and
+        prediction stages (see metrics.StageTimer).
+        """
+        kernel = self.fused if self.fused is not None else self.trees
+        if kernel is not None:
+            prediction = kernel.predict_one(features)
+            if timer is not None:
+                timer.mark('predict')
+            return prediction
+
+        features_scaled = self.scaler.transform(features.reshape(1, -1))
+        if timer is not None:
+            timer.mark('transform')
+        prediction = self.model.predict(features_scaled)[0]
+        if timer is not None:
+            timer.mark('predict')
+        return prediction
+
+    def self_check(self):
+        """Raise ValueError unless the version produces sane predictions; also warms it up."""
+        counts = [(name, getattr(component, 'n_features_in_', N_FEATURES))
+                  for name, component in (('model', self.model), ('scaler', self.scaler))]
+        if self.fused is not None:
+            counts.append(('fused kernel', self.fused.coef.size))
+        for name, n_features in counts:
+            if n_features != N_FEATURES:
+                raise ValueError(f"{name} expects {n_features} features, API provides {N_FEATURES}")
+
+        features = self.transformer.transform(SELF_CHECK_INPUTS)
+        batch = self.predict(features)
+        single = np.array([self.predict_one(self.transformer.transform(row)) for row in SELF_CHECK_INPUTS])
+        if not np.all(np.isfinite(batch)):
+            raise ValueError(f"self-check produced non-finite predictions: {batch}")
+        if not np.allclose(batch, single, rtol=0, atol=1e-6):
+            raise ValueError("self-check single and batch predictions disagree")
+
+        if self.interval is not None:
+            widths = self.interval.half_width(features)
+            if not np.all(np.isfinite(widths) & (widths > 0)):
+                raise ValueError(f"self-check produced invalid prediction intervals: {widths}")
+
+    def describe(self):
+        return {
+            "version": self.version,
+            "model_name": self.info.get('model_name'),
+            "loaded_at": self.loaded_at,
+            "source_dir": self.source_dir,
+            "format": self.artifact_format,
+            "fused_kernel": self.fused is not None,
+            "tree_engine": self.trees is not None,
+            "batch_float32": self.fused32 is not None,
+            "float32_max_deviation": self.float32_deviation,
+            "prediction_intervals": self.interval is not None,
+            "feature_transformer": self.transformer.to_config()
+        }
+
+
+class ModelRegistry:
+    """Holds the active ModelVersion plus a bounded history for rollback."""
+
+    def __init__(self, model_dir, keep=3, float32_tolerance=None, extra_dirs=()):
+        self.model_dir = model_dir
+        # Directories watched for new artifacts besides the one last loaded,
+        # e.g. where online feedback updates are written
+        self.watch_dirs = tuple(dict.fromkeys((model_dir, *extra_dirs)))
+        # When set, every loaded version tries to enable its float32 batch kernel
+        self.float32_tolerance = float32_tolerance
+        self.active = None
+        self.history = deque(maxlen=keep)
+        self.last_error = None
+        self.reloads = 0
+
+        self._lock = threading.Lock()
+        # Artifact signature last seen (loaded or rejected) per directory
+        self._seen_signatures = {}
+
+    def _signature(self, model_dir):
+        """Cheap change detector: (mtime, size) of every artifact file."""
+        names = PICKLE_FILES
+        if os.path.exists(os.path.join(model_dir, ARTIFACT_FILE)):
+            names = (ARTIFACT_FILE,)
+        signature = []
+        for name in names:
+            stat = os.stat(os.path.join(model_dir, name))
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def _activate(self, version):
+        if self.active is not None:
+            self.history.appendleft(self.active)
+        # Single reference assignment: requests already holding the old
+        # version finish with it, new requests see the new one
+        self.active = version
+
+    def reload(self, model_dir=None):
+        """
+        Load, self-check and activate the artifacts in `model_dir` (default: the
+        registry directory). Returns the active version; raises if the new
+        artifacts fail to load or self-check, leaving the current version active.
+        """
+        model_dir = model_dir or self.model_dir
+        with self._lock:
+            try:
+                signature = self._signature(model_dir)
+                candidate = ModelVersion.load(model_dir)
+                if self.active is not None and candidate.version == self.active.version:
+                    self._seen_signatures[model_dir] = signature
+                    return self.active
+                candidate.self_check()
+                if self.float32_tolerance is not None:
+                    candidate.enable_float32(self.float32_tolerance)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                raise
+
+            self._activate(candidate)
+            self.model_dir = model_dir
+            self._seen_signatures[model_dir] = signature
+            self.last_error = None
+            self.reloads += 1
+            return candidate
+
+    def rollback(self, version=None):
+        """Re-activate a previous version (the most recent one by default)."""
+        with self._lock:
+            for i, candidate in enumerate(self.history):
+                if version is None or candidate.version == version:
+                    del self.history[i]
+                    self._activate(candidate)
+                    return candidate
+        raise KeyError(f"version {version} is not in the rollback history" if version
+                       else "no previous version to roll back to")
+
+    def reload_newest(self):
+        """
+        Load the watched directory whose artifacts were written last, so feedback
+        updates survive a restart but a newer deploy wins; the files in the other
+        directories count as seen.
+        """
+        newest = max(self.watch_dirs, key=artifact_mtime)
+        try:
+            return self.reload(newest)
+        finally:
+            for model_dir in self.watch_dirs:
+                try:
+                    self._seen_signatures.setdefault(model_dir, self._signature(model_dir))
+                except OSError:
+                    pass
+
+    def changed_on_disk(self, model_dir=None):
+        """True if the artifact files in `model_dir` (default: the loaded one) differ from the ones last seen."""
+        model_dir = model_dir or self.model_dir
+        try:
+            return self._signature(model_dir) != self._seen_signatures.get(model_dir)
+        except OSError:
+            # Files are missing or being replaced right now; look again next poll
+            return False
+
+    async def watch(self, interval):
+        """Poll the model directories and hot-reload when their artifacts change."""
+        while True:
+            await asyncio.sleep(interval)
+            for model_dir in dict.fromkeys((self.model_dir, *self.watch_dirs)):
+                if self.changed_on_disk(model_dir):
+                    await self._reload_changed(model_dir, interval)
+
+    async def _reload_changed(self, model_dir, interval):
+        # Let a multi-file deploy finish before loading anything
+        try:
+            signature = self._signature(model_dir)
+            await asyncio.sleep(interval / 2)
+            if self._signature(model_dir) != signature:
+                return
+        except OSError:
+            return
+        try:
+            version = await asyncio.to_thread(self.reload, model_dir)
+            print(f"Model reloaded: {version.version} ({version.info.get('model_name')})")
+        except Exception as e:
+            # Keep serving the current version; remember the files so we
+            # do not retry the same broken artifacts every poll
+            self._seen_signatures[model_dir] = signature
+            print(f"Model reload failed, keeping current version: {e}")
+
+    def describe(self):
+        return {
+            "active": self.active.describe() if self.active is not None else None,
+            "previous_versions": [version.describe() for version in self.history],
+            "reloads": self.reloads,
+            "last_error": self.last_error
+        }
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Multi-worker pre-fork server for the Student Performance Prediction API.
+
+`uvicorn --workers N` starts every worker as a fresh interpreter, so each one
+re-imports the app and loads its own copy of the model. This server imports
+prediction.py once, which loads the model, then binds the listening socket and
+forks the workers. Every worker inherits the already-loaded model and shares
+its memory pages with the parent and the other workers (copy-on-write, and
+model.bin is a read-only memory mapping). The kernel spreads incoming
+connections over the workers accepting on the shared socket.
+
+The parent only supervises: it restarts a worker that dies and stops them all
+on SIGTERM/SIGINT. Each worker keeps its own cache, micro-batcher, metrics and
+model watcher, so /metrics and /cache-stats describe the worker that answered
+and a hot reload happens in every worker.
+
+Usage: python serve.py [--workers N] [--host 0.0.0.0] [--port 8000]
+       (WEB_CONCURRENCY sets the default worker count, otherwise the core count)
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+
+import uvicorn
+
+# A worker that dies this soon after starting is not restarted (it would crash-loop)
+MIN_WORKER_LIFETIME = 1.0
+
+
+def default_workers():
+    return int(os.environ.get('WEB_CONCURRENCY', os.cpu_count() or 1))
+
+
+def bind_socket(host, port, backlog=2048):
+    sock = socket.socket(socket.AF_INET6 if ':' in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock, log_level):
+    """Serve `app` on the inherited socket until told to stop (runs in the child)."""
+    # The parent's handlers only make sense in the parent
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    server = uvicorn.Server(uvicorn.Config(app, log_level=log_level, access_log=False))
+    server.run(sockets=[sock])
+
+
+def spawn_worker(app, sock, log_level):
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            run_worker(app, sock, log_level)
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            # Never fall back into the parent's supervision loop
+            os._exit(code)
+    return pid
+
+
+def serve(app, host='0.0.0.0', port=8000, workers=None, log_level='info'):
+    """Fork `workers` processes serving the already-imported `app` and supervise them."""
+    workers = workers or default_workers()
+    sock = bind_socket(host, port)
+
+    # Move everything loaded so far out of the garbage collector's reach, so
+    # collections in the workers do not touch (and un-share) those pages
+    gc.collect()
+    gc.freeze()
+
+    started = {}
+    for _ in range(workers):
+        started[spawn_worker(app, sock, log_level)] = time.monotonic()
+    print(f"Serving on http://{host}:{port} with {workers} worker(s): {sorted(started)}")
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in started:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while started:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        lifetime = time.monotonic() - started.pop(pid, time.monotonic())
+        if stopping:
+            continue
+        code = os.waitstatus_to_exitcode(status)
+        if lifetime < MIN_WORKER_LIFETIME:
+            print(f"Worker {pid} exited with {code} right after starting, not restarting it")
+            continue
+        new_pid = spawn_worker(app, sock, log_level)
+        started[new_pid] = time.monotonic()
+        print(f"Worker {pid} exited with {code}, started {new_pid}")
+
+    sock.close()
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Serve the prediction API with pre-forked workers")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', '8000')))
+    parser.add_argument('--workers', type=int, default=default_workers(),
+                        help="worker processes (default: WEB_CONCURRENCY or the core count)")
+    parser.add_argument('--log-level', default='info')
+    args = parser.parse_args()
+
+    if not hasattr(os, 'fork'):
+        sys.exit("serve.py needs os.fork(); use `uvicorn prediction:app` on this platform")
+
+    # Importing the app loads the model, once, before any worker exists
+    from prediction import app
+    serve(app, args.host, args.port, args.workers, args.log_level)
+
+
+if __name__ == "__main__":
+    main()
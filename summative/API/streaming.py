@@ -0,0 +1,219 @@
+"""
+Streaming bulk scoring for NDJSON and CSV uploads.
+
+The request body is consumed incrementally, split into fixed-size chunks of
+rows, and each chunk is validated, scored and written back before the next
+one is read, so memory use depends on the chunk size rather than the upload.
+
+Lines are limited to `max_line_bytes`; longer lines, undecodable bytes and
+CSV quoted fields spanning lines (not supported: every line is one row) are
+reported as that row's error.
+"""
+
+import csv
+import io
+import json
+
+import numpy as np
+from starlette.responses import StreamingResponse
+
+NDJSON = 'ndjson'
+CSV = 'csv'
+
+# Optional identifier passed through from input to output rows
+ID_FIELD = 'student_id'
+
+# Longest input line accepted; a valid row is a few hundred bytes
+MAX_LINE_BYTES = 65536
+
+OUTPUT_COLUMNS = ['row', ID_FIELD, 'predicted_score', 'confidence_level', 'error']
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """StreamingResponse whose body is produced while the request body is still being read.
+
+    The stock StreamingResponse may listen for client disconnects on `receive`,
+    which would steal the request body messages we are consuming. Here the
+    request stream itself is the only reader, and it raises on disconnect.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+
+class LineTooLong:
+    """Yielded by iter_lines in place of a line over the length limit."""
+
+    def __init__(self, limit):
+        self.error = f"line longer than {limit} bytes"
+
+
+def decode_line(line):
+    """UTF-8 text of one line; invalid bytes become U+FFFD and fail validation."""
+    return line.decode('utf-8', errors='replace').rstrip('\r')
+
+
+async def iter_lines(byte_chunks, max_line_bytes=MAX_LINE_BYTES):
+    """
+    Yield decoded lines from an async iterator of body chunks.
+
+    At most `max_line_bytes` of a partial line are buffered: a longer line is
+    skipped up to its newline and yielded as a LineTooLong.
+    """
+    buffer = bytearray()
+    too_long = False
+    async for chunk in byte_chunks:
+        start = 0
+        end = chunk.find(b'\n')
+        while end >= 0:
+            if too_long or len(buffer) + end - start > max_line_bytes:
+                yield LineTooLong(max_line_bytes)
+            elif buffer:
+                buffer += chunk[start:end]
+                yield decode_line(buffer)
+            else:
+                yield decode_line(chunk[start:end])
+            buffer.clear()
+            too_long = False
+            start = end + 1
+            end = chunk.find(b'\n', start)
+        if not too_long:
+            buffer += chunk[start:]
+            if len(buffer) > max_line_bytes:
+                buffer.clear()
+                too_long = True
+    if too_long:
+        yield LineTooLong(max_line_bytes)
+    elif buffer:
+        yield decode_line(buffer)
+
+
+def parse_rows(lines, input_format, features, header):
+    """
+    Parse a chunk of lines into (raw, ids, errors).
+
+    raw is an (n, len(features)) float array with NaN where a value is missing
+    or not numeric; errors holds a parse error message (or None) per row.
+    """
+    raw = np.full((len(lines), len(features)), np.nan)
+    ids = [None] * len(lines)
+    errors = [None] * len(lines)
+
+    # Only whole, one-line rows are parsed; an unbalanced quote would make the
+    # csv module read on into the next line
+    rows = []
+    for i, line in enumerate(lines):
+        if isinstance(line, LineTooLong):
+            errors[i] = line.error
+        elif input_format == CSV and line.count('"') % 2:
+            errors[i] = "quoted CSV fields cannot span lines"
+        else:
+            rows.append(i)
+
+    if input_format == CSV:
+        records = csv.DictReader([lines[i] for i in rows], fieldnames=header)
+    else:
+        records = (lines[i] for i in rows)
+
+    for i, record in zip(rows, records):
+        try:
+            if input_format != CSV:
+                record = json.loads(record)
+                if not isinstance(record, dict):
+                    raise ValueError("each line must be a JSON object")
+            ids[i] = record.get(ID_FIELD)
+            missing = [name for name in features if record.get(name) in (None, '')]
+            if missing:
+                raise ValueError(f"missing field(s): {', '.join(missing)}")
+            raw[i] = [float(record[name]) for name in features]
+        except (ValueError, TypeError) as e:
+            errors[i] = str(e)
+            raw[i] = np.nan
+
+    return raw, ids, errors
+
+
+def check_bounds(raw, features, bounds, errors):
+    """Record a bounds error for every parsed row with an out-of-range value."""
+    lower = np.array([bounds[name][0] for name in features])
+    upper = np.array([bounds[name][1] for name in features])
+    # Written as a negation so NaN/inf values count as out of range too
+    out_of_range = ~((raw >= lower) & (raw <= upper))
+
+    for i, j in zip(*np.nonzero(out_of_range)):
+        if errors[i] is None:
+            name = features[j]
+            errors[i] = f"{name} must be between {bounds[name][0]} and {bounds[name][1]}"
+
+    return np.array([error is None for error in errors], dtype=bool)
+
+
+def format_rows(first_row, ids, scores, levels, errors, output_format):
+    """Render one scored chunk as NDJSON or CSV text."""
+    if output_format == CSV:
+        out = io.StringIO()
+        writer = csv.writer(out)
+        for i, error in enumerate(errors):
+            if error is None:
+                writer.writerow([first_row + i, ids[i] or '', scores[i], levels[i], ''])
+            else:
+                writer.writerow([first_row + i, ids[i] or '', '', '', error])
+        return out.getvalue()
+
+    lines = []
+    for i, error in enumerate(errors):
+        if error is None:
+            record = {"row": first_row + i, "predicted_score": scores[i], "confidence_level": levels[i]}
+        else:
+            record = {"row": first_row + i, "error": error}
+        if ids[i] is not None:
+            record[ID_FIELD] = ids[i]
+        lines.append(json.dumps(record))
+    return '\n'.join(lines) + '\n'
+
+
+async def stream_predictions(byte_chunks, input_format, output_format, chunk_rows,
+                             features, bounds, score_chunk, max_line_bytes=MAX_LINE_BYTES):
+    """
+    Score a streamed upload chunk by chunk and yield formatted output text.
+
+    score_chunk is a coroutine taking an (n, len(features)) array of valid raw
+    rows and returning (scores, confidence_levels) arrays.
+    """
+    header = None
+    if output_format == CSV:
+        yield ','.join(OUTPUT_COLUMNS) + '\n'
+
+    chunk = []
+    first_row = 0
+
+    async def score_lines(lines, first_row):
+        raw, ids, errors = parse_rows(lines, input_format, features, header)
+        valid = check_bounds(raw, features, bounds, errors)
+
+        scores = [None] * len(lines)
+        levels = [None] * len(lines)
+        if valid.any():
+            valid_scores, valid_levels = await score_chunk(raw[valid])
+            for i, score, level in zip(np.flatnonzero(valid), valid_scores.tolist(), valid_levels.tolist()):
+                scores[i] = score
+                levels[i] = level
+
+        return format_rows(first_row, ids, scores, levels, errors, output_format)
+
+    async for line in iter_lines(byte_chunks, max_line_bytes):
+        if isinstance(line, str) and not line.strip():
+            continue
+        if input_format == CSV and header is None:
+            # Without a usable header every row reports its fields as missing
+            header = next(csv.reader([line])) if isinstance(line, str) else []
+            continue
+
+        chunk.append(line)
+        if len(chunk) >= chunk_rows:
+            yield await score_lines(chunk, first_row)
+            first_row += len(chunk)
+            chunk = []
+
+    if chunk:
+        yield await score_lines(chunk, first_row)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for the token-protected admin endpoints.
+
+Run with `python -m pytest test_admin.py` from the API directory.
+"""
+
+import os
+
+from fastapi.testclient import TestClient
+
+import prediction
+from artifact import ARTIFACT_FILE, export_model
+from registry import ModelRegistry
+from test_online import trained
+
+client = TestClient(prediction.app)
+
+
+def test_reload_needs_a_configured_token_and_a_directory_inside_model_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(prediction, 'MODEL_DIR', str(tmp_path))
+    monkeypatch.setattr(prediction, 'ADMIN_TOKEN', None)
+    assert client.post("/admin/reload").status_code == 503
+
+    monkeypatch.setattr(prediction, 'ADMIN_TOKEN', 'secret')
+    assert client.post("/admin/reload", headers={'X-Admin-Token': 'wrong'}).status_code == 403
+
+    outside = tmp_path.parent
+    (tmp_path / 'link').symlink_to(outside)
+    for model_dir in (str(outside), '../', 'link'):
+        response = client.post("/admin/reload", json={"model_dir": model_dir}, headers={'X-Admin-Token': 'secret'})
+        assert response.status_code == 403, model_dir
+
+    os.makedirs(tmp_path / 'empty')
+    response = client.post("/admin/reload", json={"model_dir": "empty"}, headers={'X-Admin-Token': 'secret'})
+    assert response.status_code == 422 and "Model reload failed" in response.json()['detail']
+
+
+def test_rollback_and_drift_reset_need_a_configured_token(monkeypatch):
+    for path in ("/admin/rollback", "/admin/drift/reset"):
+        monkeypatch.setattr(prediction, 'ADMIN_TOKEN', None)
+        assert client.post(path).status_code == 503, path
+
+        monkeypatch.setattr(prediction, 'ADMIN_TOKEN', 'secret')
+        assert client.post(path).status_code == 403, path
+        assert client.post(path, headers={'X-Admin-Token': 'wrong'}).status_code == 403, path
+
+
+def test_feedback_needs_a_configured_token_and_leaves_the_deployed_model_alone(monkeypatch, tmp_path):
+    deployed, online = tmp_path / 'deployed', tmp_path / 'online'
+    deployed.mkdir()
+    model, scaler, info, _, _ = trained()
+    assert export_model(str(deployed / ARTIFACT_FILE), model, scaler, info)
+    original = (deployed / ARTIFACT_FILE).read_bytes()
+    registry = ModelRegistry(str(deployed), extra_dirs=(str(online),))
+    registry.reload_newest()
+    monkeypatch.setattr(prediction, 'registry', registry)
+    monkeypatch.setattr(prediction, 'FEEDBACK_MODEL_DIR', str(online))
+
+    student = {"study_hours": 20, "sleep_hours": 8, "attendance_rate": 90, "previous_test_score": 85,
+               "extracurricular_hours": 5, "stress_level": 4, "final_score": 70}
+    monkeypatch.setattr(prediction, 'ADMIN_TOKEN', None)
+    assert client.post("/feedback", json={"students": [student]}).status_code == 503
+    assert not online.exists()
+
+    monkeypatch.setattr(prediction, 'ADMIN_TOKEN', 'secret')
+    assert client.post("/feedback", json={"students": [student]}).status_code == 403
+    response = client.post("/feedback", json={"students": []}, headers={'X-Admin-Token': 'secret'})
+    assert response.status_code == 422
+    response = client.post("/feedback", json={"students": [student]}, headers={'X-Admin-Token': 'secret'})
+    assert response.status_code == 200 and response.json()['total_feedback_rows'] == 1
+    assert (deployed / ARTIFACT_FILE).read_bytes() == original
+    assert registry.active.source_dir == str(online)
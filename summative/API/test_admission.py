@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for admission control and load shedding.
+
+Run with `python -m pytest test_admission.py` from the API directory.
+"""
+
+import asyncio
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from admission import AdmissionMiddleware, Lane
+from metrics import Metrics, MetricsMiddleware
+
+
+def test_lane_queues_in_order_and_sheds_beyond_the_queue():
+    async def scenario():
+        lane = Lane('test', max_in_flight=1, max_queue=2, queue_timeout=5)
+        assert await lane.acquire()
+
+        order = []
+
+        async def waiter(name):
+            assert await lane.acquire()
+            order.append(name)
+            lane.release()
+
+        waiters = [asyncio.create_task(waiter(name)) for name in ('first', 'second')]
+        await asyncio.sleep(0)
+        assert lane.queue_depth == 2
+        assert not await lane.acquire()  # queue full: shed at once
+
+        lane.release()
+        await asyncio.gather(*waiters)
+        assert order == ['first', 'second']
+        assert (lane.in_flight, lane.queue_depth) == (0, 0)
+        assert lane.stats()['shed'] == {'queue_full': 1, 'timeout': 0}
+
+    asyncio.run(scenario())
+
+
+def test_lane_sheds_after_queue_timeout():
+    async def scenario():
+        lane = Lane('test', max_in_flight=1, max_queue=4, queue_timeout=0.01)
+        assert await lane.acquire()
+        assert not await lane.acquire()
+        assert lane.queue_depth == 0 and lane.shed_timeout == 1
+
+        # The timed-out waiter must not swallow the slot
+        lane.release()
+        assert lane.in_flight == 0
+        assert await lane.acquire()
+
+    asyncio.run(scenario())
+
+
+def test_middleware_returns_503_with_retry_after_and_bypasses_other_paths():
+    app = FastAPI()
+    lane = Lane('predict', max_in_flight=0, max_queue=0, queue_timeout=0)
+
+    @app.get("/predict")
+    async def predict():
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    app.add_middleware(AdmissionMiddleware, lanes={'/predict': lane}, retry_after=3)
+    client = TestClient(app)
+
+    response = client.get("/predict")
+    assert response.status_code == 503
+    assert response.headers['retry-after'] == '3'
+    assert client.get("/health").status_code == 200
+
+
+def test_queue_wait_is_its_own_stage_not_validation():
+    app = FastAPI()
+    metrics = Metrics()
+    lane = Lane('predict', max_in_flight=1, max_queue=4, queue_timeout=5)
+
+    @app.post("/predict")
+    async def predict(request: Request):
+        state = request.scope['state']
+        timer = metrics.timer(state['request_start'], state.get('admitted_at'))
+        timer.mark('validation')
+        await asyncio.sleep(0.05)
+        timer.mark('model')
+        return {"ok": True}
+
+    app.add_middleware(AdmissionMiddleware, lanes={'/predict': lane})
+    app.add_middleware(MetricsMiddleware, metrics=metrics, routes=app.routes)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            responses = await asyncio.gather(client.post('/predict'), client.post('/predict'))
+        assert [response.status_code for response in responses] == [200, 200]
+
+    asyncio.run(scenario())
+    # The second request queued behind the first one's 50 ms
+    assert metrics.stages['admission'].total >= 0.04
+    assert metrics.stages['validation'].total < 0.02
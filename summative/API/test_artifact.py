@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for the pickle-free model artifact.
+
+Run with `python -m pytest test_artifact.py` from the API directory.
+"""
+
+import json
+import os
+import shutil
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.tree import DecisionTreeRegressor
+
+from artifact import ARTIFACT_FILE, ArtifactError, export_linear_model, read_artifact
+from conftest import random_raw
+from features import FEATURE_TRANSFORMER
+from registry import PICKLE_FILES, ModelVersion
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def export_deployed(model_dir):
+    model = joblib.load(os.path.join(API_DIR, 'best_model.pkl'))
+    scaler = joblib.load(os.path.join(API_DIR, 'scaler.pkl'))
+    with open(os.path.join(API_DIR, 'model_info.json')) as f:
+        info = json.load(f)
+    path = os.path.join(model_dir, ARTIFACT_FILE)
+    assert export_linear_model(path, model, scaler, info)
+    return path, info
+
+
+def test_artifact_predicts_like_pickles(tmp_path):
+    """model.bin serves exactly the predictions of the pickled model it was exported from"""
+    for name in PICKLE_FILES:
+        shutil.copy(os.path.join(API_DIR, name), tmp_path)
+    pickled = ModelVersion.load(str(tmp_path))
+
+    _, info = export_deployed(str(tmp_path))
+    exported = ModelVersion.load(str(tmp_path))
+    assert (pickled.artifact_format, exported.artifact_format) == ('pickle', 'artifact')
+    assert exported.info == info
+    exported.self_check()
+
+    raw = random_raw(2000, seed=0)
+    features = FEATURE_TRANSFORMER.transform(raw)
+    assert np.array_equal(exported.predict(features), pickled.predict(features))
+
+
+def test_corrupt_artifacts_are_rejected(tmp_path):
+    """Flipped bits, truncation and foreign files fail to load instead of serving garbage"""
+    path, _ = export_deployed(str(tmp_path))
+    with open(path, 'rb') as f:
+        content = f.read()
+
+    for broken in (content[:-8], content[:-1] + bytes([content[-1] ^ 1]), b'not a model' * 10):
+        with open(path, 'wb') as f:
+            f.write(broken)
+        with pytest.raises(ArtifactError):
+            read_artifact(path)
+
+
+def test_non_linear_models_are_not_exported(tmp_path):
+    model = DecisionTreeRegressor(max_depth=2).fit(np.random.rand(20, 9), np.random.rand(20))
+    path = os.path.join(str(tmp_path), ARTIFACT_FILE)
+    assert not export_linear_model(path, model, None, {})
+    assert not os.path.exists(path)
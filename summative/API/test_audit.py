@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Tests for the batched prediction audit log.
+
+Run with `python -m pytest test_audit.py` from the API directory.
+"""
+
+import asyncio
+import json
+import sqlite3
+import time
+
+import numpy as np
+
+import prediction
+from audit import AuditLog
+from cache import PredictionCache
+from metrics import NULL_TIMER
+
+ROW = [20.0, 8.0, 90.0, 85.0, 5.0, 4.0]
+
+
+def test_background_task_writes_batches_and_close_flushes_the_rest(tmp_path):
+    path = tmp_path / 'audit.jsonl'
+
+    async def scenario():
+        log = AuditLog(str(path), flush_size=10, flush_interval=60)
+        writer = asyncio.create_task(log.run())
+        await asyncio.sleep(0)
+        for i in range(25):
+            await log.record('/predict', 'v1', 0.5, ROW, float(i))
+        # Two full batches are written without waiting for the interval
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if log.written >= 20:
+                break
+        assert log.written >= 20 and log.buffer_depth < 10
+        writer.cancel()
+        await asyncio.gather(writer, return_exceptions=True)
+        log.close()
+        return log
+
+    log = asyncio.run(scenario())
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record['predicted_score'] for record in records] == [float(i) for i in range(25)]
+    assert records[0]['inputs']['study_hours'] == 20.0 and records[0]['model_version'] == 'v1'
+    assert log.stats()['written'] == 25
+
+
+def test_full_buffer_blocks_or_drops(tmp_path):
+    async def record(log, n):
+        for i in range(n):
+            await log.record('/predict', 'v1', 0.5, ROW, float(i))
+
+    blocking = AuditLog(str(tmp_path / 'block.jsonl'), flush_size=100, max_buffer=4)
+    asyncio.run(record(blocking, 10))
+    assert blocking.backpressure_waits == 2 and blocking.dropped == 0
+    blocking.close()
+    assert len((tmp_path / 'block.jsonl').read_text().splitlines()) == 10
+
+    dropping = AuditLog(str(tmp_path / 'drop.jsonl'), flush_size=100, max_buffer=4, overflow='drop')
+    asyncio.run(record(dropping, 10))
+    assert dropping.dropped == 6 and dropping.backpressure_waits == 0
+    dropping.close()
+    assert len((tmp_path / 'drop.jsonl').read_text().splitlines()) == 4
+
+
+def test_blocked_producers_wait_without_stalling_the_event_loop(tmp_path):
+    """A slow disk holds up the recording request, not other coroutines on the loop"""
+    path = tmp_path / 'audit.jsonl'
+    log = AuditLog(str(path), flush_size=100, flush_interval=60, max_buffer=4)
+    write_jsonl = log._write_jsonl
+
+    def slow_write(pending):
+        time.sleep(0.05)
+        write_jsonl(pending)
+
+    log._write_jsonl = slow_write
+
+    async def scenario():
+        writer = asyncio.create_task(log.run())
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        other = asyncio.create_task(ticker())
+        for i in range(20):
+            await log.record('/predict', 'v1', 0.5, ROW, float(i))
+        other.cancel()
+        writer.cancel()
+        await asyncio.gather(writer, other, return_exceptions=True)
+        return ticks
+
+    ticks = asyncio.run(scenario())
+    log.close()
+    # Four waits of ~50 ms each for the writer; the loop kept ticking meanwhile
+    assert log.backpressure_waits == 4 and ticks >= 20
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record['predicted_score'] for record in records] == [float(i) for i in range(20)]
+
+
+def test_sqlite_batches_keep_every_row(tmp_path):
+    path = tmp_path / 'audit.db'
+    log = AuditLog(str(path))
+
+    async def record():
+        await log.record('/predict', 'v1', 0.5, ROW, 57.5)
+        await log.record_many('/predict/batch', 'v2', 3.0, np.tile(ROW, (3, 1)), np.array([1.0, 2.0, 3.0]))
+
+    asyncio.run(record())
+    log.close()
+
+    with sqlite3.connect(path) as connection:
+        rows = connection.execute(
+            'SELECT endpoint, model_version, predicted_score, study_hours FROM predictions'
+        ).fetchall()
+    assert rows == [('/predict', 'v1', 57.5, 20.0), ('/predict/batch', 'v2', 1.0, 20.0),
+                    ('/predict/batch', 'v2', 2.0, 20.0), ('/predict/batch', 'v2', 3.0, 20.0)]
+
+
+def test_predict_records_the_inputs_as_sent_when_the_cache_quantizes(tmp_path, monkeypatch):
+    path = tmp_path / 'audit.jsonl'
+    log = AuditLog(str(path))
+    observed = []
+    monkeypatch.setattr(prediction, 'audit_log', log)
+    monkeypatch.setattr(prediction, 'prediction_cache', PredictionCache(100, 3600, 1.0))
+    monkeypatch.setattr(prediction, 'drift_monitor', type('Drift', (), {'observe': lambda self, row: observed.append(row)})())
+    monkeypatch.setattr(prediction, 'micro_batcher', None)
+
+    sent = [20.3, 7.8, 90.4, 84.6, 5.2, 4.0]
+    for _ in range(2):
+        asyncio.run(prediction.predict_one(sent, NULL_TIMER, time.perf_counter()))
+    log.close()
+
+    assert observed == [sent, sent]
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [list(record['inputs'].values()) for record in records] == [sent, sent]
+
+
+def test_quantized_inputs_stay_within_input_bounds(monkeypatch):
+    """Snapping to a coarse grid never moves a value near a bound outside what the API accepts"""
+    bounds = [prediction.INPUT_BOUNDS[name] for name in prediction.INPUT_FEATURES]
+    cache = PredictionCache(100, 3600, 5.0, bounds=bounds)
+    monkeypatch.setattr(prediction, 'prediction_cache', cache)
+    monkeypatch.setattr(prediction, 'drift_monitor', None)
+    monkeypatch.setattr(prediction, 'audit_log', None)
+    monkeypatch.setattr(prediction, 'micro_batcher', None)
+
+    sent = [39.0, 4.0, 98.0, 31.0, 19.0, 1.0]
+    key = cache.quantize(sent)
+    assert key == (40.0, 5.0, 100.0, 30.0, 20.0, 1.0)
+    assert all(low <= value <= high for value, (low, high) in zip(key, bounds))
+
+    score, _, _, _ = asyncio.run(prediction.predict_one(sent, NULL_TIMER, time.perf_counter()))
+    assert score == prediction.predict_student_performance(*key)
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Tests for /predict/batch.
+
+Run with `python -m pytest test_batch.py` from the API directory.
+"""
+
+from fastapi.testclient import TestClient
+
+import prediction
+
+client = TestClient(prediction.app)
+
+VALID = {"study_hours": 20, "sleep_hours": 8, "attendance_rate": 90,
+         "previous_test_score": 85, "extracurricular_hours": 5, "stress_level": 4}
+
+
+def test_records_that_are_not_objects_fail_only_their_row():
+    response = client.post("/predict/batch", json={"students": [VALID, 5, None, [VALID], {**VALID, "stress_level": 11}]})
+    assert response.status_code == 200
+    body = response.json()
+    assert (body['total'], body['succeeded'], body['failed']) == (5, 1, 4)
+    assert [item['index'] for item in body['predictions']] == [0]
+    assert [error['index'] for error in body['errors']] == [1, 2, 3, 4]
+    assert body['errors'][0]['errors'][0]['type'] == 'model_type'
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming input-drift monitor.
+
+Run with `python -m pytest test_drift.py` from the API directory.
+"""
+
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+from conftest import random_features, random_raw
+from drift import DriftMonitor, reference_histogram
+from features import FEATURE_NAMES, FEATURE_TRANSFORMER
+
+
+def training_baseline(n=5000):
+    X = random_features(n, seed=0)
+    scaler = StandardScaler().fit(X)
+    return scaler.mean_, scaler.scale_, reference_histogram(scaler.transform(X))
+
+
+def test_running_statistics_match_numpy():
+    """Single and batch observations merge into the exact mean, std and histogram of all rows"""
+    baseline = training_baseline()
+    monitor = DriftMonitor(lambda: baseline, buffer_rows=64)
+    raw = random_raw(1000, seed=1)
+    for row in raw[:150].tolist():
+        monitor.observe(row)
+    monitor.observe_batch(raw[150:700])
+    for row in raw[700:].tolist():
+        monitor.observe(row)
+
+    report = monitor.report()
+    X = FEATURE_TRANSFORMER.transform(raw)
+    assert report['observations'] == 1000
+    for i, name in enumerate(FEATURE_NAMES):
+        feature = report['features'][name]
+        assert abs(feature['live_mean'] - X[:, i].mean()) < 1e-9 * max(1, abs(X[:, i].mean()))
+        assert abs(feature['live_std'] - X[:, i].std(ddof=1)) < 1e-9 * max(1, X[:, i].std())
+        assert sum(feature['histogram']) == 1000
+
+
+def test_alerts_on_shifted_inputs_only():
+    baseline = training_baseline()
+    monitor = DriftMonitor(lambda: baseline)
+    monitor.observe_batch(random_raw(2000, seed=2))
+    assert monitor.report()['alerts'] == []
+
+    shifted = random_raw(2000, seed=3)
+    shifted[:, 0] = np.minimum(shifted[:, 0] + 15, 40)
+    monitor.observe_batch(shifted)
+    drifting = {(alert['feature'], alert['kind']) for alert in monitor.report()['alerts']}
+    assert ('study_hours', 'mean_shift') in drifting and ('study_hours', 'psi') in drifting
+    assert not any(feature == 'stress_level' for feature, _ in drifting)
+
+    monitor.reset()
+    assert monitor.report()['observations'] == 0
+
+
+def test_new_baseline_restarts_statistics():
+    baselines = [training_baseline()]
+    monitor = DriftMonitor(lambda: baselines[-1])
+    monitor.observe_batch(random_raw(300, seed=4))
+
+    mean, scale, reference = baselines[0]
+    baselines.append((mean + 1, scale, reference))
+    monitor.observe_batch(random_raw(200, seed=5))
+    assert monitor.report()['observations'] == 200
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for the /predict fast path.
+
+Run with `python -m pytest test_fastpath.py` from the API directory.
+"""
+
+import json
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+import prediction
+from batching import MicroBatcher
+from conftest import random_raw
+from fastpath import FastPathMiddleware, dumps
+from registry import ModelRegistry
+
+VALID = {"study_hours": 20, "sleep_hours": 8, "attendance_rate": 90,
+         "previous_test_score": 85, "extracurricular_hours": 5, "stress_level": 4}
+
+
+def test_middleware_answers_or_replays_the_body_to_the_route():
+    class Item(BaseModel):
+        value: int
+
+    app = FastAPI()
+
+    @app.post("/echo")
+    async def echo(item: Item):
+        return {"value": item.value, "path": "slow"}
+
+    async def handler(data, scope):
+        if type(data) is dict and type(data.get('value')) is int:
+            return 200, dumps({"value": data['value'], "path": "fast"})
+        return None
+
+    app.add_middleware(FastPathMiddleware, path='/echo', handler=handler)
+    client = TestClient(app)
+
+    assert client.post("/echo", json={"value": 3}).json() == {"value": 3, "path": "fast"}
+    assert client.post("/echo", json={"value": "3"}).json() == {"value": 3, "path": "slow"}
+    assert client.post("/echo", content=b'{"value": 3', headers={'content-type': 'application/json'}).status_code == 422
+    assert client.post("/echo", json={"value": "x"}).status_code == 422
+
+
+def test_fast_path_matches_the_pydantic_endpoint_byte_for_byte():
+    """Valid and invalid requests get the same status and body with the fast path on and off"""
+    slow_app = FastAPI()
+    slow_app.post("/predict", response_model=prediction.PredictionResponse)(prediction.predict_performance)
+    fast_app = FastAPI()
+    fast_app.post("/predict", response_model=prediction.PredictionResponse)(prediction.predict_performance)
+    fast_app.add_middleware(FastPathMiddleware, path='/predict', handler=prediction.predict_performance_fast)
+    slow, fast = TestClient(slow_app), TestClient(fast_app)
+
+    bodies = [dict(zip(prediction.INPUT_FEATURES, row)) for row in random_raw(50, seed=0).round(1).tolist()]
+    bodies += [
+        {**VALID, "study_hours": -1}, {**VALID, "stress_level": 11, "sleep_hours": 2},
+        {**VALID, "study_hours": "20"}, {**VALID, "study_hours": True}, {**VALID, "study_hours": None},
+        {k: v for k, v in VALID.items() if k != 'sleep_hours'}, [VALID], None,
+    ]
+    for body in bodies:
+        content = json.dumps(body).encode()
+        expected = slow.post("/predict", content=content, headers={'content-type': 'application/json'})
+        actual = fast.post("/predict", content=content, headers={'content-type': 'application/json'})
+        assert (actual.status_code, actual.content) == (expected.status_code, expected.content)
+
+
+def test_micro_batched_predict_ignores_the_float32_batch_kernel(monkeypatch):
+    """With BATCH_FLOAT32 on, /predict answers the same with and without micro-batching"""
+    registry = ModelRegistry(prediction.MODEL_DIR, float32_tolerance=1.0)
+    active = registry.reload()
+    assert active.fused32 is not None
+    # Skew the float32 kernel so any row scored through it would show
+    active.fused32.intercept += 1.0
+    monkeypatch.setattr(prediction, 'registry', registry)
+    monkeypatch.setattr(prediction, 'prediction_cache', None)
+    monkeypatch.setattr(prediction, 'audit_log', None)
+    client = TestClient(prediction.app)
+
+    monkeypatch.setattr(prediction, 'micro_batcher', None)
+    direct = client.post("/predict", json=VALID).json()
+    monkeypatch.setattr(prediction, 'micro_batcher', MicroBatcher(prediction.predict_microbatch_scores, 1.0, 8))
+    batched = client.post("/predict", json=VALID).json()
+    assert batched == direct
+
+    bulk = client.post("/predict/batch", json={"students": [VALID]}).json()
+    assert bulk['predictions'][0]['predicted_score'] != direct['predicted_score']
+
+
+def test_single_score_bands_match_the_vectorized_lookup():
+    scores = [0.0, 59.99, 60.0, 69.99, 70.0, 80.0, 89.99, 90.0, 100.0]
+    levels, messages = prediction.get_confidence_levels(np.array(scores))
+    assert [prediction.get_confidence_band(score) for score in scores] == list(zip(levels.tolist(), messages.tolist()))
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared feature transformer.
+
+Run with `python -m pytest test_features.py` from the API directory.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import random_raw
+from features import FEATURE_NAMES, FEATURE_TRANSFORMER, FeatureTransformer, RAW_FEATURES
+
+
+def test_matches_original_pandas_features():
+    """Bit-identical to the pandas formulas the model was originally trained with"""
+    raw = random_raw(5000, seed=0)
+    data = pd.DataFrame(raw, columns=RAW_FEATURES)
+    data['study_attendance_interaction'] = data['study_hours'] * data['attendance_rate'] / 100
+    data['sleep_study_ratio'] = data['sleep_hours'] / (data['study_hours'] + 1)
+    data['performance_momentum'] = data['previous_test_score'] * data['attendance_rate'] / 100
+
+    expected = data[list(FEATURE_NAMES)].to_numpy()
+    assert np.array_equal(FEATURE_TRANSFORMER.transform(raw), expected)
+
+
+def test_single_row_matches_batch_and_reuses_buffer():
+    """One row at a time into a reused buffer gives the batch result exactly"""
+    raw = random_raw(200, seed=1)
+    batch = FEATURE_TRANSFORMER.transform(raw)
+
+    buffer = np.empty(len(FEATURE_NAMES))
+    for row, expected in zip(raw, batch):
+        assert FEATURE_TRANSFORMER.transform(tuple(row), out=buffer) is buffer
+        assert np.array_equal(buffer, expected)
+
+
+def test_config_round_trip_and_rejection():
+    """Stored configs load back; configs from other transformers are refused"""
+    config = FEATURE_TRANSFORMER.to_config()
+    assert isinstance(FeatureTransformer.from_config(config), FeatureTransformer)
+    assert isinstance(FeatureTransformer.from_config(None, list(FEATURE_NAMES)), FeatureTransformer)
+
+    with pytest.raises(ValueError):
+        FeatureTransformer.from_config({**config, 'version': config['version'] + 1})
+    with pytest.raises(ValueError):
+        FeatureTransformer.from_config({**config, 'feature_names': config['feature_names'][::-1]})
+    with pytest.raises(ValueError):
+        FeatureTransformer.from_config(None, ['study_hours'])
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Equivalence tests for the fused inference kernels.
+
+Run with `python -m pytest test_inference.py` from the API directory.
+"""
+
+import os
+
+import joblib
+import numpy as np
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeRegressor
+
+from conftest import random_features, random_raw
+from inference import FusedLinearModel, FusedPredictionInterval
+from registry import ModelVersion
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_fused_matches_deployed_model():
+    """The fused kernel reproduces scaler.transform + model.predict on the shipped artifacts"""
+    model = joblib.load(os.path.join(API_DIR, 'best_model.pkl'))
+    scaler = joblib.load(os.path.join(API_DIR, 'scaler.pkl'))
+    fused = FusedLinearModel.from_sklearn(model, scaler)
+    assert fused is not None
+
+    X = random_features(2000)
+    expected = model.predict(scaler.transform(X))
+    np.testing.assert_allclose(fused.predict(X), expected, rtol=0, atol=1e-9)
+    for row, value in zip(X[:50], expected[:50]):
+        assert abs(fused.predict_one(row) - value) < 1e-9
+
+
+def test_fused_matches_other_linear_models():
+    """Any single-output linear estimator can be folded, not just LinearRegression"""
+    X = random_features(500, seed=1)
+    y = X @ np.linspace(-1, 1, X.shape[1]) + 3.0
+    scaler = StandardScaler().fit(X)
+    for estimator in (LinearRegression(), Ridge(alpha=2.0)):
+        estimator.fit(scaler.transform(X), y)
+        fused = FusedLinearModel.from_sklearn(estimator, scaler)
+        np.testing.assert_allclose(
+            fused.predict(X), estimator.predict(scaler.transform(X)), rtol=0, atol=1e-9
+        )
+
+
+def test_non_linear_models_are_not_fused():
+    """Tree models have no coefficients and must stay on the sklearn path"""
+    X = random_features(100, seed=2)
+    scaler = StandardScaler().fit(X)
+    tree = DecisionTreeRegressor(random_state=42).fit(scaler.transform(X), X[:, 0])
+    assert FusedLinearModel.from_sklearn(tree, scaler) is None
+
+
+def test_fused_interval_matches_closed_form():
+    """Folded half-widths equal t·s·sqrt(1 + zᵀ(ZᵀZ)⁻¹z) evaluated in the scaled space"""
+    X = random_features(400, seed=3)
+    y = X @ np.linspace(-1, 1, X.shape[1]) + np.random.default_rng(4).normal(0, 2, len(X))
+    scaler = StandardScaler().fit(X)
+    model = LinearRegression().fit(scaler.transform(X), y)
+
+    Z = np.column_stack([np.ones(len(X)), scaler.transform(X)])
+    residuals = y - model.predict(scaler.transform(X))
+    stats = {
+        'confidence': 0.95,
+        't_value': 1.966,
+        'residual_variance': residuals @ residuals / (len(Z) - Z.shape[1]),
+        'xtx_inv': np.linalg.inv(Z.T @ Z).tolist()
+    }
+    interval = FusedPredictionInterval.from_info(stats, scaler.mean_, scaler.scale_)
+
+    X_new = random_features(200, seed=5)
+    Z_new = np.column_stack([np.ones(len(X_new)), scaler.transform(X_new)])
+    leverage = np.einsum('ij,jk,ik->i', Z_new, np.array(stats['xtx_inv']), Z_new)
+    expected = stats['t_value'] * np.sqrt(stats['residual_variance'] * (1 + leverage))
+    np.testing.assert_allclose(interval.half_width(X_new), expected, rtol=1e-9)
+    for row, value in zip(X_new[:20], expected[:20]):
+        assert abs(interval.half_width_one(row) - value) < 1e-9 * value
+
+    assert FusedPredictionInterval.from_info(None) is None
+
+
+def test_float32_batch_kernel_is_guarded_by_its_tolerance():
+    """float32 batches stay within the checked deviation; a tighter tolerance keeps float64"""
+    version = ModelVersion.load(API_DIR)
+    assert version.enable_float32(tolerance=1e-3)
+    assert version.float32_deviation < 1e-3
+
+    raw = random_raw(5000, seed=2)
+    features = version.batch_features(raw)
+    assert features.dtype == np.float32
+    predicted = version.predict(features)
+    assert predicted.dtype == np.float64
+    np.testing.assert_allclose(predicted, version.fused.predict(random_features(5000, seed=2)), rtol=0, atol=1e-3)
+
+    assert not version.enable_float32(tolerance=1e-9)
+    assert version.batch_features(raw).dtype == np.float64
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
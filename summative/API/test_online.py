@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Tests for online model updates from labeled feedback.
+
+Run with `python -m pytest test_online.py` from the API directory.
+"""
+
+import json
+import sys
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeRegressor
+
+from artifact import ARTIFACT_FILE, export_model
+from conftest import random_raw
+from features import FEATURE_NAMES, FEATURE_TRANSFORMER
+from online import OnlineLinearModel, main, update_model_dir
+from registry import INFO_FILE, MODEL_FILE, SCALER_FILE, ModelRegistry, ModelVersion
+
+
+def labeled(n, seed):
+    """(raw, features, y) with y linear in the features plus noise"""
+    raw = random_raw(n, seed)
+    features = FEATURE_TRANSFORMER.transform(raw)
+    noise = np.random.default_rng(seed + 1000).normal(0, 3, n)
+    return raw, features, features @ np.linspace(-0.5, 0.5, 9) + 30 + noise
+
+
+def trained(model=None, n=500):
+    """A model fit like train_models, with its info (prediction interval statistics included)"""
+    _, X, y = labeled(n, seed=0)
+    scaler = StandardScaler().fit(X)
+    model = (model or LinearRegression()).fit(scaler.transform(X), y)
+
+    Z = np.column_stack([np.ones(n), scaler.transform(X)])
+    residuals = y - model.predict(scaler.transform(X))
+    dof = n - Z.shape[1]
+    info = {
+        'model_name': type(model).__name__, 'feature_names': list(FEATURE_NAMES),
+        'test_r2': 0.5, 'test_rmse': 3.0, 'test_mae': 2.4,
+        'prediction_interval': {
+            'confidence': 0.95, 'dof': dof, 't_value': 1.965,
+            'residual_variance': residuals @ residuals / dof,
+            'xtx_inv': np.linalg.inv(Z.T @ Z).tolist()
+        }
+    }
+    return model, scaler, info, X, y
+
+
+def test_updates_equal_a_full_refit(tmp_path):
+    """Batches of feedback give the OLS fit on training + feedback rows, in model.bin and interval statistics"""
+    model, scaler, info, X_train, y_train = trained()
+    assert export_model(str(tmp_path / ARTIFACT_FILE), model, scaler, info)
+
+    raw, X_feedback, y_feedback = labeled(1200, seed=1)
+    for start in range(0, len(raw), 300):
+        summary = update_model_dir(str(tmp_path), raw[start:start + 300], y_feedback[start:start + 300],
+                                   refit_every=500)
+    assert summary['total_feedback_rows'] == 1200
+    assert summary['last_drift'] < 1e-10 and summary['resyncs'] == 0
+
+    X_all = scaler.transform(np.vstack([X_train, X_feedback]))
+    refit = LinearRegression().fit(X_all, np.concatenate([y_train, y_feedback]))
+
+    version = ModelVersion.load(str(tmp_path))
+    version.self_check()
+    _, X_new, _ = labeled(500, seed=2)
+    np.testing.assert_allclose(version.predict(X_new), refit.predict(scaler.transform(X_new)), rtol=0, atol=1e-9)
+
+    Z_all = np.column_stack([np.ones(len(X_all)), X_all])
+    state = OnlineLinearModel.load(str(tmp_path))
+    np.testing.assert_allclose(state.P, np.linalg.inv(Z_all.T @ Z_all), rtol=0, atol=1e-12)
+    assert state.n_rows == len(X_all)
+
+
+def test_pickled_models_are_updated_into_an_artifact(tmp_path):
+    model, scaler, info, _, _ = trained()
+    joblib.dump(model, tmp_path / MODEL_FILE)
+    joblib.dump(scaler, tmp_path / SCALER_FILE)
+    (tmp_path / INFO_FILE).write_text(json.dumps(info))
+
+    raw, _, y = labeled(50, seed=3)
+    update_model_dir(str(tmp_path), raw, y)
+    assert ModelVersion.load(str(tmp_path)).artifact_format == 'artifact'
+
+
+def test_output_dir_keeps_the_deployed_artifact_and_newest_model_wins(tmp_path):
+    """Feedback goes to a separate directory, continues from it, and a newer deploy takes over again"""
+    deployed, online = tmp_path / 'deployed', tmp_path / 'online'
+    deployed.mkdir()
+    model, scaler, info, _, _ = trained()
+    assert export_model(str(deployed / ARTIFACT_FILE), model, scaler, info)
+    original = (deployed / ARTIFACT_FILE).read_bytes()
+
+    raw, _, y = labeled(100, seed=5)
+    update_model_dir(str(deployed), raw[:50], y[:50], output_dir=str(online))
+    summary = update_model_dir(str(deployed), raw[50:], y[50:], output_dir=str(online))
+    assert summary['total_feedback_rows'] == 100
+    assert (deployed / ARTIFACT_FILE).read_bytes() == original
+
+    registry = ModelRegistry(str(deployed), extra_dirs=(str(online),))
+    assert registry.reload_newest().source_dir == str(online)
+    assert not registry.changed_on_disk(str(deployed))
+
+    assert export_model(str(deployed / ARTIFACT_FILE), model, scaler, info)
+    assert registry.changed_on_disk(str(deployed))
+    assert ModelRegistry(str(deployed), extra_dirs=(str(online),)).reload_newest().source_dir == str(deployed)
+
+
+def test_tree_models_are_rejected(tmp_path):
+    model, scaler, info, _, _ = trained(DecisionTreeRegressor(max_depth=3))
+    assert export_model(str(tmp_path / ARTIFACT_FILE), model, scaler, info)
+    raw, _, y = labeled(10, seed=4)
+    with pytest.raises(ValueError):
+        update_model_dir(str(tmp_path), raw, y)
+
+
+def test_empty_feedback_and_missing_training_rmse(tmp_path, monkeypatch, capsys):
+    """No feedback rows yet gives no feedback RMSE; the CLI prints n/a for RMSEs it does not have"""
+    model, scaler, info, _, _ = trained()
+    del info['test_rmse']
+    assert export_model(str(tmp_path / ARTIFACT_FILE), model, scaler, info)
+
+    summary = update_model_dir(str(tmp_path), np.empty((0, 6)), np.empty(0))
+    assert summary['rows'] == 0 and summary['feedback_rmse'] is None and summary['batch_rmse'] is None
+
+    path = tmp_path / 'feedback.csv'
+    path.write_text("study_hours,sleep_hours,attendance_rate,previous_test_score,extracurricular_hours,"
+                    "stress_level,final_score\n20,8,90,85,5,4,70\n")
+    monkeypatch.setattr(sys, 'argv', ['online.py', str(path), '--model-dir', str(tmp_path)])
+    main()
+    assert "(training test RMSE: n/a)" in capsys.readouterr().out
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming bulk scoring.
+
+Run with `python -m pytest test_streaming.py` from the API directory.
+"""
+
+import asyncio
+import json
+
+import numpy as np
+
+from features import INPUT_BOUNDS, RAW_FEATURES
+from streaming import CSV, NDJSON, stream_predictions
+
+ROW = {"study_hours": 20, "sleep_hours": 8, "attendance_rate": 90,
+       "previous_test_score": 85, "extracurricular_hours": 5, "stress_level": 4}
+
+
+async def score_chunk(raw):
+    scores = raw.sum(axis=1)
+    return scores, np.full(len(raw), 'ok')
+
+
+def stream(body, input_format, chunk_size=7, max_line_bytes=1000):
+    """Output text for `body` sent in `chunk_size`-byte pieces"""
+    async def chunks():
+        for start in range(0, len(body), chunk_size):
+            yield body[start:start + chunk_size]
+
+    async def run():
+        return ''.join([text async for text in stream_predictions(
+            chunks(), input_format, NDJSON, 2, list(RAW_FEATURES), INPUT_BOUNDS, score_chunk, max_line_bytes
+        )])
+
+    return [json.loads(line) for line in asyncio.run(run()).splitlines()]
+
+
+def test_long_lines_and_bad_bytes_are_row_errors():
+    """An over-long line and undecodable bytes fail their own rows; the stream carries on"""
+    valid = json.dumps(ROW).encode()
+    body = b'\n'.join([valid, b'{"study_hours": "' + b'9' * 5000 + b'"}', b'{"study_hours": \xff}', valid])
+    rows = stream(body, NDJSON)
+
+    assert [row['row'] for row in rows] == [0, 1, 2, 3]
+    assert rows[0]['predicted_score'] == rows[3]['predicted_score'] == sum(ROW.values())
+    assert rows[1]['error'] == "line longer than 1000 bytes"
+    assert 'error' in rows[2]
+
+
+def test_csv_quoted_fields_spanning_lines_are_rejected():
+    header = ','.join(['student_id', *RAW_FEATURES]).encode()
+    values = ','.join(str(ROW[name]) for name in RAW_FEATURES).encode()
+    body = b'\n'.join([header, b'a,' + values, b'"b\n', b'c",' + values, b'"d,e",' + values]) + b'\n'
+    rows = stream(body, CSV)
+
+    assert [row.get('student_id') for row in rows] == ['a', None, None, 'd,e']
+    assert rows[1]['error'] == rows[2]['error'] == "quoted CSV fields cannot span lines"
+    assert rows[0]['predicted_score'] == rows[3]['predicted_score'] == sum(ROW.values())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Bit-for-bit agreement tests for the flattened tree engine.
+
+Run with `python -m pytest test_tree_engine.py` from the API directory.
+"""
+
+import numpy as np
+import pytest
+from sklearn.ensemble import ExtraTreesRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeRegressor
+
+from artifact import ARTIFACT_FILE, export_model
+from conftest import random_features
+from registry import TREE_ENGINE_MAX_ROWS, ModelVersion
+from tree_engine import CompiledTreeEnsemble
+
+
+def fitted(model, n=600):
+    """Fit `model` on scaled synthetic features; returns (model, scaler, training features)"""
+    X = random_features(n, seed=1)
+    y = 0.4 * X[:, 0] + 0.3 * X[:, 3] - 0.1 * X[:, 5] + np.random.default_rng(2).normal(0, 3, n)
+    scaler = StandardScaler().fit(X)
+    return model.fit(scaler.transform(X), y), scaler, X
+
+
+@pytest.mark.parametrize('model', [
+    DecisionTreeRegressor(random_state=0),
+    DecisionTreeRegressor(max_depth=4, random_state=0),
+    RandomForestRegressor(n_estimators=25, random_state=0),
+    ExtraTreesRegressor(n_estimators=10, min_samples_leaf=3, random_state=0),
+], ids=['tree', 'shallow-tree', 'forest', 'extra-trees'])
+def test_matches_sklearn_bit_for_bit(model):
+    """Identical predictions on fresh rows, on the training rows (which sit on split boundaries) and per row"""
+    model, scaler, X_train = fitted(model)
+    compiled = CompiledTreeEnsemble.from_sklearn(model, scaler)
+
+    for X in (random_features(3000, seed=3), X_train):
+        assert np.array_equal(compiled.predict(X), model.predict(scaler.transform(X)))
+
+    X = random_features(50, seed=4)
+    expected = model.predict(scaler.transform(X))
+    assert [compiled.predict_one(row) for row in X] == expected.tolist()
+
+
+def test_batches_larger_than_a_block():
+    model, scaler, _ = fitted(RandomForestRegressor(n_estimators=40, random_state=0))
+    compiled = CompiledTreeEnsemble.from_sklearn(model, scaler)
+    X = random_features(compiled.block_rows * 2 + 7, seed=5)
+    assert np.array_equal(compiled.predict(X), model.predict(scaler.transform(X)))
+
+
+def test_non_tree_models_are_not_compiled():
+    model, scaler, _ = fitted(LinearRegression())
+    assert CompiledTreeEnsemble.from_sklearn(model, scaler) is None
+
+
+def test_tree_artifact_serves_without_sklearn_model(tmp_path):
+    """A forest exported to model.bin loads through the registry and predicts like sklearn"""
+    model, scaler, _ = fitted(RandomForestRegressor(n_estimators=20, random_state=0))
+    assert export_model(str(tmp_path / ARTIFACT_FILE), model, scaler, {'model_name': 'Random Forest'})
+
+    version = ModelVersion.load(str(tmp_path))
+    assert version.model is None and version.trees is not None
+    version.self_check()
+
+    X = random_features(TREE_ENGINE_MAX_ROWS * 2, seed=6)
+    assert np.array_equal(version.predict(X), model.predict(scaler.transform(X)))
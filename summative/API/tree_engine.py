@@ -0,0 +1,151 @@
+"""
+Flattened tree-ensemble inference for the Student Performance Prediction API.
+
+sklearn's tree models pay per-call validation and per-tree Python/joblib
+overhead, which dominates when scoring one row. CompiledTreeEnsemble copies a
+DecisionTreeRegressor or a forest into contiguous node arrays (feature index,
+threshold, child pointers, leaf values) at load time and walks every tree for
+every row at once: each step of the loop moves all unfinished (row, tree)
+pairs one level down with a few NumPy gathers, so there is no Python loop
+over trees.
+
+Results are bit-for-bit equal to sklearn's predict: inputs are scaled with the
+same float64 operations as StandardScaler, cast to float32 like sklearn does
+before comparing against the float64 thresholds, and the per-tree leaf values
+are summed in estimator order before dividing by the number of trees, exactly
+as ForestRegressor accumulates them. Inputs are assumed finite (the API
+validates them); missing-value routing is not reproduced.
+"""
+
+import numpy as np
+
+# (tree, row) pairs walked together; keeps the working arrays cache-sized
+BLOCK_ELEMENTS = 1 << 16
+
+
+class CompiledTreeEnsemble:
+    """One or more regression trees stored as flat arrays, averaged like a forest.
+
+    Node i's children are children[2 * i] (x <= threshold) and
+    children[2 * i + 1]; leaves point to themselves.
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, max_depth, mean=None, scale=None):
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.children = np.ascontiguousarray(children, dtype=np.intp)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        self.mean = None if mean is None else np.asarray(mean, dtype=np.float64)
+        self.scale = None if scale is None else np.asarray(scale, dtype=np.float64)
+        self.is_leaf = self.children[0::2] == np.arange(len(self.value))
+        self.n_trees = len(self.roots)
+        self.block_rows = max(1, BLOCK_ELEMENTS // self.n_trees)
+
+    @classmethod
+    def from_sklearn(cls, model, scaler=None):
+        """Compile a single-output tree or forest regressor; returns None for anything else."""
+        # The model is already unpickled, so sklearn is imported by now
+        from sklearn.ensemble import ExtraTreesRegressor, RandomForestRegressor
+        from sklearn.tree import DecisionTreeRegressor, ExtraTreeRegressor
+
+        if isinstance(model, (DecisionTreeRegressor, ExtraTreeRegressor)):
+            trees = [model.tree_]
+        elif isinstance(model, (RandomForestRegressor, ExtraTreesRegressor)):
+            trees = [estimator.tree_ for estimator in model.estimators_]
+        else:
+            return None
+        if model.n_outputs_ != 1:
+            return None
+
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        for tree in trees:
+            nodes = np.arange(tree.node_count)
+            leaf = tree.children_left < 0
+            left = np.where(leaf, nodes, tree.children_left) + offset
+            right = np.where(leaf, nodes, tree.children_right) + offset
+
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(np.where(leaf, 0.0, tree.threshold))
+            children.append(np.column_stack([left, right]).ravel())
+            values.append(tree.value[:, 0, 0])
+            roots.append(offset)
+            offset += tree.node_count
+
+        mean = getattr(scaler, 'mean_', None)
+        scale = getattr(scaler, 'scale_', None)
+        return cls(np.concatenate(features), np.concatenate(thresholds), np.concatenate(children),
+                   np.concatenate(values), np.array(roots), max(tree.max_depth for tree in trees),
+                   mean, scale)
+
+    def to_arrays(self):
+        """Arrays for artifact.write_artifact; from_arrays() restores the ensemble."""
+        arrays = {
+            'feature': self.feature.astype(np.int32),
+            'threshold': self.threshold,
+            'children': self.children.astype(np.int32),
+            'value': self.value,
+            'roots': self.roots.astype(np.int32),
+            'max_depth': np.array(self.max_depth, dtype=np.int32),
+        }
+        if self.mean is not None:
+            arrays['scaler_mean'] = self.mean
+        if self.scale is not None:
+            arrays['scaler_scale'] = self.scale
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(arrays['feature'], arrays['threshold'], arrays['children'], arrays['value'],
+                   arrays['roots'], arrays['max_depth'], arrays.get('scaler_mean'), arrays.get('scaler_scale'))
+
+    def _scaled(self, features):
+        # Same operations, in the same order, as StandardScaler.transform
+        features = np.array(features, dtype=np.float64, ndmin=2)
+        if self.mean is not None:
+            features -= self.mean
+        if self.scale is not None:
+            features /= self.scale
+        # sklearn trees compare float32 inputs against float64 thresholds
+        return features.astype(np.float32)
+
+    def _predict_block(self, X):
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+
+        # One entry per (tree, row) pair, tree-major so neighbouring pairs read
+        # the same tree's nodes; pairs drop out as soon as they reach a leaf
+        node = np.repeat(self.roots, n_rows)
+        offset = np.tile(np.arange(n_rows) * n_features, self.n_trees)
+        position = np.arange(len(node))
+        leaf = np.empty(len(node), dtype=np.intp)
+        for _ in range(self.max_depth + 1):
+            done = self.is_leaf[node]
+            if done.any():
+                leaf[position[done]] = node[done]
+                active = ~done
+                node, offset, position = node[active], offset[active], position[active]
+                if not len(node):
+                    break
+            go_right = flat[offset + self.feature[node]] > self.threshold[node]
+            node = self.children[2 * node + go_right]
+
+        # cumsum adds the trees in order, like ForestRegressor's y_hat += tree
+        return np.cumsum(self.value[leaf].reshape(self.n_trees, n_rows), axis=0)[-1] / self.n_trees
+
+    def predict(self, features):
+        """Predict scores for an (n, 9) feature matrix."""
+        X = self._scaled(features)
+        if len(X) <= self.block_rows:
+            return self._predict_block(X)
+
+        out = np.empty(len(X))
+        for start in range(0, len(X), self.block_rows):
+            out[start:start + self.block_rows] = self._predict_block(X[start:start + self.block_rows])
+        return out
+
+    def predict_one(self, features):
+        """Predict the score for a single 9-element feature vector."""
+        return float(self._predict_block(self._scaled(features))[0])
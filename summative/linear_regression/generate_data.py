@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Parallel Synthetic Data Generator for Student Performance Prediction
+Generates very large synthetic datasets for load and training benchmarks.
+
+Rows are produced in fixed-size chunks. Chunk i always draws from its own
+random stream, SeedSequence(seed, spawn_key=(i,)), so the output depends only
+on --seed and --chunk-size, never on how many workers generated it. Workers
+write their chunks straight into a memory-mapped .npy file of shape
+(n_students, 7): the six raw features in API order followed by final_score.
+The distributions, clipping ranges and final_score relationship are the ones
+in train_model.simulate_students.
+
+Usage: python generate_data.py 100000000 -o students.npy [--workers N]
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import time
+
+import numpy as np
+
+from train_model import chunk_rng, simulate_students
+
+COLUMNS = [
+    'study_hours', 'sleep_hours', 'attendance_rate', 'previous_test_score',
+    'extracurricular_hours', 'stress_level', 'final_score'
+]
+
+
+def generate_chunk(task):
+    """Generate chunk `index` into rows [start, stop) of the output memmap"""
+    output_path, index, start, stop, seed = task
+    data = simulate_students(stop - start, chunk_rng(seed, index))
+
+    out = np.load(output_path, mmap_mode='r+')
+    out[start:stop] = data[COLUMNS].to_numpy(dtype=np.float64)
+    out.flush()
+    return stop - start
+
+
+def generate_file(output_path, n_students, seed=42, chunk_size=1000000, workers=1):
+    """Write `n_students` synthetic rows to `output_path`; returns elapsed seconds"""
+    np.lib.format.open_memmap(
+        output_path, mode='w+', dtype=np.float64, shape=(n_students, len(COLUMNS))
+    ).flush()
+
+    tasks = [
+        (output_path, index, start, min(start + chunk_size, n_students), seed)
+        for index, start in enumerate(range(0, n_students, chunk_size))
+    ]
+
+    start_time = time.perf_counter()
+    if workers == 1:
+        for task in tasks:
+            generate_chunk(task)
+    else:
+        method = 'fork' if 'fork' in mp.get_all_start_methods() else None
+        with mp.get_context(method).Pool(workers) as pool:
+            for _ in pool.imap_unordered(generate_chunk, tasks):
+                pass
+    return time.perf_counter() - start_time
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Generate a large synthetic student dataset")
+    parser.add_argument('n_students', type=int, help="number of rows to generate")
+    parser.add_argument('-o', '--output', default='students.npy', help="output .npy file")
+    parser.add_argument('--seed', type=int, default=42, help="root random seed")
+    parser.add_argument('--chunk-size', type=int, default=1000000,
+                        help="rows per independent random stream (changing it changes the data)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="worker processes (does not change the data)")
+    args = parser.parse_args()
+
+    print("Student Performance Synthetic Data Generation")
+    print("=" * 50)
+    seconds = generate_file(args.output, args.n_students, args.seed, args.chunk_size, args.workers)
+    print(f"Generated {args.n_students:,} rows in {seconds:.2f}s "
+          f"({args.n_students / seconds:,.0f} rows/sec) with {args.workers} worker(s)")
+    print(f"Columns: {', '.join(COLUMNS)}")
+    print(f"Written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Cross-Validated Model Search for Student Performance Prediction
+Compares model families and hyperparameters with k-fold cross-validation
+instead of a single 80/20 split.
+
+The feature matrix is built once. For every fold the scaler is fitted on
+that fold's training rows and the scaled training and validation matrices
+are computed once and published in shared memory, so no (config, fold) task
+rescales or copies data. Folds are evaluated in rounds: each round scores
+one more fold of every surviving config in parallel across a process pool,
+and after `min_folds` rounds a config whose mean R² trails the leader's (on
+the same folds) by more than `early_stop` is dropped. Surviving configs are
+then timed on the kernel the API would serve them with (fused linear kernel,
+tree engine or sklearn), one at a time so the timings do not compete for cores.
+
+Usage: python model_search.py [--data students.csv|.npy] [--folds 5] [--jobs N]
+                              [--early-stop 0.05] [-o search_results.json] [--save]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_all_start_methods, get_context
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import KFold
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeRegressor
+
+from train_model import (SharedArrays, attach_shared_arrays, create_features, generate_student_data,
+                         iter_npy_chunks, save_best_model, train_models)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'API'))
+from inference import FusedLinearModel
+from tree_engine import CompiledTreeEnsemble
+
+# Model families and the hyperparameters tried for each. Forests fit with one
+# thread: the parallelism comes from running (config, fold) tasks side by side.
+SEARCH_SPACE = {
+    'Linear Regression': (LinearRegression, [{}]),
+    'Ridge': (Ridge, [{'alpha': alpha} for alpha in (0.1, 1.0, 10.0, 100.0)]),
+    'Decision Tree': (DecisionTreeRegressor, [
+        {'max_depth': depth, 'min_samples_leaf': leaf, 'random_state': 42}
+        for depth in (4, 6, 8, None) for leaf in (1, 10, 30)
+    ]),
+    'Random Forest': (RandomForestRegressor, [
+        {'n_estimators': trees, 'max_depth': depth, 'min_samples_leaf': leaf, 'random_state': 42, 'n_jobs': 1}
+        for trees in (50, 100, 200) for depth in (8, None) for leaf in (1, 10)
+    ]),
+}
+
+# Rows timed for the batch latency measurement
+LATENCY_BATCH_ROWS = 1000
+
+# Fold matrices mapped by each worker process once, in the pool initializer
+_folds = None
+_blocks = None
+
+
+def candidate_configs(space=SEARCH_SPACE):
+    """Flatten the search space into (family, params) candidates"""
+    return [(family, params) for family, (_, grid) in space.items() for params in grid]
+
+
+def candidate_name(family, params):
+    """Readable label, e.g. 'Decision Tree (max_depth=6, min_samples_leaf=10)'"""
+    shown = {key: value for key, value in params.items() if key not in ('random_state', 'n_jobs')}
+    if not shown:
+        return family
+    return f"{family} ({', '.join(f'{key}={value}' for key, value in shown.items())})"
+
+
+def build_estimator(family, params, space=SEARCH_SPACE):
+    estimator_class, _ = space[family]
+    return estimator_class(**params)
+
+
+def prepare_folds(X, y, n_folds, seed=42):
+    """
+    Scale every fold once: returns the fold scalers and a dict of arrays
+    X_train_<i>, X_val_<i>, y_train_<i>, y_val_<i> for SharedArrays.
+    """
+    scalers = []
+    arrays = {}
+    for i, (train_index, val_index) in enumerate(KFold(n_folds, shuffle=True, random_state=seed).split(X)):
+        scaler = StandardScaler().fit(X[train_index])
+        scalers.append(scaler)
+        arrays[f'X_train_{i}'] = scaler.transform(X[train_index])
+        arrays[f'X_val_{i}'] = scaler.transform(X[val_index])
+        arrays[f'y_train_{i}'] = y[train_index]
+        arrays[f'y_val_{i}'] = y[val_index]
+    return scalers, arrays
+
+
+def _attach_folds(specs):
+    """Pool initializer: map the shared fold matrices once per worker"""
+    global _folds, _blocks
+    _folds, _blocks = attach_shared_arrays(specs)
+
+
+def evaluate_fold(task):
+    """Fit one config's unfitted estimator on one fold's cached training matrix and score its validation rows"""
+    index, model, fold = task
+    start = time.perf_counter()
+    model.fit(_folds[f'X_train_{fold}'], _folds[f'y_train_{fold}'])
+    fit_time = time.perf_counter() - start
+
+    y_val = _folds[f'y_val_{fold}']
+    y_pred = model.predict(_folds[f'X_val_{fold}'])
+    return index, fold, {
+        'r2': float(r2_score(y_val, y_pred)),
+        'rmse': float(np.sqrt(mean_squared_error(y_val, y_pred))),
+        'fit_time': fit_time
+    }
+
+
+def serving_latency(model, scaler, X_raw):
+    """
+    Single-row and per-row batch latency (ms) of the kernel the API would use:
+    fused linear kernel, tree engine, or scaler + sklearn as a last resort.
+    """
+    kernel = FusedLinearModel.from_sklearn(model, scaler) or CompiledTreeEnsemble.from_sklearn(model, scaler)
+    if kernel is not None:
+        predict_one, predict = kernel.predict_one, kernel.predict
+    else:
+        predict_one = lambda row: model.predict(scaler.transform(row.reshape(1, -1)))[0]
+        predict = lambda rows: model.predict(scaler.transform(rows))
+
+    row = X_raw[0]
+    single = []
+    for _ in range(50):
+        start = time.perf_counter()
+        predict_one(row)
+        single.append(time.perf_counter() - start)
+
+    rows = X_raw[:LATENCY_BATCH_ROWS]
+    batch = []
+    for _ in range(5):
+        start = time.perf_counter()
+        predict(rows)
+        batch.append(time.perf_counter() - start)
+
+    return {
+        'engine': type(kernel).__name__ if kernel is not None else 'sklearn',
+        'single_predict_ms': min(single) * 1000,
+        'batch_predict_ms_per_row': min(batch) * 1000 / len(rows)
+    }
+
+
+def search(X, y, n_folds=5, n_jobs=None, early_stop=0.05, min_folds=2, space=SEARCH_SPACE):
+    """
+    Cross-validate every candidate in `space` on (X, y); returns the candidates
+    ranked by mean R² (highest first, then lowest std), early-stopped ones last.
+    """
+    configs = candidate_configs(space)
+    scalers, arrays = prepare_folds(X, y, n_folds)
+    fold_scores = [[] for _ in configs]
+    alive = set(range(len(configs)))
+    stopped_after = {}
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    print(f"Cross-validating {len(configs)} candidates x {n_folds} folds "
+          f"with {n_jobs} worker process(es)...")
+    method = 'fork' if 'fork' in get_all_start_methods() else None
+    start = time.perf_counter()
+    with SharedArrays(**arrays) as shared, \
+            ProcessPoolExecutor(max_workers=n_jobs, mp_context=get_context(method),
+                                initializer=_attach_folds, initargs=(shared.specs,)) as pool:
+        for fold in range(n_folds):
+            tasks = [(index, build_estimator(*configs[index], space), fold) for index in sorted(alive)]
+            for index, _, result in pool.map(evaluate_fold, tasks):
+                fold_scores[index].append(result)
+
+            # Drop configs that trail the leader on the same folds by a clear margin
+            if fold + 1 >= min_folds and fold + 1 < n_folds:
+                means = {index: np.mean([score['r2'] for score in fold_scores[index]]) for index in alive}
+                leader = max(means.values())
+                for index, mean in means.items():
+                    if mean < leader - early_stop:
+                        alive.discard(index)
+                        stopped_after[index] = fold + 1
+            print(f"  fold {fold + 1}/{n_folds}: {len(tasks)} tasks, {len(alive)} candidates left")
+    search_time = time.perf_counter() - start
+
+    candidates = []
+    for index, (family, params) in enumerate(configs):
+        r2 = np.array([score['r2'] for score in fold_scores[index]])
+        rmse = np.array([score['rmse'] for score in fold_scores[index]])
+        candidates.append({
+            'name': candidate_name(family, params),
+            'family': family,
+            'params': params,
+            'folds': len(r2),
+            'early_stopped': index in stopped_after,
+            'mean_r2': float(r2.mean()),
+            'std_r2': float(r2.std(ddof=1)) if len(r2) > 1 else 0.0,
+            'mean_rmse': float(rmse.mean()),
+            'mean_fit_time': float(np.mean([score['fit_time'] for score in fold_scores[index]])),
+        })
+
+    # Time the survivors one at a time, fitted on the first fold's cached matrix
+    print("Measuring serving latency of the remaining candidates...")
+    X_raw = scalers[0].inverse_transform(arrays['X_val_0'])
+    for index in sorted(alive):
+        model = build_estimator(*configs[index], space)
+        model.fit(arrays['X_train_0'], arrays['y_train_0'])
+        candidates[index].update(serving_latency(model, scalers[0], X_raw))
+
+    ranked = sorted(candidates, key=lambda c: (c['early_stopped'], -c['mean_r2'], c['std_r2']))
+    print(f"Search finished in {search_time:.1f}s "
+          f"({sum(c['folds'] for c in candidates)} of {len(configs) * n_folds} fold fits run)")
+    return ranked
+
+
+def print_rankings(ranked, top=10):
+    """Leaderboards by cross-validated R² and by single-row serving latency"""
+    print("\nTop candidates by mean R² across folds:")
+    for rank, c in enumerate(ranked[:top], 1):
+        latency = f"{c['single_predict_ms']:.3f}ms" if 'single_predict_ms' in c else "-"
+        print(f"  {rank:2d}. {c['name']:60s} R² {c['mean_r2']:.4f} ± {c['std_r2']:.4f}   "
+              f"RMSE {c['mean_rmse']:.4f}   1-row {latency}")
+
+    timed = sorted((c for c in ranked if 'single_predict_ms' in c), key=lambda c: c['single_predict_ms'])
+    print("\nFastest candidates (served single-row latency):")
+    for rank, c in enumerate(timed[:top], 1):
+        print(f"  {rank:2d}. {c['name']:60s} 1-row {c['single_predict_ms']:.3f}ms   "
+              f"batch {c['batch_predict_ms_per_row'] * 1000:.2f}us/row ({c['engine']})   "
+              f"R² {c['mean_r2']:.4f}")
+
+    stopped = [c for c in ranked if c['early_stopped']]
+    if stopped:
+        print(f"\n{len(stopped)} candidates stopped early, e.g. {stopped[0]['name']} "
+              f"(R² {stopped[0]['mean_r2']:.4f} after {stopped[0]['folds']} folds)")
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Cross-validated model and hyperparameter search")
+    parser.add_argument('--data', help="CSV of raw features + final_score, or a .npy from "
+                                       "generate_data.py (default: synthetic data)")
+    parser.add_argument('--n-students', type=int, default=1000, help="synthetic students to generate")
+    parser.add_argument('--folds', type=int, default=5, help="cross-validation folds")
+    parser.add_argument('--jobs', type=int, help="worker processes (default: all cores)")
+    parser.add_argument('--early-stop', type=float, default=0.05,
+                        help="drop candidates whose mean R² trails the leader by more than this")
+    parser.add_argument('--min-folds', type=int, default=2, help="folds scored before any candidate is dropped")
+    parser.add_argument('-o', '--output', default='search_results.json', help="where to write the ranking")
+    parser.add_argument('--save', action='store_true',
+                        help="train the best candidate on an 80/20 split and save it for the API")
+    args = parser.parse_args()
+
+    print("Student Performance Model Search")
+    print("=" * 50)
+    if args.data:
+        import pandas as pd
+        print(f"Loading student performance dataset from {args.data}...")
+        if args.data.endswith('.npy'):
+            data = next(iter_npy_chunks(args.data, len(np.load(args.data, mmap_mode='r'))))
+        else:
+            data = pd.read_csv(args.data)
+    else:
+        print("Generating student performance dataset...")
+        data = generate_student_data(args.n_students)
+
+    # The feature matrix is built once for every fold and candidate
+    X, y = create_features(data)
+    print(f"Feature matrix shape: {X.shape}\n")
+
+    ranked = search(X, y, args.folds, args.jobs, args.early_stop, args.min_folds)
+    print_rankings(ranked)
+
+    with open(args.output, 'w') as f:
+        json.dump({'folds': args.folds, 'early_stop': args.early_stop, 'candidates': ranked}, f, indent=2)
+    print(f"\nRanking written to {args.output}")
+
+    if args.save:
+        best = ranked[0]
+        print(f"\nTraining {best['name']} for deployment...")
+        results, scaler, feature_names = train_models(
+            X, y, n_jobs=1, models={best['family']: build_estimator(best['family'], best['params'])}
+        )
+        results[best['family']]['cross_validation'] = {
+            key: best[key] for key in ('name', 'params', 'folds', 'mean_r2', 'std_r2', 'mean_rmse')
+        }
+        save_best_model(results, scaler, feature_names)
+
+
+if __name__ == "__main__":
+    main()
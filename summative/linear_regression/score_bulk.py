@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Offline Bulk Scoring for Student Performance Prediction
+Scores a large archive of student records without going through the API.
+
+The input is a .npy file of shape (n_students, 6) holding the raw features in
+API order (study_hours, sleep_hours, attendance_rate, previous_test_score,
+extracurricular_hours, stress_level); extra trailing columns, such as the
+final_score written by generate_data.py, are ignored. It is memory-mapped,
+the row range is split across worker processes, and every worker writes its predictions
+straight into a shared memory-mapped .npy output, so no row data is pickled
+between processes.
+
+With --float32, a linear model is scored through its fused kernel in float32
+(features included), halving the memory traffic of every block. It is only
+used if, on rows sampled from the input, its predictions stay within
+--tolerance of float64; otherwise scoring stays in float64.
+
+Usage: python score_bulk.py students.npy [-o scores.npy] [--workers N] [--float32]
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+from threadpoolctl import threadpool_limits
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'API'))
+from features import FEATURE_TRANSFORMER, N_FEATURES, N_RAW_FEATURES
+from inference import FusedLinearModel, float32_deviation
+
+# Input rows sampled for the float32 accuracy check
+FLOAT32_CHECK_ROWS = 10000
+
+# Model and scaler, loaded once in the parent and inherited by forked workers
+_model = None
+_scaler = None
+# Float32 fused kernel, set once --float32 has passed its accuracy check
+_kernel32 = None
+
+
+def load_model(model_dir):
+    """Load best_model.pkl and scaler.pkl into the module globals"""
+    global _model, _scaler
+    _model = joblib.load(os.path.join(model_dir, 'best_model.pkl'))
+    _scaler = joblib.load(os.path.join(model_dir, 'scaler.pkl'))
+
+
+def float32_kernel():
+    """Float32 copy of the fused linear kernel of the loaded model, or None if it is not linear"""
+    fused = FusedLinearModel.from_sklearn(_model, _scaler)
+    return fused.astype(np.float32) if fused is not None else None
+
+
+def enable_float32(input_path, tolerance):
+    """
+    Switch to the float32 kernel if, on up to FLOAT32_CHECK_ROWS rows spread
+    over the input, it stays within `tolerance` of float64; returns the
+    max deviation (None for non-linear models and empty inputs, which always
+    stay float64).
+    """
+    global _kernel32
+    fused = FusedLinearModel.from_sklearn(_model, _scaler)
+    if fused is None:
+        return None
+    raw = np.load(input_path, mmap_mode='r')
+    if len(raw) == 0:
+        # No rows to check on (or to score): stay in float64
+        return None
+    rows = np.unique(np.linspace(0, len(raw) - 1, min(FLOAT32_CHECK_ROWS, len(raw))).astype(int))
+    deviation = float32_deviation(fused, FEATURE_TRANSFORMER, raw[rows, :N_RAW_FEATURES])
+    if deviation <= tolerance:
+        _kernel32 = fused.astype(np.float32)
+    return deviation
+
+
+def score_shard(task):
+    """Score rows [start, stop) of the input into the shared output memmap"""
+    global _kernel32
+    input_path, output_path, start, stop, block_rows, model_dir, use_float32 = task
+    if _model is None:
+        # Spawned (not forked) worker: load the artifacts once per process
+        load_model(model_dir)
+        if use_float32:
+            # The parent already ran the accuracy check
+            _kernel32 = float32_kernel()
+
+    raw = np.load(input_path, mmap_mode='r')
+    scores = np.load(output_path, mmap_mode='r+')
+    float32 = use_float32 and _kernel32 is not None
+    features = np.empty((block_rows, N_FEATURES), dtype=np.float32 if float32 else np.float64)
+
+    # One BLAS thread per worker, the parallelism comes from the processes
+    with threadpool_limits(limits=1):
+        for block_start in range(start, stop, block_rows):
+            block_stop = min(block_start + block_rows, stop)
+            block = FEATURE_TRANSFORMER.transform(
+                raw[block_start:block_stop, :N_RAW_FEATURES], features[:block_stop - block_start]
+            )
+            if float32:
+                predicted = _kernel32.predict(block).astype(np.float64)
+            else:
+                predicted = _model.predict(_scaler.transform(block))
+            scores[block_start:block_stop] = np.round(np.clip(predicted, 0, 100), 2)
+
+    scores.flush()
+    return stop - start
+
+
+def score_file(input_path, output_path, model_dir, workers, block_rows):
+    """Score every row of `input_path` into `output_path`; returns (rows, seconds)"""
+    raw = np.load(input_path, mmap_mode='r')
+    if raw.ndim != 2 or raw.shape[1] < N_RAW_FEATURES:
+        raise ValueError(f"Expected an (n, {N_RAW_FEATURES}) array, got shape {raw.shape}")
+    n_rows = raw.shape[0]
+    del raw
+
+    # Preallocate the output so workers can write their slices in place
+    np.lib.format.open_memmap(output_path, mode='w+', dtype=np.float64, shape=(n_rows,)).flush()
+    if n_rows == 0:
+        return 0, 0.0
+
+    # A few shards per worker keeps the pool busy if some finish early
+    n_shards = max(1, min(workers * 4, -(-n_rows // block_rows)))
+    bounds = np.linspace(0, n_rows, n_shards + 1).astype(int)
+    tasks = [
+        (input_path, output_path, int(start), int(stop), block_rows, model_dir, _kernel32 is not None)
+        for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start
+    ]
+
+    start_time = time.perf_counter()
+    if workers == 1:
+        scored = sum(map(score_shard, tasks))
+    else:
+        method = 'fork' if 'fork' in mp.get_all_start_methods() else None
+        with mp.get_context(method).Pool(workers) as pool:
+            scored = sum(pool.imap_unordered(score_shard, tasks))
+    return scored, time.perf_counter() - start_time
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Bulk-score a .npy archive of student records")
+    parser.add_argument('input', help=".npy file of shape (n, 6) with raw features in API order")
+    parser.add_argument('-o', '--output', help="output .npy of predicted scores (default: <input>_scores.npy)")
+    parser.add_argument('--model-dir', default=os.path.dirname(os.path.abspath(__file__)),
+                        help="directory containing best_model.pkl and scaler.pkl")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: all cores)")
+    parser.add_argument('--block-rows', type=int, default=65536,
+                        help="rows scored per model call inside a worker")
+    parser.add_argument('--float32', action='store_true',
+                        help="score linear models in float32 if they pass the accuracy check")
+    parser.add_argument('--tolerance', type=float, default=0.001,
+                        help="largest float32 vs float64 prediction difference allowed (default: 0.001)")
+    args = parser.parse_args()
+
+    output = args.output or os.path.splitext(args.input)[0] + '_scores.npy'
+
+    print("Student Performance Bulk Scoring")
+    print("=" * 50)
+    load_model(args.model_dir)
+    print(f"Model: {type(_model).__name__}")
+    print(f"Input: {args.input}")
+    print(f"Workers: {args.workers}")
+    if args.float32:
+        deviation = enable_float32(args.input, args.tolerance)
+        if _kernel32 is not None:
+            print(f"Precision: float32 (max deviation {deviation:.2e} on sampled rows)")
+        elif deviation is None:
+            print("Precision: float64 (float32 needs a linear model and input rows to check)")
+        else:
+            print(f"Precision: float64 (float32 deviation {deviation:.2e} exceeds {args.tolerance})")
+
+    rows, seconds = score_file(args.input, output, args.model_dir, args.workers, args.block_rows)
+
+    rate = f" ({rows / seconds:,.0f} rows/sec)" if seconds > 0 else ""
+    print(f"\nScored {rows:,} rows in {seconds:.2f}s{rate}")
+    print(f"Predictions written to {output}")
+
+
+if __name__ == "__main__":
+    main()
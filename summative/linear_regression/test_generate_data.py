@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Tests for the parallel synthetic data generator.
+
+Run with `python -m pytest test_generate_data.py` from the linear_regression directory.
+"""
+
+import numpy as np
+
+from generate_data import COLUMNS, generate_file
+from train_model import create_features, iter_npy_chunks
+
+
+def test_output_is_identical_for_any_worker_count(tmp_path):
+    paths = [tmp_path / f'students_{workers}.npy' for workers in (1, 3)]
+    for path, workers in zip(paths, (1, 3)):
+        generate_file(str(path), 2500, seed=7, chunk_size=400, workers=workers)
+    assert paths[0].read_bytes() == paths[1].read_bytes()
+
+    data = np.load(paths[0])
+    assert data.shape == (2500, len(COLUMNS)) and np.isfinite(data).all()
+    # Chunks draw from different streams, and the file trains like a CSV would
+    assert not np.array_equal(data[:400], data[400:800])
+    X, y = create_features(next(iter_npy_chunks(str(paths[0]), 2500)))
+    assert X.shape == (2500, 9) and len(y) == 2500
+
+
+def test_seed_changes_the_output(tmp_path):
+    generate_file(str(tmp_path / 'a.npy'), 1000, seed=1, chunk_size=300)
+    generate_file(str(tmp_path / 'b.npy'), 1000, seed=2, chunk_size=300)
+    assert not np.array_equal(np.load(tmp_path / 'a.npy'), np.load(tmp_path / 'b.npy'))
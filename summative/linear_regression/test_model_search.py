@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Tests for the cross-validated model search.
+
+Run with `python -m pytest test_model_search.py` from the linear_regression directory.
+"""
+
+import numpy as np
+from sklearn.linear_model import LinearRegression
+from sklearn.model_selection import KFold, cross_val_score
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeRegressor
+
+from model_search import search
+from train_model import create_features, generate_student_data
+
+SPACE = {
+    'Linear Regression': (LinearRegression, [{}]),
+    'Decision Tree': (DecisionTreeRegressor, [{'max_depth': 1, 'random_state': 0},
+                                              {'max_depth': 3, 'random_state': 0}]),
+}
+
+
+def test_search_matches_sklearn_cross_validation_and_stops_losers_early():
+    X, y = create_features(generate_student_data(400))
+    ranked = search(X, y, n_folds=4, n_jobs=2, early_stop=0.1, space=SPACE)
+    by_name = {candidate['name']: candidate for candidate in ranked}
+
+    # Scores from the cached, per-fold scaled matrices equal a scaler + model pipeline per fold
+    folds = KFold(4, shuffle=True, random_state=42)
+    expected = cross_val_score(make_pipeline(StandardScaler(), LinearRegression()), X, y, cv=folds, scoring='r2')
+    linear = by_name['Linear Regression']
+    assert linear['folds'] == 4 and not linear['early_stopped']
+    np.testing.assert_allclose([linear['mean_r2'], linear['std_r2']], [expected.mean(), expected.std(ddof=1)])
+
+    # A depth-1 tree is far behind after the first two folds and is dropped
+    stump = by_name['Decision Tree (max_depth=1)']
+    assert stump['early_stopped'] and stump['folds'] == 2 and 'single_predict_ms' not in stump
+    assert ranked[-1] is stump
+
+    assert ranked[0] is linear and linear['engine'] == 'FusedLinearModel'
+    assert all(candidate['single_predict_ms'] > 0 for candidate in ranked if not candidate['early_stopped'])
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests for the offline bulk scoring CLI.
+
+Run with `python -m pytest test_score_bulk.py` from the linear_regression directory.
+"""
+
+import os
+import sys
+
+import joblib
+import numpy as np
+import pytest
+
+import score_bulk
+from features import FEATURE_TRANSFORMER
+from generate_data import generate_file
+
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def run(monkeypatch, *argv):
+    monkeypatch.setattr(sys, 'argv', ['score_bulk.py', *argv, '--model-dir', MODEL_DIR])
+    # Each run starts from float64, as a fresh process would
+    monkeypatch.setattr(score_bulk, '_kernel32', None)
+    score_bulk.main()
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+@pytest.mark.parametrize('float32', [False, True])
+def test_scores_match_model_predict(tmp_path, monkeypatch, workers, float32):
+    """Every shard and block of the output equals model.predict on the same rows"""
+    input_path, output_path = str(tmp_path / 'students.npy'), str(tmp_path / 'scores.npy')
+    generate_file(input_path, 1000, seed=3, chunk_size=300)
+    run(monkeypatch, input_path, '-o', output_path, '--workers', str(workers), '--block-rows', '128',
+        *(['--float32'] if float32 else []))
+    assert (score_bulk._kernel32 is not None) == float32
+
+    model = joblib.load(os.path.join(MODEL_DIR, 'best_model.pkl'))
+    scaler = joblib.load(os.path.join(MODEL_DIR, 'scaler.pkl'))
+    features = FEATURE_TRANSFORMER.transform(np.load(input_path)[:, :6])
+    expected = np.round(np.clip(model.predict(scaler.transform(features)), 0, 100), 2)
+    # float32 is within --tolerance before rounding, so at most one cent apart after it
+    np.testing.assert_allclose(np.load(output_path), expected, rtol=0, atol=0.01 + 1e-9 if float32 else 1e-9)
+
+
+def test_empty_input_writes_an_empty_output(tmp_path, monkeypatch):
+    input_path, output_path = str(tmp_path / 'empty.npy'), str(tmp_path / 'scores.npy')
+    np.save(input_path, np.empty((0, 6)))
+    run(monkeypatch, input_path, '-o', output_path, '--workers', '2', '--float32')
+    assert score_bulk._kernel32 is None
+    assert np.load(output_path).shape == (0,)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Tests for the training script.
+
+Run with `python -m pytest test_train_model.py` from the linear_regression directory.
+"""
+
+import numpy as np
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import mean_squared_error
+from sklearn.preprocessing import StandardScaler
+
+from train_model import create_features, generate_student_data, iter_csv_chunks, train_models, train_streaming
+
+
+def test_streaming_fit_matches_in_memory_ols(tmp_path):
+    """Chunked XᵀX statistics give the same scaler, coefficients and test metrics as fitting in memory"""
+    path = tmp_path / 'students.csv'
+    data = generate_student_data(500)
+    data.to_csv(path, index=False)
+
+    results, scaler, _ = train_streaming(lambda: iter_csv_chunks(path, 37), test_every=5)
+    streamed = results['Linear Regression']
+
+    X, y = create_features(data)
+    test = np.arange(len(X)) % 5 == 0
+    expected_scaler = StandardScaler().fit(X[~test])
+    expected = LinearRegression().fit(expected_scaler.transform(X[~test]), y[~test])
+
+    np.testing.assert_allclose(scaler.mean_, expected_scaler.mean_, rtol=1e-12)
+    np.testing.assert_allclose(scaler.scale_, expected_scaler.scale_, rtol=1e-10)
+    np.testing.assert_allclose(streamed['model'].coef_, expected.coef_, rtol=0, atol=1e-9)
+    assert abs(streamed['model'].intercept_ - expected.intercept_) < 1e-9
+
+    y_pred = expected.predict(expected_scaler.transform(X[test]))
+    assert abs(streamed['test_rmse'] - np.sqrt(mean_squared_error(y[test], y_pred))) < 1e-9
+
+    residuals = y[~test] - expected.predict(expected_scaler.transform(X[~test]))
+    dof = (~test).sum() - X.shape[1] - 1
+    interval = streamed['prediction_interval']
+    assert abs(interval['residual_variance'] - residuals @ residuals / dof) < 1e-8
+
+
+def test_parallel_training_matches_serial():
+    """Models trained in the process pool from shared memory score exactly like ones trained in-process"""
+    X, y = create_features(generate_student_data(300))
+    serial, serial_scaler, _ = train_models(X, y, n_jobs=1)
+    parallel, parallel_scaler, _ = train_models(X, y, n_jobs=3)
+
+    np.testing.assert_array_equal(serial_scaler.mean_, parallel_scaler.mean_)
+    assert serial.keys() == parallel.keys()
+    for name in serial:
+        for metric in ('test_r2', 'test_rmse', 'test_mae'):
+            assert serial[name][metric] == parallel[name][metric], (name, metric)
+        np.testing.assert_array_equal(serial[name]['model'].predict(X[:20]), parallel[name]['model'].predict(X[:20]))
+    assert serial['Linear Regression']['prediction_interval'] == parallel['Linear Regression']['prediction_interval']
@@ -6,26 +6,46 @@ This script trains the model and saves it for API deployment.
 
 import pandas as pd
 import numpy as np
+import argparse
 import joblib
 import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_all_start_methods, get_context
+from multiprocessing.shared_memory import SharedMemory
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LinearRegression
 from sklearn.tree import DecisionTreeRegressor
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
+from scipy import stats
+
+# The feature transform lives next to the API so serving and training share it
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'API'))
+from artifact import ARTIFACT_FILE, export_model
+from drift import DEFAULT_EDGES, histogram_counts, reference_histogram
+from features import FEATURE_NAMES, FEATURE_TRANSFORMER, RAW_FEATURES
+
+# Coverage of the prediction intervals served for linear models
+PREDICTION_INTERVAL_CONFIDENCE = 0.95
 
 def generate_student_data(n_students=1000):
     """Generate realistic student performance dataset"""
     np.random.seed(42)
-    
+    return simulate_students(n_students, np.random)
+
+def simulate_students(n_students, rng):
+    """Draw `n_students` synthetic students using `rng` (np.random or a Generator)"""
     # Generate features
-    study_hours = np.random.normal(15, 5, n_students)
-    sleep_hours = np.random.normal(7.5, 1.5, n_students)
-    attendance_rate = np.random.normal(85, 10, n_students)
-    previous_test_score = np.random.normal(75, 15, n_students)
-    extracurricular_hours = np.random.normal(5, 3, n_students)
-    stress_level = np.random.normal(5, 2, n_students)
+    study_hours = rng.normal(15, 5, n_students)
+    sleep_hours = rng.normal(7.5, 1.5, n_students)
+    attendance_rate = rng.normal(85, 10, n_students)
+    previous_test_score = rng.normal(75, 15, n_students)
+    extracurricular_hours = rng.normal(5, 3, n_students)
+    stress_level = rng.normal(5, 2, n_students)
     
     # Create target variable with realistic relationships
     final_score = (
@@ -35,7 +55,7 @@ def generate_student_data(n_students=1000):
         0.3 * previous_test_score + 
         0.05 * extracurricular_hours - 
         0.1 * stress_level + 
-        np.random.normal(0, 5, n_students)
+        rng.normal(0, 5, n_students)
     )
     
     # Create DataFrame
@@ -60,24 +80,154 @@ def generate_student_data(n_students=1000):
     
     return data
 
-def create_features(data):
-    """Create feature engineering for the model"""
-    # Create interaction features
-    data['study_attendance_interaction'] = data['study_hours'] * data['attendance_rate'] / 100
-    data['sleep_study_ratio'] = data['sleep_hours'] / (data['study_hours'] + 1)
-    data['performance_momentum'] = data['previous_test_score'] * data['attendance_rate'] / 100
-    
-    # Select numerical features for modeling
-    numerical_features = [
+def chunk_rng(seed, index):
+    """Independent, reproducible random stream for chunk `index` of a dataset"""
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+
+def iter_synthetic_chunks(n_students, chunk_size, seed=42):
+    """Yield synthetic student DataFrames of at most `chunk_size` rows, each from its own seeded stream"""
+    for i, start in enumerate(range(0, n_students, chunk_size)):
+        yield simulate_students(min(chunk_size, n_students - start), chunk_rng(seed, i))
+
+def iter_csv_chunks(path, chunk_size):
+    """Yield a CSV of student records (raw features + final_score) in chunks of `chunk_size` rows"""
+    yield from pd.read_csv(path, chunksize=chunk_size)
+
+def iter_npy_chunks(path, chunk_size):
+    """Yield a memory-mapped (n, 7) .npy from generate_data.py as DataFrame chunks"""
+    data = np.load(path, mmap_mode='r')
+    columns = [
         'study_hours', 'sleep_hours', 'attendance_rate', 'previous_test_score',
-        'extracurricular_hours', 'stress_level', 'study_attendance_interaction',
-        'sleep_study_ratio', 'performance_momentum'
+        'extracurricular_hours', 'stress_level', 'final_score'
     ]
-    
-    return data[numerical_features], data['final_score']
+    for start in range(0, len(data), chunk_size):
+        yield pd.DataFrame(np.array(data[start:start + chunk_size]), columns=columns)
+
+def create_features(data):
+    """
+    Create the model feature matrix (n, 9) and target vector from a raw DataFrame.
+
+    Raw columns are copied straight into the feature matrix and the interaction
+    features are computed in place by the shared FeatureTransformer, the same
+    code the API runs; `data` is left unchanged.
+    """
+    X = np.empty((len(data), len(FEATURE_NAMES)))
+    for j, name in enumerate(RAW_FEATURES):
+        X[:, j] = data[name].to_numpy(dtype=np.float64)
+    FEATURE_TRANSFORMER.fill_derived(X)
+
+    return X, data['final_score'].to_numpy(dtype=np.float64)
+
+class SharedArrays:
+    """Publish numpy arrays in shared memory so worker processes can map them without copies"""
+
+    def __init__(self, **arrays):
+        self.blocks = []
+        self.specs = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            block = SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            self.blocks.append(block)
+            self.specs[name] = (block.name, array.shape, array.dtype.str)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+
+
+def attach_shared_arrays(specs):
+    """Map arrays published by SharedArrays; returns (arrays, blocks to close)"""
+    arrays = {}
+    blocks = []
+    for name, (block_name, shape, dtype) in specs.items():
+        block = SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    return arrays, blocks
+
+
+def evaluate_model(model, X_train, X_test, y_train, y_test):
+    """Fit one candidate and measure its accuracy and fit/predict wall-time"""
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_time = time.perf_counter() - start
+
+    # Fit on all cores, but predict single-threaded: thread pool start-up
+    # dominates when the API scores one student at a time
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=None)
+
+    y_pred_train = model.predict(X_train)
+    start = time.perf_counter()
+    y_pred_test = model.predict(X_test)
+    predict_time = time.perf_counter() - start
+
+    # Latency of scoring one student, the shape of an API request
+    single_row = X_test[:1]
+    single_predict_times = []
+    for _ in range(20):
+        start = time.perf_counter()
+        model.predict(single_row)
+        single_predict_times.append(time.perf_counter() - start)
+
+    return {
+        'model': model,
+        'train_r2': r2_score(y_train, y_pred_train),
+        'test_r2': r2_score(y_test, y_pred_test),
+        'test_rmse': np.sqrt(mean_squared_error(y_test, y_pred_test)),
+        'test_mae': mean_absolute_error(y_test, y_pred_test),
+        'fit_time': fit_time,
+        'predict_time': predict_time,
+        'single_predict_ms': min(single_predict_times) * 1000
+    }
+
+
+def prediction_interval_stats(xtx_inv, sse, n_rows, confidence=PREDICTION_INTERVAL_CONFIDENCE):
+    """
+    Statistics for closed-form OLS prediction intervals, stored in model_info.
+
+    `xtx_inv` is (ZᵀZ)⁻¹ of the training design in the scaled feature space
+    with a leading intercept column, `sse` the training residual sum of
+    squares. The API serves prediction ± t·s·sqrt(1 + zᵀ(ZᵀZ)⁻¹z).
+    """
+    dof = n_rows - len(xtx_inv)
+    return {
+        'confidence': confidence,
+        'dof': int(dof),
+        't_value': float(stats.t.ppf((1 + confidence) / 2, dof)),
+        'residual_variance': float(sse / dof),
+        'xtx_inv': np.asarray(xtx_inv).tolist()
+    }
+
+
+def _evaluate_shared(name, model, specs):
+    """Process-pool entry point: evaluate a candidate on the shared train/test matrices"""
+    arrays, blocks = attach_shared_arrays(specs)
+    try:
+        return name, evaluate_model(
+            model, arrays['X_train'], arrays['X_test'], arrays['y_train'], arrays['y_test']
+        )
+    finally:
+        del arrays
+        for block in blocks:
+            block.close()
+
 
-def train_models(X, y):
-    """Train and compare multiple models"""
+def train_models(X, y, n_jobs=None, models=None):
+    """
+    Train and compare multiple models.
+
+    Candidates are trained concurrently in a process pool of `n_jobs` workers
+    (default: one per candidate, capped at the core count); the scaled matrices
+    are shared with the workers through shared memory instead of being copied.
+    n_jobs=1 trains everything in this process. `models` replaces the default
+    candidates (name -> unfitted estimator), e.g. with model_search.py's winner.
+    """
     # Split the data
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
     
@@ -87,41 +237,154 @@ def train_models(X, y):
     X_test_scaled = scaler.transform(X_test)
     
     # Initialize models
-    models = {
-        'Linear Regression': LinearRegression(),
-        'Decision Tree': DecisionTreeRegressor(random_state=42),
-        'Random Forest': RandomForestRegressor(n_estimators=100, random_state=42)
-    }
+    if models is None:
+        models = {
+            'Linear Regression': LinearRegression(),
+            'Decision Tree': DecisionTreeRegressor(random_state=42),
+            'Random Forest': RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1)
+        }
     
     # Train and evaluate models
     results = {}
+    n_jobs = n_jobs or min(len(models), os.cpu_count() or 1)
+    print(f"Training {len(models)} models with {n_jobs} worker process(es)...")
+
+    if n_jobs == 1:
+        for name, model in models.items():
+            results[name] = evaluate_model(
+                model, X_train_scaled, X_test_scaled, np.asarray(y_train), np.asarray(y_test)
+            )
+    else:
+        method = 'fork' if 'fork' in get_all_start_methods() else None
+        with SharedArrays(X_train=X_train_scaled, X_test=X_test_scaled,
+                          y_train=np.asarray(y_train, dtype=np.float64),
+                          y_test=np.asarray(y_test, dtype=np.float64)) as shared, \
+                ProcessPoolExecutor(max_workers=n_jobs, mp_context=get_context(method)) as pool:
+            futures = [pool.submit(_evaluate_shared, name, model, shared.specs)
+                       for name, model in models.items()]
+            for future in futures:
+                name, result = future.result()
+                results[name] = result
+
+    # Prediction interval statistics for the OLS fit, computed once here so
+    # the API only evaluates a small quadratic form per request
+    ols = results.get('Linear Regression')
+    if ols is not None:
+        Z = np.column_stack([np.ones(len(X_train_scaled)), X_train_scaled])
+        residuals = np.asarray(y_train) - ols['model'].predict(X_train_scaled)
+        ols['prediction_interval'] = prediction_interval_stats(
+            np.linalg.pinv(Z.T @ Z), residuals @ residuals, len(Z)
+        )
+
+    # Training feature distribution, the API's input-drift reference
+    drift_reference = reference_histogram(X_train_scaled)
+    for result in results.values():
+        result['drift_reference'] = drift_reference
+
+    for name, result in results.items():
+        print(f"  {name} - Test R²: {result['test_r2']:.4f}, RMSE: {result['test_rmse']:.4f}, "
+              f"MAE: {result['test_mae']:.4f}, fit: {result['fit_time']:.3f}s, "
+              f"predict: {result['predict_time'] * 1000:.2f}ms, 1-row: {result['single_predict_ms']:.3f}ms")
     
-    for name, model in models.items():
-        print(f"Training {name}...")
-        
-        # Train the model
-        model.fit(X_train_scaled, y_train)
-        
-        # Make predictions
-        y_pred_train = model.predict(X_train_scaled)
-        y_pred_test = model.predict(X_test_scaled)
-        
-        # Calculate metrics
-        train_r2 = r2_score(y_train, y_pred_train)
-        test_r2 = r2_score(y_test, y_pred_test)
-        test_rmse = np.sqrt(mean_squared_error(y_test, y_pred_test))
-        test_mae = mean_absolute_error(y_test, y_pred_test)
-        
-        results[name] = {
+    return results, scaler, list(FEATURE_NAMES)
+
+def train_streaming(make_chunks, test_every=5):
+    """
+    Fit the scaler and a linear regression out of core.
+
+    `make_chunks` returns a fresh iterator of raw DataFrame chunks and is called
+    twice: once to fit, once to evaluate. Rows whose global index is a multiple
+    of `test_every` are held out for testing. Only one chunk and the 10x10
+    sufficient statistics (XᵀX, Xᵀy, yᵀy) are in memory at any time, so the fit
+    equals ordinary least squares on all training rows.
+    """
+    scaler = StandardScaler()
+    gram = None
+    xty = None
+    yty = 0.0
+    shift = None
+    row = 0
+    n_train = 0
+
+    # Pass 1: incremental scaler and normal-equation statistics on training rows
+    for chunk in make_chunks():
+        X, y = create_features(chunk)
+        test_mask = np.arange(row, row + len(X)) % test_every == 0
+        row += len(X)
+
+        X_train = X[~test_mask]
+        if not len(X_train):
+            continue
+        scaler.partial_fit(X_train)
+
+        # Center on the first chunk's means to keep XᵀX well conditioned
+        if shift is None:
+            shift = X_train.mean(axis=0)
+        Z = np.column_stack([np.ones(len(X_train)), X_train - shift])
+        target = y[~test_mask]
+        gram = Z.T @ Z if gram is None else gram + Z.T @ Z
+        xty = Z.T @ target if xty is None else xty + Z.T @ target
+        yty += target @ target
+        n_train += len(target)
+
+    if gram is None:
+        raise ValueError("No training rows were read")
+
+    beta = np.linalg.lstsq(gram, xty, rcond=None)[0]
+    slopes = beta[1:]
+    raw_intercept = beta[0] - slopes @ shift
+
+    # Express the raw-space fit in the scaled space the API feeds the model
+    model = LinearRegression()
+    model.coef_ = slopes * scaler.scale_
+    model.intercept_ = float(raw_intercept + slopes @ scaler.mean_)
+    model.n_features_in_ = len(slopes)
+
+    # Prediction interval statistics: the shifted raw design is z = B·[1, scaled x]
+    # with B = [[1, 0], [mean - shift, diag(scale)]], so the scaled-space
+    # (ZᵀZ)⁻¹ is Bᵀ (gram)⁻¹ B; the residual sum of squares is yᵀy - βᵀXᵀy
+    to_scaled = np.eye(len(gram))
+    to_scaled[1:, 0] = scaler.mean_ - shift
+    to_scaled[1:, 1:] = np.diag(scaler.scale_)
+    train_sse = max(yty - beta @ xty, 0.0)
+    interval = prediction_interval_stats(to_scaled.T @ np.linalg.pinv(gram) @ to_scaled, train_sse, n_train)
+
+    # Pass 2: streamed test metrics and the training rows' drift reference
+    n_test = 0
+    sum_y = sum_y2 = test_sse = test_sae = 0.0
+    row = 0
+    histogram = 0
+    for chunk in make_chunks():
+        X, y = create_features(chunk)
+        test_mask = np.arange(row, row + len(X)) % test_every == 0
+        row += len(X)
+        histogram = histogram + histogram_counts(scaler.transform(X[~test_mask]), DEFAULT_EDGES)
+        if not test_mask.any():
+            continue
+        y_test = y[test_mask]
+        residuals = y_test - model.predict(scaler.transform(X[test_mask]))
+        n_test += len(y_test)
+        sum_y += y_test.sum()
+        sum_y2 += (y_test ** 2).sum()
+        test_sse += (residuals ** 2).sum()
+        test_sae += np.abs(residuals).sum()
+
+    total_ss = sum_y2 - sum_y ** 2 / n_test
+    results = {
+        'Linear Regression': {
             'model': model,
-            'test_r2': test_r2,
-            'test_rmse': test_rmse,
-            'test_mae': test_mae
+            'test_r2': 1 - test_sse / total_ss,
+            'test_rmse': np.sqrt(test_sse / n_test),
+            'test_mae': test_sae / n_test,
+            'prediction_interval': interval,
+            'drift_reference': {'edges': DEFAULT_EDGES.tolist(), 'counts': histogram.tolist()}
         }
-        
-        print(f"  {name} - Test R²: {test_r2:.4f}, RMSE: {test_rmse:.4f}, MAE: {test_mae:.4f}")
-    
-    return results, scaler, X.columns.tolist()
+    }
+    print(f"  Linear Regression - {row - n_test} train / {n_test} test rows, "
+          f"Test R²: {results['Linear Regression']['test_r2']:.4f}, "
+          f"RMSE: {results['Linear Regression']['test_rmse']:.4f}, "
+          f"MAE: {results['Linear Regression']['test_mae']:.4f}")
+    return results, scaler, list(FEATURE_NAMES)
 
 def save_best_model(results, scaler, feature_names):
     """Save the best performing model"""
@@ -140,35 +403,72 @@ def save_best_model(results, scaler, feature_names):
     model_info = {
         'model_name': best_model_name,
         'feature_names': feature_names,
+        'feature_transformer': FEATURE_TRANSFORMER.to_config(),
         'test_r2': float(results[best_model_name]['test_r2']),
         'test_rmse': float(results[best_model_name]['test_rmse']),
         'test_mae': float(results[best_model_name]['test_mae'])
     }
+    for key in ('prediction_interval', 'drift_reference', 'cross_validation'):
+        if key in results[best_model_name]:
+            model_info[key] = results[best_model_name][key]
     
     with open('model_info.json', 'w') as f:
         json.dump(model_info, f, indent=2)
+
+    # Pickle-free artifact the API loads without importing sklearn; models that
+    # fit neither the linear nor the tree form must not leave a stale one behind
+    if export_model(ARTIFACT_FILE, best_model, scaler, model_info):
+        print(f"Exported {ARTIFACT_FILE}")
+    elif os.path.exists(ARTIFACT_FILE):
+        os.remove(ARTIFACT_FILE)
     
     print("Model saved successfully!")
     return best_model_name
 
 def main():
     """Main training function"""
+    parser = argparse.ArgumentParser(description="Train the student performance model")
+    parser.add_argument('--data', help="CSV of raw features + final_score, or a .npy from "
+                                       "generate_data.py (default: synthetic data)")
+    parser.add_argument('--n-students', type=int, default=1000, help="synthetic students to generate")
+    parser.add_argument('--streaming', action='store_true',
+                        help="out-of-core mode: fit a linear model chunk by chunk with bounded memory")
+    parser.add_argument('--chunk-size', type=int, default=100000, help="rows per chunk in --streaming mode")
+    args = parser.parse_args()
+
     print("Student Performance Prediction Model Training")
     print("=" * 50)
-    
-    # Generate data
-    print("Generating student performance dataset...")
-    data = generate_student_data(1000)
-    print(f"Dataset shape: {data.shape}")
-    
-    # Create features
-    print("\nCreating features...")
-    X, y = create_features(data)
-    print(f"Feature matrix shape: {X.shape}")
-    
-    # Train models
-    print("\nTraining models...")
-    results, scaler, feature_names = train_models(X, y)
+
+    if args.streaming:
+        print(f"Streaming training in chunks of {args.chunk_size} rows...")
+        if args.data and args.data.endswith('.npy'):
+            make_chunks = lambda: iter_npy_chunks(args.data, args.chunk_size)
+        elif args.data:
+            make_chunks = lambda: iter_csv_chunks(args.data, args.chunk_size)
+        else:
+            make_chunks = lambda: iter_synthetic_chunks(args.n_students, args.chunk_size)
+        results, scaler, feature_names = train_streaming(make_chunks)
+    else:
+        # Generate data
+        if args.data:
+            print(f"Loading student performance dataset from {args.data}...")
+            if args.data.endswith('.npy'):
+                data = next(iter_npy_chunks(args.data, len(np.load(args.data, mmap_mode='r'))))
+            else:
+                data = pd.read_csv(args.data)
+        else:
+            print("Generating student performance dataset...")
+            data = generate_student_data(args.n_students)
+        print(f"Dataset shape: {data.shape}")
+        
+        # Create features
+        print("\nCreating features...")
+        X, y = create_features(data)
+        print(f"Feature matrix shape: {X.shape}")
+        
+        # Train models
+        print("\nTraining models...")
+        results, scaler, feature_names = train_models(X, y)
     
     # Save best model
     print("\nSaving best model...")
@@ -179,6 +479,8 @@ def main():
     print("- best_model.pkl (trained model)")
     print("- scaler.pkl (feature scaler)")
     print("- model_info.json (model information)")
+    if os.path.exists(ARTIFACT_FILE):
+        print(f"- {ARTIFACT_FILE} (pickle-free artifact for the API)")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file